@@ -61,6 +61,8 @@ class GameManager(object):
     def __init__(self, games_url):
         self._data = _GameManagerData()
         self.games_url = games_url
+        self._games = None
+        self._games_etag = None
         super(GameManager, self).__init__()
 
     @abstractmethod
@@ -93,10 +95,25 @@ class GameManager(object):
             LOGGER.error("Failed to create game {}".format(game_data["name"]))
             LOGGER.exception(ex)
 
+    def _get_games(self):
+        """
+        Requests the games conditionally on the last list received, which is reused if
+        it hasn't changed.
+        """
+        headers = {}
+        if self._games_etag is not None:
+            headers["If-None-Match"] = self._games_etag
+        response = requests.get(self.games_url, headers=headers)
+        if response.status_code == 304:
+            return self._games
+        self._games = response.json()
+        self._games_etag = response.headers.get("ETag")
+        return self._games
+
     def update(self):
         try:
             LOGGER.info("Waking up")
-            games = requests.get(self.games_url).json()
+            games = self._get_games()
         except (requests.RequestException, ValueError) as ex:
             LOGGER.error("Failed to obtain game data")
             LOGGER.exception(ex)
@@ -151,6 +168,7 @@ class LocalGameManager(GameManager):
             template['environment']['WORKER_MANAGER'] = 'local'
             template['environment']['EXTERNAL_PORT'] = port
             template['environment']['CONTAINER_TEMPLATE'] = os.environ['CONTAINER_TEMPLATE']
+            template['environment']['GAME_NOTIFICATIONS'] = os.environ.get('GAME_NOTIFICATIONS', 'none')
 
         assert (game_id not in self.games)
         port = str(6001 + int(game_id) * 1000)
@@ -158,7 +176,8 @@ class LocalGameManager(GameManager):
 
         template = json.loads(os.environ.get('CONTAINER_TEMPLATE', '{}'))
         setup_container_environment_variables(template, game_data)
-        template['ports'] = {"{}/tcp".format(port): ('0.0.0.0', port)}
+        template['ports'] = {"{}/tcp".format(port): ('0.0.0.0', port),
+                             "{}/udp".format(port): ('0.0.0.0', port)}
 
         self.games[game_id] = client.containers.run(
             name="aimmo-game-{}".format(game_id),
@@ -3,7 +3,7 @@ from __future__ import absolute_import
 import unittest
 from json import dumps
 
-from httmock import HTTMock
+from httmock import HTTMock, response
 
 from game_manager import GameManager
 
@@ -51,6 +51,21 @@ class RequestMock(object):
         return dumps(self.value)
 
 
+class ConditionalRequestMock(RequestMock):
+    def __init__(self, num_games):
+        super(ConditionalRequestMock, self).__init__(num_games)
+        self.etags_received = []
+
+    def __call__(self, url, request):
+        self.urls_requested.append(url.geturl())
+        self.etags_received.append(request.headers.get("If-None-Match"))
+        content = dumps(self.value)
+        etag = '"{}"'.format(hash(content))
+        if request.headers.get("If-None-Match") == etag:
+            return response(304, request=request)
+        return response(200, content, {"ETag": etag}, request=request)
+
+
 class TestGameManager(unittest.TestCase):
     def setUp(self):
         self.game_manager = ConcreteGameManager("http://test/")
@@ -91,3 +106,16 @@ class TestGameManager(unittest.TestCase):
                 "http://test/{}/".format(i)
             )
             self.assertEqual(self.game_manager.added_games[str(i)]["name"], "Game {}".format(i))
+
+    def test_unchanged_games_not_resent(self):
+        mocker = ConditionalRequestMock(2)
+        with HTTMock(mocker):
+            self.game_manager.update()
+            self.game_manager.update()
+            mocker.value["2"] = {"name": "Game 2", "settings": {}}
+            self.game_manager.update()
+
+        self.assertIsNone(mocker.etags_received[0])
+        self.assertIsNotNone(mocker.etags_received[1])
+        self.assertEqual(mocker.etags_received[1], mocker.etags_received[2])
+        self.assertEqual(self.game_manager.final_games, {"0", "1", "2"})
@@ -1,5 +1,6 @@
 from __future__ import print_function
 
+import hashlib
 import logging
 import traceback
 import sys
@@ -15,6 +16,7 @@ import simulation.direction as direction
 from print_collector import LogManager
 
 from simulation.action import WaitAction, Action
+from simulation.action_plan import serialise_plan
 from user_exceptions import InvalidActionException
 
 from RestrictedPython import compile_restricted, utility_builtins
@@ -72,18 +74,29 @@ def capture_output(stdout=None, stderr=None):
     sys.stderr = old_err
 
 
+def hash_code(src_code):
+    """
+    :return: The hash identifying a version of the avatar code, as computed by the game.
+    """
+    if src_code is None:
+        return None
+    return hashlib.sha256(src_code.encode('utf-8')).hexdigest()
+
+
 class AvatarRunner(object):
     def __init__(self, avatar=None, auto_update=True):
         self.avatar = avatar
         self.auto_update = auto_update
         self.avatar_source_code = None
+        self.avatar_code_hash = None
         self.update_successful = False
 
-    def _avatar_src_changed(self, new_avatar_code):
-        return new_avatar_code != self.avatar_source_code
+    def _avatar_src_changed(self, code_hash):
+        return code_hash != self.avatar_code_hash
 
-    def _get_new_avatar(self, src_code):
+    def _get_new_avatar(self, src_code, code_hash=None):
         self.avatar_source_code = src_code
+        self.avatar_code_hash = hash_code(src_code) if code_hash is None else code_hash
         module = imp.new_module('avatar')  # Create a temporary module to execute the src_code in
         module.__dict__.update(restricted_globals)
 
@@ -96,7 +109,7 @@ class AvatarRunner(object):
         module.__dict__['Avatar'] = restricted_globals['Avatar']
         return module.Avatar()
 
-    def _update_avatar(self, src_code):
+    def _update_avatar(self, src_code, code_hash=None):
         """
         We update the avatar object if any of the following are true:
         1. We don't have an avatar object yet, so self.avatar is None
@@ -106,36 +119,51 @@ class AvatarRunner(object):
         been updated, meaning that self.avatar will actually be for the last correct code
         """
 
-        if self._should_update(src_code):
+        if code_hash is None:
+            code_hash = hash_code(src_code)
+        if self._should_update(code_hash):
             try:
-                self.avatar = self._get_new_avatar(src_code)
+                self.avatar = self._get_new_avatar(src_code, code_hash)
             except Exception as e:
                 self.update_successful = False
                 raise e
             else:
                 self.update_successful = True
 
-    def _should_update(self, src_code):
-        return (self.avatar is None or self.auto_update and self._avatar_src_changed(src_code) or
+    def _should_update(self, code_hash):
+        return (self.avatar is None or self.auto_update and self._avatar_src_changed(code_hash) or
                 not self.update_successful)
 
-    def process_avatar_turn(self, world_map, avatar_state, src_code):
-        avatar_updated = self._avatar_src_changed(src_code)
+    def process_avatar_turn(self, world_map, avatar_state, src_code, code_hash=None):
+        """
+        :param src_code: The avatar code, or None to keep running the current code.
+        :param code_hash: The hash of the code, computed from src_code if not given.
+        """
+        if src_code is None:
+            src_code, code_hash = self.avatar_source_code, self.avatar_code_hash
+        elif code_hash is None:
+            code_hash = hash_code(src_code)
+        avatar_updated = self._avatar_src_changed(code_hash)
 
         with capture_output() as output:
-            action = self.run_users_code(world_map, avatar_state, src_code)
+            action, plan = self.run_users_code(world_map, avatar_state, src_code, code_hash)
 
         stdout, stderr = output
         output_log = stdout.getvalue()
         if not stderr.getvalue() == '':
             LOGGER.info(stderr.getvalue())
 
-        return {'action': action, 'log': output_log, 'avatar_updated': avatar_updated}
+        return {'action': action, 'log': output_log, 'avatar_updated': avatar_updated,
+                'code_hash': code_hash, 'plan': plan}
 
-    def run_users_code(self, world_map, avatar_state, src_code):
+    def run_users_code(self, world_map, avatar_state, src_code, code_hash=None):
+        """
+        :return: The serialised action for this turn and the plan for the next turns.
+        """
+        plan = []
         try:
-            self._update_avatar(src_code)
-            action = self.decide_action(world_map, avatar_state)
+            self._update_avatar(src_code, code_hash)
+            action, plan = self.decide_action(world_map, avatar_state)
             self.print_logs()
 
         except InvalidActionException as e:
@@ -153,18 +181,30 @@ class AvatarRunner(object):
             LOGGER.info(e)
             action = WaitAction().serialise()
 
-        return action
+        return action, plan
 
     def decide_action(self, world_map, avatar_state):
+        """
+        The avatar returns either an action, or a list of actions for this turn and the
+        next ones, which the game follows without asking the avatar again for as long
+        as the moves in it succeed.
+
+        :return: The serialised action for this turn and the plan for the next turns.
+        """
         try:
             try:
                 action = self.avatar.handle_turn(world_map, avatar_state)
             except AttributeError:
                 action = self.avatar.next_turn(world_map, avatar_state)
 
+            if isinstance(action, (list, tuple)):
+                actions = action
+                if not actions or not all(isinstance(action, Action) for action in actions):
+                    raise InvalidActionException(actions)
+                return actions[0].serialise(), serialise_plan(actions, avatar_state.location)
             if not isinstance(action, Action):
                 raise InvalidActionException(action)
-            return action.serialise()
+            return action.serialise(), []
         except TypeError as e:
                 raise InvalidActionException(None)
 
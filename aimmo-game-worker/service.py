@@ -7,7 +7,7 @@ import aiohttp_cors
 import asyncio
 
 from simulation.avatar_state import AvatarState
-from simulation.world_map import WorldMap
+from simulation.world_map import WorldMapCache
 from avatar_runner import AvatarRunner
 
 app = web.Application()
@@ -18,22 +18,34 @@ routes = web.RouteTableDef()
 LOGGER = logging.getLogger(__name__)
 
 avatar_runner = None
+world_map_cache = WorldMapCache()
 DATA_URL = ''
 
 
 @routes.post('/turn/')
 async def process_turn(request):
     data = json.loads(await request.content.read())
-    world_map = WorldMap(**data['world_map'])
-    code, options = data['code'], data['options']
+    turn = data.get('turn')
+    code, code_hash = data.get('code'), data.get('code_hash')
+    if code is None and (code_hash is None or code_hash != avatar_runner.avatar_code_hash):
+        return web.json_response({'error': 'unknown code'}, status=409)
+    if not world_map_cache.update(data['world_map'], turn):
+        return web.json_response({'error': 'unknown base turn'}, status=409)
+    world_map = world_map_cache.world_map()
     avatar_state = AvatarState(location=data['avatar_state']['location'],
                                score=data['avatar_state']['score'],
                                health=data['avatar_state']['health'])
 
-    response = avatar_runner.process_avatar_turn(world_map, avatar_state, code)
+    response = avatar_runner.process_avatar_turn(world_map, avatar_state, code, code_hash)
+    response['turn'] = turn
     return web.json_response(response)
 
 
+@routes.get('/ready/')
+async def ready(request):
+    return web.json_response({'ready': True})
+
+
 def run(host, port, data_url):
     global avatar_runner, DATA_URL
     DATA_URL = data_url
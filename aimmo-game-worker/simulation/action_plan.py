@@ -0,0 +1,27 @@
+from simulation.action import MoveAction
+
+# The most turns an avatar can plan ahead, the game ignores the rest.
+MAX_PLAN_LENGTH = 5
+
+
+def _location_after(action, location):
+    if isinstance(action, MoveAction):
+        return location + action.direction
+    return location
+
+
+def serialise_plan(actions, location):
+    """
+    :param actions: The actions returned by the avatar, the first of which is for this
+    turn and the others for the following turns.
+    :param location: The location of the avatar this turn.
+    :return: The plan for the following turns. Each action is only valid if the avatar
+    is where it would be had all the moves before it succeeded.
+    """
+    plan = []
+    location = _location_after(actions[0], location)
+    for action in actions[1:MAX_PLAN_LENGTH + 1]:
+        plan.append({'action': action.serialise(),
+                     'condition': {'location': {'x': location.x, 'y': location.y}}})
+        location = _location_after(action, location)
+    return plan
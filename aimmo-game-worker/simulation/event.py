@@ -1,11 +1,11 @@
 from collections import namedtuple
 
 ReceivedAttackEvent = namedtuple(
-    'ReceivedAttackEvent', ['attacking_avatar', 'damage_dealt'])
+    'ReceivedAttackEvent', ['attacking_avatar_id', 'damage_dealt'])
 
 PerformedAttackEvent = namedtuple(
     'PerformedAttackEvent',
-    ['attacked_avatar', 'target_location', 'damage_dealt'])
+    ['attacked_avatar_id', 'target_location', 'damage_dealt'])
 
 FailedAttackEvent = namedtuple(
     'FailedAttackEvent', ['target_location'])
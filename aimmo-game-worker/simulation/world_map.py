@@ -74,3 +74,39 @@ class WorldMap(object):
 
     def __repr__(self):
         return repr(self.cells)
+
+
+class WorldMapCache(object):
+
+    """
+    The cells last sent by the game, so that the following turns only need to send
+    the cells which have changed.
+    """
+
+    def __init__(self):
+        self.turn = None
+        self._cells = {}
+
+    def update(self, world_map_data, turn):
+        """
+        :return: False if the changes are not based on the cached turn, in which case
+        the game has to send the whole map.
+        """
+        if 'changed_cells' in world_map_data:
+            if self.turn is None or world_map_data['base_turn'] != self.turn:
+                return False
+            cells = world_map_data['changed_cells']
+        else:
+            self._cells = {}
+            cells = world_map_data['cells']
+        for cell_data in cells:
+            location = cell_data['location']
+            self._cells[(location['x'], location['y'])] = cell_data
+        self.turn = turn
+        return True
+
+    def world_map(self):
+        """
+        :return: A new WorldMap, so changes made by the avatar code are not kept.
+        """
+        return WorldMap(list(self._cells.values()))
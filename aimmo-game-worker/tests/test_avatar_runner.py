@@ -2,7 +2,8 @@ from unittest import TestCase
 
 import mock
 
-from avatar_runner import AvatarRunner
+from avatar_runner import AvatarRunner, hash_code
+from simulation.avatar_state import AvatarState
 from user_exceptions import InvalidActionException
 
 NORTH = {'x': 0, 'y': 1}
@@ -247,3 +248,63 @@ class TestAvatarRunner(TestCase):
         response = runner.process_avatar_turn(world_map={}, avatar_state={}, src_code=avatar)
         self.assertTrue('THIS CODE IS BROKEN' in response['log'])
         self.assertTrue('"None" is not a valid action object.' in response['log'])
+
+    def test_current_code_kept_without_source(self):
+        avatar = '''class Avatar:
+                        def next_turn(self, world_map, avatar_state):
+                            return MoveAction(direction.NORTH)
+                  '''
+
+        runner = AvatarRunner()
+        response = runner.process_avatar_turn(world_map={}, avatar_state={}, src_code=avatar,
+                                              code_hash='hash')
+        self.assertEqual(response['code_hash'], 'hash')
+        self.assertTrue(response['avatar_updated'])
+
+        response = runner.process_avatar_turn(world_map={}, avatar_state={}, src_code=None)
+        self.assertEqual(response['action'], {'action_type': 'move', 'options': {'direction': NORTH}})
+        self.assertEqual(response['code_hash'], 'hash')
+        self.assertFalse(response['avatar_updated'])
+
+    def test_code_hash_computed_from_source(self):
+        runner = AvatarRunner()
+        response = runner.process_avatar_turn(world_map={}, avatar_state={}, src_code='')
+        self.assertEqual(response['code_hash'], hash_code(''))
+
+    def test_plan_of_actions(self):
+        avatar = '''class Avatar:
+                        def next_turn(self, world_map, avatar_state):
+                            return [MoveAction(direction.NORTH), WaitAction(), MoveAction(direction.EAST)]
+                  '''
+
+        runner = AvatarRunner()
+        avatar_state = AvatarState(location={'x': 0, 'y': 0}, health=5, score=0)
+        response = runner.process_avatar_turn(world_map={}, avatar_state=avatar_state, src_code=avatar)
+
+        self.assertEqual(response['action'], {'action_type': 'move', 'options': {'direction': NORTH}})
+        self.assertEqual(response['plan'], [
+            {'action': {'action_type': 'wait'}, 'condition': {'location': {'x': 0, 'y': 1}}},
+            {'action': {'action_type': 'move', 'options': {'direction': EAST}},
+             'condition': {'location': {'x': 0, 'y': 1}}},
+        ])
+
+    def test_no_plan_for_single_action(self):
+        avatar = '''class Avatar:
+                        def next_turn(self, world_map, avatar_state):
+                            return MoveAction(direction.NORTH)
+                  '''
+
+        runner = AvatarRunner()
+        response = runner.process_avatar_turn(world_map={}, avatar_state={}, src_code=avatar)
+        self.assertEqual(response['plan'], [])
+
+    def test_empty_plan_is_invalid(self):
+        avatar = '''class Avatar:
+                        def next_turn(self, world_map, avatar_state):
+                            return []
+                  '''
+
+        runner = AvatarRunner()
+        response = runner.process_avatar_turn(world_map={}, avatar_state={}, src_code=avatar)
+        self.assertEqual(response['action'], {'action_type': 'wait'})
+        self.assertEqual(response['plan'], [])
@@ -0,0 +1,17 @@
+from unittest import TestCase
+
+from simulation.action import MoveAction, WaitAction
+from simulation.action_plan import MAX_PLAN_LENGTH, serialise_plan
+from simulation.direction import NORTH
+from simulation.location import Location
+
+
+class TestActionPlan(TestCase):
+    def test_conditions_follow_moves(self):
+        plan = serialise_plan([MoveAction(NORTH), MoveAction(NORTH), WaitAction()], Location(2, 3))
+        self.assertEqual([step['condition'] for step in plan],
+                         [{'location': {'x': 2, 'y': 4}}, {'location': {'x': 2, 'y': 5}}])
+
+    def test_plan_is_truncated(self):
+        plan = serialise_plan([WaitAction()] * (MAX_PLAN_LENGTH + 3), Location(0, 0))
+        self.assertEqual(len(plan), MAX_PLAN_LENGTH)
@@ -3,7 +3,7 @@ from __future__ import absolute_import
 from unittest import TestCase
 
 from simulation.location import Location
-from simulation.world_map import WorldMap
+from simulation.world_map import WorldMap, WorldMapCache
 
 
 class TestWorldMap(TestCase):
@@ -53,6 +53,19 @@ class TestWorldMap(TestCase):
         map = WorldMap(cells)
         self.assertLocationsEqual(map.pickup_cells(), (Location(-1, -1), Location(1, 1)))
 
+    def test_partially_fogged_cells_are_visible(self):
+        cells = [dict(cell, partially_fogged=False) for cell in self._generate_cells()]
+        cells[0] = {'location': {'x': -1, 'y': -1}, 'generates_score': True, 'partially_fogged': True}
+        map = WorldMap(cells)
+        self.assertTrue(map.is_visible(Location(-1, -1)))
+        self.assertLocationsEqual(map.partially_fogged_cells(), [Location(-1, -1)])
+        self.assertFalse(map.can_move_to(Location(-1, -1)))
+
+    def test_cells_outside_view_are_not_visible(self):
+        map = WorldMap(self._generate_cells())
+        self.assertFalse(map.is_visible(Location(2, 0)))
+        self.assertFalse(map.can_move_to(Location(2, 0)))
+
     def test_location_is_visible(self):
         map = WorldMap(self._generate_cells())
         for x in (0, 1):
@@ -115,3 +128,39 @@ class TestWorldMap(TestCase):
         cells[1]['avatar'] = self.AVATAR
         map = WorldMap(cells)
         self.assertFalse(map.can_move_to(Location(-1, 0)))
+
+
+class TestWorldMapCache(TestCase):
+    def _cell(self, x, y, habitable=True):
+        return {'location': {'x': x, 'y': y}, 'habitable': habitable, 'generates_score': False,
+                'avatar': None, 'pickup': None, 'partially_fogged': False}
+
+    def test_changed_cells_are_applied(self):
+        cache = WorldMapCache()
+        self.assertTrue(cache.update({'cells': [self._cell(0, 0), self._cell(1, 0)]}, 1))
+        self.assertTrue(cache.update({'base_turn': 1, 'changed_cells': [self._cell(1, 0, False)]}, 2))
+
+        world_map = cache.world_map()
+        self.assertEqual(len(list(world_map.all_cells())), 2)
+        self.assertTrue(world_map.can_move_to(Location(0, 0)))
+        self.assertFalse(world_map.can_move_to(Location(1, 0)))
+        self.assertEqual(cache.turn, 2)
+
+    def test_changes_to_another_turn_are_rejected(self):
+        cache = WorldMapCache()
+        self.assertFalse(cache.update({'base_turn': 1, 'changed_cells': []}, 2))
+        cache.update({'cells': [self._cell(0, 0)]}, 1)
+        self.assertFalse(cache.update({'base_turn': 3, 'changed_cells': []}, 4))
+        self.assertEqual(cache.turn, 1)
+
+    def test_avatar_code_cannot_change_the_cache(self):
+        cache = WorldMapCache()
+        cache.update({'cells': [self._cell(0, 0)]}, 1)
+        cache.world_map().get_cell(Location(0, 0)).habitable = False
+        self.assertTrue(cache.world_map().can_move_to(Location(0, 0)))
+
+    def test_whole_map_replaces_the_cache(self):
+        cache = WorldMapCache()
+        cache.update({'cells': [self._cell(0, 0), self._cell(1, 0)]}, 1)
+        cache.update({'cells': [self._cell(0, 0)]}, 2)
+        self.assertEqual(len(list(cache.world_map().all_cells())), 1)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""
+Compares the payload size and encode time of the JSON and compact encodings of the
+frontend game state.
+
+Run from the aimmo-game directory:
+    python -m benchmarks.game_state_encoding
+"""
+import json
+import random
+import timeit
+
+from simulation import map_generator
+from simulation.avatar.avatar_manager import AvatarManager
+from simulation.compact_encoding import encode_entities, encode_terrain
+
+from .world_map_growth import SETTINGS
+
+MAP_SIZES = (31, 100)
+AVATAR_COUNTS = (10, 100)
+REPEAT = 50
+
+
+def build_game_state(map_size, num_avatars):
+    random.seed(0)
+    settings = dict(SETTINGS, START_HEIGHT=map_size, START_WIDTH=map_size)
+    game_state = map_generator.Main(settings).get_game_state(AvatarManager())
+    for player_id in range(num_avatars):
+        game_state.add_avatar(player_id)
+    game_state.world_map.update(num_avatars)
+    return game_state
+
+
+def encode_json(data):
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def time_encoding(encode, data):
+    return min(timeit.repeat(lambda: encode(data), number=REPEAT, repeat=3)) / REPEAT
+
+
+def main():
+    print('{:>6} {:>8} {:>9} {:>11} {:>11} {:>10} {:>10}'.format(
+        'map', 'avatars', 'layer', 'json bytes', 'compact', 'json us', 'compact us'))
+    for map_size in MAP_SIZES:
+        for num_avatars in AVATAR_COUNTS:
+            game_state = build_game_state(map_size, num_avatars)
+            layers = (('entities', game_state.serialise_entities(), encode_entities),
+                      ('terrain', game_state.serialise_terrain(), encode_terrain))
+            for layer, data, encode_compact in layers:
+                print('{:>6} {:>8} {:>9} {:>11} {:>11} {:>10.1f} {:>10.1f}'.format(
+                    map_size, num_avatars, layer,
+                    len(encode_json(data)), len(encode_compact(data)),
+                    time_encoding(encode_json, data) * 1e6,
+                    time_encoding(encode_compact, data) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""
+Measures how long the simulation takes to resolve a turn in which every avatar moves,
+with the avatars queued in corridors so that their moves form long chains.
+
+Run from the aimmo-game directory:
+    python -m benchmarks.move_resolution
+"""
+import asyncio
+import time
+
+from simulation.avatar.avatar_manager import AvatarManager
+from simulation.game_state import GameState
+from simulation.location import Location
+from simulation.simulation_runner import ConcurrentSimulationRunner
+from simulation.world_map import WorldMap
+
+# Number of corridors and number of avatars in each of them.
+LAYOUTS = ((10, 10), (10, 50), (20, 100), (1, 900), (4, 500))
+REPEAT = 3
+
+
+def build_corridors(num_corridors, length, blocked):
+    """
+    Corridors run east, separated by walls, and are full of avatars moving east but for
+    their last cell. In blocked corridors the last avatar waits, so all the moves fail.
+    """
+    world_map = WorldMap.generate_empty_map(height=2 * num_corridors + 1, width=length + 1,
+                                            settings={})
+    min_x, min_y = world_map.min_x(), world_map.min_y()
+    for cell in world_map.all_cells():
+        cell.habitable = (cell.location.y - min_y) % 2 == 1
+    game_state = GameState(world_map, AvatarManager())
+
+    player_id_to_serialised_actions = {}
+    for corridor in range(num_corridors):
+        y = min_y + 2 * corridor + 1
+        for x in range(length):
+            player_id = corridor * length + x
+            game_state.add_avatar(player_id, Location(min_x + x, y))
+            if blocked and x == length - 1:
+                action = {'action_type': 'wait'}
+            else:
+                action = {'action_type': 'move', 'options': {'direction': {'x': 1, 'y': 0}}}
+            player_id_to_serialised_actions[player_id] = action
+    return game_state, player_id_to_serialised_actions
+
+
+def time_turn(num_corridors, length, blocked):
+    loop = asyncio.get_event_loop()
+    timings = []
+    for _ in range(REPEAT):
+        game_state, actions = build_corridors(num_corridors, length, blocked)
+        simulation_runner = ConcurrentSimulationRunner(game_state=game_state, communicator=None)
+        start = time.perf_counter()
+        loop.run_until_complete(simulation_runner.run_turn(actions))
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    print('{:>10} {:>8} {:>8} {:>8} {:>12} {:>14}'.format(
+        'corridors', 'length', 'avatars', 'blocked', 'ms per turn', 'us per avatar'))
+    for num_corridors, length in LAYOUTS:
+        for blocked in (False, True):
+            per_turn = time_turn(num_corridors, length, blocked)
+            num_avatars = num_corridors * length
+            print('{:>10} {:>8} {:>8} {:>8} {:>12.2f} {:>14.2f}'.format(
+                num_corridors, length, num_avatars, str(blocked), per_turn * 1000,
+                per_turn / num_avatars * 1e6))
+
+
+if __name__ == '__main__':
+    main()
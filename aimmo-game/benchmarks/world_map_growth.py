@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""
+Measures the per-turn cost of the world map environment update as the map grows with
+the number of avatars.
+
+Run from the aimmo-game directory:
+    python -m benchmarks.world_map_growth
+"""
+import random
+import timeit
+
+from simulation import map_generator
+from simulation.avatar.avatar_manager import AvatarManager
+
+# Same values as the defaults of the Game model in the Django app.
+SETTINGS = {
+    'START_HEIGHT': 31,
+    'START_WIDTH': 31,
+    'OBSTACLE_RATIO': 0.1,
+    'TARGET_NUM_CELLS_PER_AVATAR': 16,
+    'TARGET_NUM_SCORE_LOCATIONS_PER_AVATAR': 0.5,
+    'SCORE_DESPAWN_CHANCE': 0.05,
+    'TARGET_NUM_PICKUPS_PER_AVATAR': 1.2,
+    'PICKUP_SPAWN_CHANCE': 0.1,
+}
+
+AVATAR_COUNTS = (10, 50, 100, 200, 400)
+TURNS = 20
+
+
+def build_game_state(num_avatars):
+    random.seed(0)
+    game_state = map_generator.Main(SETTINGS).get_game_state(AvatarManager())
+    for player_id in range(num_avatars):
+        game_state.world_map.update(player_id + 1)
+        game_state.add_avatar(player_id)
+    return game_state
+
+
+def time_turns(game_state):
+    def turn():
+        game_state.update_environment()
+    return min(timeit.repeat(turn, number=TURNS, repeat=3)) / TURNS
+
+
+def main():
+    print('{:>8} {:>10} {:>14}'.format('avatars', 'cells', 'ms per turn'))
+    for num_avatars in AVATAR_COUNTS:
+        game_state = build_game_state(num_avatars)
+        per_turn = time_turns(game_state)
+        print('{:>8} {:>10} {:>14.3f}'.format(num_avatars, game_state.world_map.num_cells,
+                                              per_turn * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -12,15 +12,54 @@ import json
 from urllib.parse import parse_qs
 
 import socketio
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 from simulation import map_generator
+from simulation.compact_encoding import encode_entities, encode_terrain
 from simulation.worker_managers import WORKER_MANAGERS
-from simulation.game_runner import GameRunner
+from simulation.game_runner import GameRunner, MIN_TURN_TIME
+from simulation.http_client import HTTPClient, CONNECT_TIMEOUT, READ_TIMEOUT
+from simulation.turn_deadline import TurnDeadline, DEADLINE_PERCENTILE, MIN_DEADLINE, MAX_DEADLINE
+from simulation.game_notifications import GameChangeListener, SAFETY_POLL_INTERVAL, listen_for_notifications
 
 app = web.Application()
 cors = aiohttp_cors.setup(app)
 
-socketio_server = socketio.AsyncServer(async_handlers=True)
+
+class EncodedJSON(object):
+    """
+    Data which has already been JSON encoded, so that it can be emitted to many
+    clients without being encoded again for each of them.
+    """
+
+    def __init__(self, data):
+        self.encoded = json.dumps(data, separators=(',', ':'))
+
+    def __eq__(self, other):
+        return isinstance(other, EncodedJSON) and self.encoded == other.encoded
+
+
+class _PacketJSON(object):
+    """
+    The json module given to socket.io, which splices EncodedJSON into the packets.
+    """
+    loads = staticmethod(json.loads)
+
+    @staticmethod
+    def dumps(data, **kwargs):
+        if isinstance(data, list) and any(isinstance(item, EncodedJSON) for item in data):
+            return '[' + ','.join(item.encoded if isinstance(item, EncodedJSON)
+                                  else json.dumps(item, **kwargs) for item in data) + ']'
+        return json.dumps(data, **kwargs)
+
+
+socketio_server = socketio.AsyncServer(async_handlers=True, json=_PacketJSON)
+
+# The clients of this game, by encoding, so that the game state is sent with a single
+# emit per encoding. Clients ask for the compact encoding in the query string.
+GAME_ROOM = 'game'
+COMPACT_GAME_ROOM = 'game-compact'
+COMPACT_ENCODING = 'compact'
 
 routes = web.RouteTableDef()
 
@@ -31,6 +70,8 @@ logging.basicConfig(level=logging.INFO)
 class GameAPI(object):
     def __init__(self, game_state, worker_manager):
         self._socket_session_id_to_player_id = {}
+        self._compact_session_ids = set()
+        self._sent_terrain_version = None
         self.register_endpoints()
         self.worker_manager = worker_manager
         self.game_state = game_state
@@ -40,6 +81,7 @@ class GameAPI(object):
         self.register_world_update_on_connect()
         self.register_remove_session_id_from_mappings()
         self.register_healthcheck()
+        self.register_metrics()
         app.add_routes(routes)
 
     def register_healthcheck(self):
@@ -49,6 +91,14 @@ class GameAPI(object):
 
         return healthcheck
 
+    def register_metrics(self):
+        @routes.get('/metrics')
+        async def metrics(request):
+            return web.Response(body=generate_latest(),
+                                headers={'Content-Type': CONTENT_TYPE_LATEST})
+
+        return metrics
+
     def register_player_data_view(self):
         @routes.get('/player/{player_id}')
         async def player_data(request: web.Request):
@@ -66,6 +116,12 @@ class GameAPI(object):
         async def world_update_on_connect(sid, environ):
             query = environ['QUERY_STRING']
             self._find_avatar_id_from_query(sid, query)
+            compact = self._find_encoding_from_query(sid, query) == COMPACT_ENCODING
+            socketio_server.enter_room(sid, COMPACT_GAME_ROOM if compact else GAME_ROOM)
+            if self.game_state.world_map.get_terrain_version() == self._sent_terrain_version:
+                # Otherwise the session is sent the terrain with the rest of its room.
+                await self._send_terrain(self.game_state.serialise_terrain(), room=sid,
+                                         compact=compact)
             await self.send_updates()
 
         return world_update_on_connect
@@ -74,6 +130,7 @@ class GameAPI(object):
         @socketio_server.on('disconnect')
         async def remove_session_id_from_mappings(sid):
             LOGGER.info("Socket disconnected for session id:{}. ".format(sid))
+            self._compact_session_ids.discard(sid)
             try:
                 del self._socket_session_id_to_player_id[sid]
             except KeyError:
@@ -84,6 +141,8 @@ class GameAPI(object):
     async def send_updates(self):
         player_id_to_worker = self.worker_manager.player_id_to_worker
         await self._send_have_avatars_code_updated(player_id_to_worker)
+        if self.game_state.world_map.get_terrain_version() != self._sent_terrain_version:
+            await self._broadcast_terrain()
         await self._send_game_state()
         await self._send_logs(player_id_to_worker)
 
@@ -104,45 +163,110 @@ class GameAPI(object):
             LOGGER.error("No avatar ID found. User may not be authorised ")
             LOGGER.error("query_string: " + query_string)
 
+    def _find_encoding_from_query(self, session_id, query_string):
+        """
+        :return: The encoding of the game state asked for by the client, 'json' by default.
+        """
+        encoding = parse_qs(query_string).get('encoding', ['json'])[0]
+        if encoding == COMPACT_ENCODING:
+            self._compact_session_ids.add(session_id)
+        return encoding
+
     async def _send_logs(self, player_id_to_workers):
         def should_send_logs(logs):
             return bool(logs)
 
+        emits = []
         socket_session_id_to_player_id_copy = self._socket_session_id_to_player_id.copy()
         for sid, player_id in socket_session_id_to_player_id_copy.items():
             avatar_logs = player_id_to_workers[player_id].log
             if should_send_logs(avatar_logs):
-                await socketio_server.emit('log', avatar_logs, room=sid)
+                emits.append(socketio_server.emit('log', avatar_logs, room=sid))
+        await asyncio.gather(*emits)
+
+    async def _send_terrain(self, serialised_terrain, room, compact=False):
+        """
+        The obstacles and bounds of the map, which clients keep until the terrain
+        version in the game state changes.
+        """
+        encoded_terrain = (encode_terrain(serialised_terrain) if compact
+                           else EncodedJSON(serialised_terrain))
+        await socketio_server.emit('game-terrain', encoded_terrain, room=room)
+
+    async def _broadcast_terrain(self):
+        serialised_terrain = self.game_state.serialise_terrain()
+        self._sent_terrain_version = serialised_terrain['terrainVersion']
+        await self._send_terrain(serialised_terrain, room=GAME_ROOM)
+        if self._compact_session_ids:
+            await self._send_terrain(serialised_terrain, room=COMPACT_GAME_ROOM, compact=True)
 
     async def _send_game_state(self):
-        serialised_game_state = self.game_state.serialise()
-        socket_session_id_to_player_id_copy = self._socket_session_id_to_player_id.copy()
-        for sid, player_id in socket_session_id_to_player_id_copy.items():
-            await socketio_server.emit('game-state', serialised_game_state, room=sid)
+        """
+        The game state is the same for every client, so it is encoded once per encoding
+        and broadcast to the room of the clients which use that encoding.
+        """
+        serialised_game_state = self.game_state.serialise_entities()
+        await socketio_server.emit('game-state', EncodedJSON(serialised_game_state), room=GAME_ROOM)
+        if self._compact_session_ids:
+            await socketio_server.emit('game-state', encode_entities(serialised_game_state),
+                                       room=COMPACT_GAME_ROOM)
 
     async def _send_have_avatars_code_updated(self, player_id_to_workers):
+        emits = []
         socket_session_id_to_player_id_copy = self._socket_session_id_to_player_id.copy()
         for sid, player_id in socket_session_id_to_player_id_copy.items():
             if player_id_to_workers[player_id].has_code_updated:
-                await socketio_server.emit('feedback-avatar-updated', {}, room=sid)
+                emits.append(socketio_server.emit('feedback-avatar-updated', {}, room=sid))
+        await asyncio.gather(*emits)
+
+
+def create_change_listener():
+    """
+    With GAME_NOTIFICATIONS=udp the players are only refreshed when Django notifies the
+    game, or every SAFETY_POLL_INTERVAL seconds, rather than every turn.
+    """
+    if os.environ.get('GAME_NOTIFICATIONS', 'none') != 'udp':
+        return GameChangeListener()
+    return GameChangeListener(poll_interval=float(os.environ.get('SAFETY_POLL_INTERVAL',
+                                                                 SAFETY_POLL_INTERVAL)))
 
 
 def create_runner(port):
     settings = json.loads(os.environ['settings'])
     generator = getattr(map_generator, settings['GENERATOR'])(settings)
     worker_manager_class = WORKER_MANAGERS[os.environ.get('WORKER_MANAGER', 'local')]
+    http_client = HTTPClient(connect_timeout=float(os.environ.get('HTTP_CONNECT_TIMEOUT', CONNECT_TIMEOUT)),
+                             read_timeout=float(os.environ.get('HTTP_READ_TIMEOUT', READ_TIMEOUT)))
+    turn_deadline = TurnDeadline(percent=float(os.environ.get('TURN_DEADLINE_PERCENTILE', DEADLINE_PERCENTILE)),
+                                 min_deadline=float(os.environ.get('TURN_DEADLINE_MIN', MIN_DEADLINE)),
+                                 max_deadline=float(os.environ.get('TURN_DEADLINE_MAX', MAX_DEADLINE)))
     return GameRunner(worker_manager_class=worker_manager_class,
                       game_state_generator=generator.get_game_state,
                       django_api_url=os.environ.get('GAME_API_URL', 'http://localhost:8000/aimmo/api/games/'),
-                      port=port)
+                      port=port,
+                      http_client=http_client,
+                      turn_deadline=turn_deadline,
+                      change_listener=create_change_listener(),
+                      min_turn_time=float(os.environ.get('MIN_TURN_TIME', MIN_TURN_TIME)),
+                      pipelined=os.environ.get('PIPELINED_TURNS', 'false').lower() == 'true')
 
 
-def run_game(port):
+def run_game(host, port):
     game_runner = create_runner(port)
     game_api = GameAPI(game_state=game_runner.game_state,
                        worker_manager=game_runner.worker_manager)
     game_runner.set_end_turn_callback(game_api.send_updates)
-    asyncio.ensure_future(game_runner.run())
+    if game_runner.change_listener.poll_interval is not None:
+        # Django sends the notifications to the game's port, over UDP.
+        asyncio.ensure_future(listen_for_notifications(os.environ.get('GAME_ID'),
+                                                       game_runner.change_listener, host, port))
+    run_task = asyncio.ensure_future(game_runner.run())
+
+    async def stop_game(app):
+        run_task.cancel()
+        await game_runner.close()
+
+    app.on_cleanup.append(stop_game)
 
 
 if __name__ == '__main__':
@@ -156,7 +280,7 @@ if __name__ == '__main__':
     else:
         port = int(sys.argv[2])
 
-    run_game(port)
+    run_game(host, port)
 
     LOGGER.info("starting the server")
     web.run_app(app, host=host, port=port)
@@ -24,23 +24,23 @@ class Action(object):
     def target_location(self):
         return self._target_location
 
-    def register(self, world_map):
-        if world_map.is_on_map(self.target_location):
-            world_map.get_cell(self.target_location).actions.append(self)
+    def process(self, world_map, turn_actions=None):
+        """
+        Called externally to decide whether to process the action or not.
 
-    def process(self, world_map):
-        """Called externally to decide whether to process the action or not."""
-        if self._is_legal(world_map):
+        :param turn_actions: The actions registered this turn, see TurnActions.
+        """
+        if self._is_legal(world_map, turn_actions):
             self.avatar.previous_location = self.avatar.location
-            self._apply(world_map)
+            self._apply(world_map, turn_actions)
             self.avatar.orientation = self.avatar.calculate_orientation()
         else:
             self._reject()
 
-    def _is_legal(self, world_map):
+    def _is_legal(self, world_map, turn_actions):
         raise NotImplementedError('Abstract method')
 
-    def _apply(self, world_map):
+    def _apply(self, world_map, turn_actions):
         raise NotImplementedError('Abstract method')
 
     def _reject(self):
@@ -51,10 +51,10 @@ class WaitAction(Action):
     def __init__(self, avatar):
         super(WaitAction, self).__init__(avatar)
 
-    def _is_legal(self, world_map):
+    def _is_legal(self, world_map, turn_actions):
         return True
 
-    def _apply(self, world_map):
+    def _apply(self, world_map, turn_actions):
         self.avatar.clear_action()
 
 
@@ -63,13 +63,13 @@ class MoveAction(Action):
         self.direction = Direction(**direction)
         super(MoveAction, self).__init__(avatar)
 
-    def _is_legal(self, world_map):
-        return world_map.can_move_to(self.target_location)
+    def _is_legal(self, world_map, turn_actions):
+        return world_map.can_move_to(self.target_location, turn_actions)
 
-    def process(self, world_map):
-        self.detect_cycles(world_map, {self.avatar.location})
+    def process(self, world_map, turn_actions=None):
+        process_moves([self], world_map, turn_actions)
 
-    def _apply(self, world_map):
+    def _apply(self, world_map, turn_actions):
         event = MovedEvent(self.avatar.location, self.target_location)
         self.avatar.add_event(event)
 
@@ -81,23 +81,6 @@ class MoveAction(Action):
         self.avatar.clear_action()
         return True
 
-    def detect_cycles(self, world_map, visited):
-        if not self._is_legal(world_map):
-            return self._reject()
-
-        if self.target_location in visited:
-            return self._reject()
-
-        next_cell = world_map.get_cell(self.target_location)
-        if not next_cell.is_occupied:
-            return self._apply(world_map)
-
-        next_action = next_cell.avatar.action
-        if next_action.detect_cycles(world_map, visited | {self.target_location}):
-            return self._apply(world_map)
-
-        return self._reject()
-
     def _reject(self):
         event = FailedMoveEvent(self.avatar.location, self.target_location)
         self.avatar.add_event(event)
@@ -105,21 +88,59 @@ class MoveAction(Action):
         return False
 
 
+def process_moves(moves, world_map, turn_actions=None):
+    """
+    Applies or rejects all the given moves in one pass.
+
+    A cell can only be moved into by one avatar, so each move leads to at most one other
+    move, that of the avatar in its target cell. The moves therefore form chains, which
+    end in a free cell, a cell that can't be moved to, or a cycle. Each chain is
+    followed once from its first unresolved move, then all its moves succeed or fail
+    together. Successful moves are applied from the end of the chain backwards, so that
+    each cell is left before it is entered.
+    """
+    resolved_moves = set()
+    for first_move in moves:
+        if first_move in resolved_moves:
+            continue
+        chain = [first_move]
+        moves_in_chain = {first_move}
+        succeeded = False
+        move = first_move
+        while world_map.can_move_to(move.target_location, turn_actions):
+            next_avatar = world_map.get_cell(move.target_location).avatar
+            if next_avatar is None:
+                succeeded = True
+                break
+            move = next_avatar.action
+            if move in moves_in_chain:
+                break
+            chain.append(move)
+            moves_in_chain.add(move)
+
+        for move in reversed(chain):
+            if succeeded:
+                move._apply(world_map, turn_actions)
+            else:
+                move._reject()
+        resolved_moves.update(chain)
+
+
 class AttackAction(Action):
     def __init__(self, avatar, direction):
         self.direction = Direction(**direction)
         super(AttackAction, self).__init__(avatar)
 
-    def _is_legal(self, world_map):
-        return True if world_map.attackable_avatar(self.target_location) else False
+    def _is_legal(self, world_map, turn_actions):
+        return True if world_map.attackable_avatar(self.target_location, turn_actions) else False
 
-    def _apply(self, world_map):
-        attacked_avatar = world_map.attackable_avatar(self.target_location)
+    def _apply(self, world_map, turn_actions):
+        attacked_avatar = world_map.attackable_avatar(self.target_location, turn_actions)
         damage_dealt = 1
-        self.avatar.add_event(PerformedAttackEvent(attacked_avatar,
+        self.avatar.add_event(PerformedAttackEvent(attacked_avatar.player_id,
                                                    self.target_location,
                                                    damage_dealt))
-        attacked_avatar.add_event(ReceivedAttackEvent(self.avatar,
+        attacked_avatar.add_event(ReceivedAttackEvent(self.avatar.player_id,
                                                       damage_dealt))
         attacked_avatar.damage(damage_dealt)
 
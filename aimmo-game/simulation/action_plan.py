@@ -0,0 +1,45 @@
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+# The most turns a worker can plan ahead. This is below MAX_DELTA_TURNS, so that the
+# world map changes can still be sent when the plan runs out.
+MAX_PLAN_LENGTH = 5
+
+
+def _condition_holds(condition, avatar_state):
+    return all(avatar_state.get(key) == value for key, value in condition.items())
+
+
+class ActionPlan(object):
+    """
+    The actions a worker has planned for the next turns of its avatar, so that it isn't
+    sent a request for them.
+
+    Each step is a dictionary with the serialised 'action' and a 'condition', a
+    dictionary of the fields of the serialised avatar and the values they must have
+    for the action to still be valid, for example {'location': {'x': 1, 'y': 2}}.
+    """
+
+    def __init__(self, steps=()):
+        self.steps = list(steps)[:MAX_PLAN_LENGTH]
+
+    def next_action(self, avatar_state):
+        """
+        :param avatar_state: The serialised avatar, as sent to the workers.
+        :return: The planned action and the plan for the turns after it, or None if
+        the plan has run out or its next condition doesn't hold.
+        """
+        if not self.steps:
+            return None
+        step = self.steps[0]
+        try:
+            if not _condition_holds(step.get('condition', {}), avatar_state):
+                return None
+            return step['action'], ActionPlan(self.steps[1:])
+        except (AttributeError, KeyError, TypeError) as e:
+            LOGGER.error('Bad plan supplied by worker: %r', e)
+            return None
+
+    def __len__(self):
+        return len(self.steps)
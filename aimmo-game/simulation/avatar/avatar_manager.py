@@ -1,5 +1,7 @@
 from simulation.avatar.avatar_wrapper import AvatarWrapper
 from simulation.avatar.avatar_appearance import AvatarAppearance
+from simulation.event import EventLog
+from simulation.timer_wheel import TimerWheel
 
 
 class AvatarManager(object):
@@ -9,10 +11,16 @@ class AvatarManager(object):
 
     def __init__(self):
         self.avatars_by_id = {}
+        # The timed effects of all the avatars are scheduled on it.
+        self.effect_timers = TimerWheel()
+        # The events of all the avatars are recorded in it.
+        self.event_log = EventLog()
 
     def add_avatar(self, player_id, location):
         avatar = AvatarWrapper(player_id, location,
                                AvatarAppearance("#000", "#ddd", "#777", "#fff"))
+        avatar.effect_timers = self.effect_timers
+        avatar.event_log = self.event_log
         self.avatars_by_id[player_id] = avatar
         return avatar
 
@@ -28,7 +36,10 @@ class AvatarManager(object):
 
     @property
     def active_avatars(self):
-        return self.avatars[:]
+        """
+        A new list on every call, which the caller is free to change.
+        """
+        return self.avatars
 
     def serialise_players(self):
         """
@@ -20,23 +20,18 @@ class AvatarWrapper(object):
         self.orientation = "north"
         self.health = 5
         self.score = 0
-        self.events = []
         self.avatar_appearance = avatar_appearance
         self.effects = set()
+        # The TimerWheel the timed effects of the avatar are scheduled on, which is set
+        # by the AvatarManager the avatar is added to.
+        self.effect_timers = None
+        # The EventLog the events of the avatar are recorded in, also set by its manager.
+        self.event_log = None
         self.resistance = 0
         self.attack_strength = 1
         self.fog_of_war_modifier = 0
         self._action = None
 
-    def update_effects(self):
-        effects_to_remove = set()
-        for effect in self.effects:
-            effect.on_turn()
-            if effect.is_expired:
-                effects_to_remove.add(effect)
-        for effect in effects_to_remove:
-            effect.remove()
-
     @property
     def action(self):
         return self._action
@@ -95,7 +90,17 @@ class AvatarWrapper(object):
         self.location = respawn_location
 
     def add_event(self, event):
-        self.events.append(event)
+        if self.event_log is not None:
+            self.event_log.add(self.player_id, event)
+
+    @property
+    def events(self):
+        """
+        The events of the avatar this turn.
+        """
+        if self.event_log is None:
+            return []
+        return self.event_log.events_for(self.player_id)
 
     def damage(self, amount):
         applied_dmg = max(0, amount - self.resistance)
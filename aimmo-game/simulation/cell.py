@@ -1,11 +1,13 @@
-from simulation.action import MoveAction
-
-
 class Cell(object):
     """
     Any position on the world grid.
+
+    Changes to habitable, generates_score, pickup and avatar are reported to the world map the
+    cell belongs to, so that it can keep its indexes of interesting cells up to date.
     """
 
+    _world_map = None
+
     def __init__(self, location, habitable=True, generates_score=False,
                  partially_fogged=False):
         self.location = location
@@ -14,7 +16,6 @@ class Cell(object):
         self.avatar = None
         self.pickup = None
         self.partially_fogged = partially_fogged
-        self.actions = []
 
     def __repr__(self):
         return 'Cell({} h={} s={} a={} p={} f{})'.format(
@@ -30,9 +31,49 @@ class Cell(object):
     def __hash__(self):
         return hash(self.location)
 
+    def attach_to(self, world_map):
+        self._world_map = world_map
+        world_map.update_cell_indexes(self)
+
+    def _notify_world_map(self):
+        if self._world_map is not None:
+            self._world_map.update_cell_indexes(self)
+
+    @property
+    def habitable(self):
+        return self._habitable
+
+    @habitable.setter
+    def habitable(self, habitable):
+        self._habitable = habitable
+        self._notify_world_map()
+
+    @property
+    def generates_score(self):
+        return self._generates_score
+
+    @generates_score.setter
+    def generates_score(self, generates_score):
+        self._generates_score = generates_score
+        self._notify_world_map()
+
+    @property
+    def pickup(self):
+        return self._pickup
+
+    @pickup.setter
+    def pickup(self, pickup):
+        self._pickup = pickup
+        self._notify_world_map()
+
     @property
-    def moves(self):
-        return [move for move in self.actions if isinstance(move, MoveAction)]
+    def avatar(self):
+        return self._avatar
+
+    @avatar.setter
+    def avatar(self, avatar):
+        self._avatar = avatar
+        self._notify_world_map()
 
     @property
     def is_occupied(self):
@@ -40,11 +81,7 @@ class Cell(object):
 
     def serialise(self):
         if self.partially_fogged:
-            return {
-                'generates_score': self.generates_score,
-                'location': self.location.serialise(),
-                'partially_fogged': self.partially_fogged
-            }
+            return self.serialise_partially_fogged()
         else:
             return {
                 'avatar': self.avatar.serialise() if self.avatar else None,
@@ -54,3 +91,13 @@ class Cell(object):
                 'pickup': self.pickup.serialise() if self.pickup else None,
                 'partially_fogged': self.partially_fogged
             }
+
+    def serialise_partially_fogged(self):
+        """
+        The reduced form of the cell, sent for cells that are only partly in view.
+        """
+        return {
+            'generates_score': self.generates_score,
+            'location': self.location.serialise(),
+            'partially_fogged': True
+        }
@@ -0,0 +1,91 @@
+"""
+A compact binary encoding of the frontend game state, which clients can ask for
+instead of JSON (see GameAPI). The reference decoder is in
+game_frontend/src/redux/api/compactGameState.js.
+
+All numbers are little-endian. Every frame starts with a header of the format version
+and the kind of frame, followed by the fields of each entity type as flat arrays:
+
+Entities frame:
+    uint8 version, uint8 kind (1), uint16 players, uint16 pickups, uint16 score locations,
+    int32 terrain version,
+    int32[players] ids, int32[players] scores, int16[players] health,
+    int16[players * 2] locations, uint8[players] orientations,
+    uint8[pickups] types, int16[pickups * 2] locations,
+    int16[score locations * 2] locations
+
+Terrain frame:
+    uint8 version, uint8 kind (2), uint16 unused, int32 terrain version,
+    uint32 obstacles, int16[2] south west corner, int16[2] north east corner,
+    int16[obstacles * 2] locations
+"""
+import struct
+
+FORMAT_VERSION = 1
+ENTITIES_FRAME = 1
+TERRAIN_FRAME = 2
+
+# Codes of the enumerated values, their position in the tuple. Anything else is UNKNOWN.
+ORIENTATIONS = ('north', 'east', 'south', 'west')
+PICKUP_TYPES = ('health', 'invulnerability', 'damage_boost')
+UNKNOWN = 255
+
+_ENTITIES_HEADER = struct.Struct('<BBHHHi')
+_TERRAIN_HEADER = struct.Struct('<BBHiIhhhh')
+
+
+def _code(values, value):
+    try:
+        return values.index(value)
+    except ValueError:
+        return UNKNOWN
+
+
+def _pack(type_code, values):
+    return struct.pack('<{}{}'.format(len(values), type_code), *values)
+
+
+def _coordinates(items):
+    coordinates = []
+    for item in items:
+        location = item['location']
+        coordinates.append(location['x'])
+        coordinates.append(location['y'])
+    return coordinates
+
+
+def encode_entities(serialised_entities):
+    """
+    :param serialised_entities: The output of GameState.serialise_entities().
+    :return: The entities frame as bytes.
+    """
+    players = serialised_entities['players']
+    pickups = serialised_entities['pickups']
+    score_locations = serialised_entities['scoreLocations']
+    return b''.join((
+        _ENTITIES_HEADER.pack(FORMAT_VERSION, ENTITIES_FRAME, len(players), len(pickups),
+                              len(score_locations), serialised_entities['terrainVersion']),
+        _pack('i', [player['id'] for player in players]),
+        _pack('i', [player['score'] for player in players]),
+        _pack('h', [player['health'] for player in players]),
+        _pack('h', _coordinates(players)),
+        _pack('B', [_code(ORIENTATIONS, player['orientation']) for player in players]),
+        _pack('B', [_code(PICKUP_TYPES, pickup['type']) for pickup in pickups]),
+        _pack('h', _coordinates(pickups)),
+        _pack('h', _coordinates(score_locations)),
+    ))
+
+
+def encode_terrain(serialised_terrain):
+    """
+    :param serialised_terrain: The output of GameState.serialise_terrain().
+    :return: The terrain frame as bytes.
+    """
+    obstacles = serialised_terrain['obstacles']
+    south_west = serialised_terrain['southWestCorner']
+    north_east = serialised_terrain['northEastCorner']
+    return (_TERRAIN_HEADER.pack(FORMAT_VERSION, TERRAIN_FRAME, 0,
+                                 serialised_terrain['terrainVersion'], len(obstacles),
+                                 south_west['x'], south_west['y'],
+                                 north_east['x'], north_east['y']) +
+            _pack('h', _coordinates(obstacles)))
@@ -1,4 +1,14 @@
-import requests
+import asyncio
+import logging
+
+import aiohttp
+
+from simulation.http_client import HTTPError
+
+LOGGER = logging.getLogger(__name__)
+
+# The errors of a request to Django after which the game carries on as it was.
+REQUEST_ERRORS = (HTTPError, ValueError, aiohttp.ClientError, asyncio.TimeoutError)
 
 
 class DjangoCommunicator(object):
@@ -6,12 +16,50 @@ class DjangoCommunicator(object):
     This class encapsulates the communication between aimmo-game
     and the django server
     """
-    def __init__(self, django_api_url, completion_url):
+    def __init__(self, django_api_url, completion_url, http_client):
         self.django_api_url = django_api_url
         self.completion_url = completion_url
+        self.http_client = http_client
+        self._game_metadata = None
+        self._game_metadata_etag = None
+
+    async def get_game_metadata(self):
+        """
+        The metadata is requested conditionally on the last one received, which is
+        reused if Django replies that it hasn't changed.
+
+        :return: The metadata, or None if the request failed. A failed response is not
+        kept, so the next request is still made against the last metadata received.
+        """
+        headers = {}
+        if self._game_metadata_etag is not None:
+            headers['If-None-Match'] = self._game_metadata_etag
+        try:
+            response = await self.http_client.get(self.django_api_url, headers=headers)
+            if response.status == 304:
+                return self._game_metadata
+            response.raise_for_status()
+            game_metadata = response.json()
+        except REQUEST_ERRORS as e:
+            LOGGER.warning('Could not fetch the game metadata: %r', e)
+            return None
+        self._game_metadata = game_metadata
+        self._game_metadata_etag = response.headers.get('ETag')
+        return game_metadata
 
-    def get_game_metadata(self):
-        return requests.get(self.django_api_url).json()
+    async def get_avatar_code(self, avatar_ids):
+        """
+        :return: The id, code and code revision of each of the given avatars, or None
+        if the request failed.
+        """
+        try:
+            response = await self.http_client.get(self.django_api_url + 'code/',
+                                                  params={'ids': ','.join(str(avatar_id) for avatar_id in avatar_ids)})
+            response.raise_for_status()
+            return response.json()['users']
+        except REQUEST_ERRORS as e:
+            LOGGER.warning('Could not fetch the code of avatars %s: %r', avatar_ids, e)
+            return None
 
-    def mark_game_complete(self, data=None):
-        return requests.post(requests.post(self.completion_url, json=data))
+    async def mark_game_complete(self, data=None):
+        return await self.http_client.post(self.completion_url, json=data)
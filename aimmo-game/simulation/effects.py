@@ -13,28 +13,43 @@ class _Effect(object):
         self.is_expired = False
 
     @abstractmethod
-    def on_turn(self):
+    def remove(self):
         raise NotImplementedError()
 
 
 class _TimedEffect(_Effect):
+    """
+    An effect which is removed EFFECT_TIME turns after it starts. The removal is scheduled
+    on the effect timers of the avatar's manager, so the effect isn't visited on the turns
+    in between.
+    """
     __metaclass__ = ABCMeta
     EFFECT_TIME = 10
 
     def __init__(self, *args):
         super(_TimedEffect, self).__init__(*args)
-        self._time_remaining = self.EFFECT_TIME
+        self._timer_wheel = self._avatar.effect_timers
+        self._expiry_turn = None
+        if self._timer_wheel is not None:
+            self._expiry_turn = self._timer_wheel.schedule(self._expire, self.EFFECT_TIME)
+
+    @property
+    def time_remaining(self):
+        if self._timer_wheel is None:
+            return self.EFFECT_TIME
+        return self._expiry_turn - self._timer_wheel.turn
+
+    def _expire(self):
+        self.is_expired = True
+        self.remove()
 
     def remove(self):
         try:
             self._avatar.effects.remove(self)
         except KeyError as e:
             raise KeyError("The avatar object does not exist! Cannot remove the effect.")
-
-    def on_turn(self):
-        self._time_remaining -= 1
-        if self._time_remaining <= 0:
-            self.is_expired = True
+        if self._timer_wheel is not None and not self.is_expired:
+            self._timer_wheel.cancel(self._expire, self._expiry_turn)
 
 
 class InvulnerabilityPickupEffect(_TimedEffect):
@@ -1,11 +1,18 @@
-from collections import namedtuple
+from collections import defaultdict, deque, namedtuple
 
+from simulation.location import Location
+
+# How many events the game keeps. The older ones are dropped as new ones come in.
+EVENT_LOG_CAPACITY = 10000
+
+# The events refer to the other avatars by their player id, so that they don't keep
+# them alive after they have left the game.
 ReceivedAttackEvent = namedtuple(
-    'ReceivedAttackEvent', ['attacking_avatar', 'damage_dealt'])
+    'ReceivedAttackEvent', ['attacking_avatar_id', 'damage_dealt'])
 
 PerformedAttackEvent = namedtuple(
     'PerformedAttackEvent',
-    ['attacked_avatar', 'target_location', 'damage_dealt'])
+    ['attacked_avatar_id', 'target_location', 'damage_dealt'])
 
 FailedAttackEvent = namedtuple(
     'FailedAttackEvent', ['target_location'])
@@ -15,3 +22,53 @@ MovedEvent = namedtuple(
 
 FailedMoveEvent = namedtuple(
     'FailedMoveEvent', ['source_location', 'target_location'])
+
+EventRecord = namedtuple('EventRecord', ['turn', 'player_id', 'event'])
+
+
+def serialise_event(event):
+    serialised = {'type': type(event).__name__}
+    for field, value in event._asdict().items():
+        serialised[field] = value.serialise() if isinstance(value, Location) else value
+    return serialised
+
+
+class EventLog(object):
+    """
+    The events of the latest turns of the game.
+
+    The events are recorded in a ring buffer of fixed capacity, so that the log doesn't
+    grow over a long game. The events of the current turn are also kept by player id,
+    for the views of the avatars sent to the workers.
+    """
+
+    def __init__(self, capacity=EVENT_LOG_CAPACITY):
+        self.turn = 0
+        self._records = deque(maxlen=capacity)
+        self._current_turn_events = defaultdict(list)
+
+    def start_turn(self):
+        self.turn += 1
+        self._current_turn_events = defaultdict(list)
+
+    def add(self, player_id, event):
+        self._records.append(EventRecord(self.turn, player_id, event))
+        self._current_turn_events[player_id].append(event)
+
+    def events_for(self, player_id):
+        """
+        :return: The events of the given avatar this turn.
+        """
+        return list(self._current_turn_events.get(player_id, ()))
+
+    def serialise_events_for(self, player_id):
+        return [serialise_event(event) for event in self._current_turn_events.get(player_id, ())]
+
+    def records(self):
+        """
+        :return: The recorded events of all the avatars, oldest first.
+        """
+        return list(self._records)
+
+    def __len__(self):
+        return len(self._records)
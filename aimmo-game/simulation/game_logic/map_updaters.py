@@ -26,7 +26,7 @@ class ScoreLocationUpdater(_MapUpdater):
             if random.random() < world_map.settings['SCORE_DESPAWN_CHANCE']:
                 cell.generates_score = False
 
-        new_num_score_locations = len(list(world_map.score_cells()))
+        new_num_score_locations = len(world_map.score_cells())
         target_num_score_locations = int(math.ceil(
             context.num_avatars * world_map.settings['TARGET_NUM_SCORE_LOCATIONS_PER_AVATAR']
         ))
@@ -41,7 +41,7 @@ class PickupUpdater(_MapUpdater):
         target_num_pickups = int(math.ceil(
             context.num_avatars * world_map.settings['TARGET_NUM_PICKUPS_PER_AVATAR']
         ))
-        max_num_pickups_to_add = target_num_pickups - len(list(world_map.pickup_cells()))
+        max_num_pickups_to_add = target_num_pickups - len(world_map.pickup_cells())
         locations = world_map._spawn_location_finder.get_random_spawn_locations(max_num_pickups_to_add)
         for cell in locations:
             if random.random() < world_map.settings['PICKUP_SPAWN_CHANCE']:
@@ -68,8 +68,8 @@ class MapExpander(_MapUpdater):
 
     def _add_vertical_layer(self, world_map, x):
         for y in range(world_map.min_y(), world_map.max_y() + 1):
-            world_map.grid[Location(x, y)] = Cell(Location(x, y))
+            world_map.add_cell(Cell(Location(x, y)))
 
     def _add_horizontal_layer(self, world_map, y):
         for x in range(world_map.min_x(), world_map.max_x() + 1):
-            world_map.grid[Location(x, y)] = Cell(Location(x, y))
+            world_map.add_cell(Cell(Location(x, y)))
@@ -4,29 +4,103 @@ from logging import getLogger
 LOGGER = getLogger(__name__)
 
 
+class IndexedSet(object):
+    """
+    A set which also supports picking a uniformly random item, all in O(1).
+
+    Items are kept in a list, with a dict from item identity to its position in the
+    list. Removing an item swaps the last item of the list into its place.
+    """
+
+    def __init__(self, items=()):
+        self._items = []
+        self._positions = {}
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        if id(item) in self._positions:
+            return
+        self._positions[id(item)] = len(self._items)
+        self._items.append(item)
+
+    def discard(self, item):
+        position = self._positions.pop(id(item), None)
+        if position is None:
+            return
+        last_item = self._items.pop()
+        if last_item is not item:
+            self._items[position] = last_item
+            self._positions[id(last_item)] = position
+
+    def sample(self, count, rng=random):
+        """
+        :return: Up to count distinct items, chosen uniformly at random.
+        """
+        count = min(count, len(self._items))
+        return [self._items[i] for i in rng.sample(range(len(self._items)), count)]
+
+    def __contains__(self, item):
+        return id(item) in self._positions
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+
+def is_free(cell):
+    return (cell.habitable and not
+            cell.generates_score and not
+            cell.avatar and not
+            cell.pickup)
+
+
 class SpawnLocationFinder:
+    """
+    Keeps an index of the free cells of the map (habitable, with no score, avatar or
+    pickup), which the world map updates whenever a cell changes.
+    """
 
     def __init__(self, world_map):
         self._world_map = world_map
+        self._free_cells = None
+
+    def _get_free_cells(self):
+        """
+        The index is built on first use, from then on it is updated through update_cell.
+        """
+        if self._free_cells is None:
+            self._free_cells = IndexedSet(c for c in self._world_map.all_cells() if is_free(c))
+        return self._free_cells
+
+    def update_cell(self, cell):
+        if self._free_cells is None:
+            return
+        if is_free(cell):
+            self._free_cells.add(cell)
+        else:
+            self._free_cells.discard(cell)
 
     def potential_spawn_locations(self):
         """
         Used to make sure that the cell is free before spawning.
         """
-        return (c for c in self._world_map.all_cells()
-                if c.habitable and not
-                c.generates_score and not
-                c.avatar and not
-                c.pickup)
+        return (c for c in self._get_free_cells() if is_free(c))
 
     def get_random_spawn_locations(self, max_locations):
-        if max_locations <= 0:
-            return []
-        potential_locations = list(self.potential_spawn_locations())
-        try:
-            return random.sample(potential_locations, max_locations)
-        except ValueError:
-            return potential_locations
+        free_cells = self._get_free_cells()
+        locations = []
+        while len(locations) < max_locations and len(free_cells) > 0:
+            for cell in free_cells.sample(max_locations - len(locations)):
+                # Drop any cell that was changed without the map being told about it.
+                free_cells.discard(cell)
+                if is_free(cell):
+                    locations.append(cell)
+        for cell in locations:
+            free_cells.add(cell)
+        return locations
 
     def get_random_spawn_location(self):
         """Return a single random spawn location.
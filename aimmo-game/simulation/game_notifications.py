@@ -0,0 +1,71 @@
+import asyncio
+import json
+import logging
+import time
+
+LOGGER = logging.getLogger(__name__)
+
+# How often the players are refreshed without being notified, in seconds, in case a
+# notification was lost.
+SAFETY_POLL_INTERVAL = 30
+
+
+class GameChangeListener(object):
+    """
+    Tells the game when to refresh its players from Django.
+
+    Without a poll interval the players are refreshed every turn. With one, they are
+    refreshed when Django notifies the game that its players or their code have changed,
+    and at least once per interval.
+    """
+
+    def __init__(self, poll_interval=None, clock=time.monotonic):
+        self.poll_interval = poll_interval
+        self._clock = clock
+        self._changed = True
+        self._last_refresh = None
+
+    def notify(self):
+        self._changed = True
+
+    @property
+    def refresh_due(self):
+        return (self.poll_interval is None or self._changed or
+                self._clock() - self._last_refresh >= self.poll_interval)
+
+    def refreshed(self):
+        """
+        Called before the players are fetched, so that a notification received while
+        they are being fetched still triggers another refresh.
+        """
+        self._changed = False
+        self._last_refresh = self._clock()
+
+
+class GameNotificationProtocol(asyncio.DatagramProtocol):
+    """
+    Receives the notifications Django publishes over UDP, see aimmo/notifications.py.
+    Each datagram is a JSON object with the id of the game which has changed.
+    """
+
+    def __init__(self, game_id, listener):
+        self.game_id = game_id
+        self.listener = listener
+
+    def datagram_received(self, data, addr):
+        try:
+            game_id = json.loads(data.decode('utf-8'))['game_id']
+        except (ValueError, KeyError, TypeError):
+            LOGGER.warning('Ignoring malformed game notification from %s', addr)
+            return
+        if str(game_id) == str(self.game_id):
+            self.listener.notify()
+
+
+async def listen_for_notifications(game_id, listener, host, port):
+    """
+    :return: The transport of the UDP endpoint the notifications are received on.
+    """
+    transport, _ = await asyncio.get_event_loop().create_datagram_endpoint(
+        lambda: GameNotificationProtocol(game_id, listener), local_addr=(host, port))
+    return transport
@@ -1,26 +1,46 @@
-import time
 import threading
 import logging
 import asyncio
 import concurrent.futures
 
 from simulation.django_communicator import DjangoCommunicator
+from simulation.game_notifications import GameChangeListener
+from simulation.http_client import HTTPClient
+from simulation.turn_deadline import TurnDeadline
 from simulation.simulation_runner import ConcurrentSimulationRunner
 from simulation.avatar.avatar_manager import AvatarManager
 
 LOGGER = logging.getLogger(__name__)
 
-TURN_TIME = 2
+# The shortest a turn can be, in seconds. Turns end early when all the workers have
+# replied, but never run faster than this.
+MIN_TURN_TIME = 1
 
 
 class GameRunner:
-    def __init__(self, worker_manager_class, game_state_generator, django_api_url, port):
+    def __init__(self, worker_manager_class, game_state_generator, django_api_url, port,
+                 http_client=None, pipelined=False, turn_deadline=None, change_listener=None,
+                 min_turn_time=MIN_TURN_TIME):
+        """
+        :param turn_deadline: The TurnDeadline giving how long to wait for the workers.
+        :param change_listener: The GameChangeListener telling when to refresh the
+        players, every turn by default.
+        :param pipelined: Overlap the worker requests of each turn with the broadcast of
+        the previous one, see update_pipelined.
+        :param min_turn_time: The shortest a turn can be, in seconds.
+        """
         super(GameRunner, self).__init__()
 
-        self.worker_manager = worker_manager_class(port=port)
+        self.pipelined = pipelined
+        self.min_turn_time = min_turn_time
+        self.turn_deadline = TurnDeadline() if turn_deadline is None else turn_deadline
+        self.change_listener = GameChangeListener() if change_listener is None else change_listener
+        self.http_client = HTTPClient() if http_client is None else http_client
+        self.worker_manager = worker_manager_class(port=port, http_client=self.http_client)
         self.game_state = game_state_generator(AvatarManager())
         self.communicator = DjangoCommunicator(django_api_url=django_api_url,
-                                               completion_url=django_api_url + 'complete/')
+                                               completion_url=django_api_url + 'complete/',
+                                               http_client=self.http_client)
         self.simulation_runner = ConcurrentSimulationRunner(communicator=self.communicator,
                                                             game_state=self.game_state)
         self._end_turn_callback = lambda: None
@@ -44,8 +64,23 @@ class GameRunner:
     def update_main_user(self, game_metadata):
         self.game_state.main_avatar_id = game_metadata['main_avatar']
 
-    def update_workers(self):
-        game_metadata = self.communicator.get_game_metadata()['main']
+    async def update_players(self):
+        """
+        Adds and removes the workers and avatars of the players who have joined or
+        left the game, and fetches the code of the players whose code revision has
+        changed. This is skipped unless the change listener says a refresh is due.
+
+        If Django can't be reached the players are kept as they are for this turn, and
+        refreshed again on the next one.
+        """
+        if not self.change_listener.refresh_due:
+            return
+        self.change_listener.refreshed()
+        game_metadata = await self.communicator.get_game_metadata()
+        if game_metadata is None:
+            self.change_listener.notify()
+            return
+        game_metadata = game_metadata['main']
 
         users_to_add = self.get_users_to_add(game_metadata)
         users_to_delete = self.get_users_to_delete(game_metadata)
@@ -54,20 +89,81 @@ class GameRunner:
         self.worker_manager.delete_workers(users_to_delete)
         self.game_state.add_avatars(users_to_add)
         self.game_state.delete_avatars(users_to_delete)
-        self.worker_manager.update_worker_codes(game_metadata['users'])
+
+        players_with_changed_code = self.worker_manager.get_players_with_changed_code(game_metadata['users'])
+        if players_with_changed_code:
+            players = await self.communicator.get_avatar_code(players_with_changed_code)
+            if players is None:
+                self.change_listener.notify()
+            else:
+                self.worker_manager.update_worker_codes(players)
 
         self.update_main_user(game_metadata)
-        self.worker_manager.fetch_all_worker_data(self.game_state.get_serialised_game_states_for_workers())
+
+    def get_turn_deadline(self):
+        return self.turn_deadline.get_deadline(self.worker_manager.player_id_to_worker.values())
+
+    def get_serialised_game_states_for_workers(self):
+        return self.game_state.get_serialised_game_states_for_workers(
+            self.worker_manager.get_player_id_to_acknowledged_turn())
+
+    async def update_workers(self):
+        await self.update_players()
+        await self.worker_manager.fetch_all_worker_data(self.get_serialised_game_states_for_workers(),
+                                                        deadline=self.get_turn_deadline())
 
     async def update_simulation(self, player_id_to_serialised_actions):
         await self.simulation_runner.run_single_turn(player_id_to_serialised_actions)
         await self._end_turn_callback()
 
     async def update(self):
-        self.update_workers()
+        await self.update_workers()
         await self.update_simulation(self.worker_manager.get_player_id_to_serialised_actions())
         self.worker_manager.clear_logs()
 
+    async def update_pipelined(self):
+        """
+        Simulates the turn the workers have already sent their actions for, and sends
+        the requests for the next turn as soon as its state is ready. The turn is
+        broadcast while the workers think.
+
+        Nothing changes the game state between the requests being serialised and the
+        next call, so the actions are always applied to the state they were decided on.
+        The replies are only given to the workers after the broadcast, which still needs
+        the logs of the turn that has just been simulated.
+        """
+        await self.simulation_runner.run_single_turn(
+            self.worker_manager.get_player_id_to_serialised_actions())
+        await self.update_players()
+        next_turn_requests = asyncio.ensure_future(self.worker_manager.request_all_worker_data(
+            self.get_serialised_game_states_for_workers(), deadline=self.get_turn_deadline()))
+        # Let the requests go out before the broadcast starts.
+        await asyncio.sleep(0)
+        await self._end_turn_callback()
+        self.worker_manager.clear_logs()
+        self.worker_manager.apply_worker_data(await next_turn_requests)
+
+    async def run_turn(self, update):
+        """
+        Runs a turn with the given update, then sleeps for what is left of the minimum
+        turn time. The sleep always yields to the event loop, even when the turn took
+        longer, so that the sockets and routes are served between turns.
+        """
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+        await update()
+        await asyncio.sleep(max(self.min_turn_time - (loop.time() - start), 0))
+
+    async def close(self):
+        """
+        Closes the connections of the HTTP client, once the game has stopped running.
+        """
+        await self.http_client.close()
+
     async def run(self):
+        if self.pipelined:
+            await self.update_workers()
+            while True:
+                await self.run_turn(self.update_pipelined)
         while True:
-            await self.update()
+            await self.run_turn(self.update)
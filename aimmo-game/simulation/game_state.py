@@ -1,7 +1,94 @@
+import json
+from collections import OrderedDict
 from threading import RLock
 from simulation.pickups import serialise_pickups
 
 
+# How many turns back a worker can be and still be sent only the changed cells.
+MAX_DELTA_TURNS = 10
+
+
+def encode_json(data):
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+class WorkerStateView(object):
+    """
+    The game state as seen by a single worker. The world map is already encoded to JSON,
+    so that workers with the same view can share it, and only the small avatar state
+    and the worker's own fields are encoded when the request is sent.
+    """
+
+    def __init__(self, avatar_state, encoded_world_map, turn=None, encoded_changes=None):
+        """
+        :param encoded_changes: Optionally, the cells changed since the last turn the
+        worker acknowledged, which are sent instead of the whole world map.
+        """
+        self.avatar_state = avatar_state
+        self.encoded_world_map = encoded_world_map
+        self.turn = turn
+        self.encoded_changes = encoded_changes
+
+    def encode(self, full=False, **fields):
+        """
+        :param full: Send the whole world map even if the changes are available.
+        :return: The JSON encoded view as bytes, with the given fields spliced in.
+        """
+        if full or self.encoded_changes is None:
+            encoded_world_map = self.encoded_world_map
+        else:
+            encoded_world_map = self.encoded_changes
+        parts = [b'"avatar_state":' + encode_json(self.avatar_state),
+                 b'"world_map":' + encoded_world_map,
+                 b'"turn":' + encode_json(self.turn)]
+        parts.extend(encode_json(key) + b':' + encode_json(value) for key, value in fields.items())
+        return b'{' + b','.join(parts) + b'}'
+
+
+class _WorldMapEncoder(object):
+    """
+    Encodes the world map for the workers of a single turn. Each cell is encoded at most
+    once in each of its forms, and the whole map is encoded at most once and shared by
+    all the avatars that can see all of it.
+    """
+
+    def __init__(self, world_map):
+        self._world_map = world_map
+        self._encoded_whole_map = None
+        self._encoded_cells = {}
+        self._encoded_fogged_cells = {}
+
+    def _encode_cell(self, cell, partially_fogged):
+        if partially_fogged:
+            cache, serialise = self._encoded_fogged_cells, cell.serialise_partially_fogged
+        else:
+            cache, serialise = self._encoded_cells, cell.serialise
+        try:
+            return cache[cell.location]
+        except KeyError:
+            encoded_cell = cache[cell.location] = encode_json(serialise())
+            return encoded_cell
+
+    def _encode_cells(self, encoded_cells):
+        return b'{"cells":[' + b','.join(encoded_cells) + b']}'
+
+    def encode_changes(self, base_turn, changed_locations):
+        encoded_cells = b','.join(self._encode_cell(self._world_map.get_cell(location), False)
+                                  for location in changed_locations)
+        return (b'{"base_turn":' + encode_json(base_turn) +
+                b',"changed_cells":[' + encoded_cells + b']}')
+
+    def encode_view(self, location, no_fog_distance, partial_fog_distance):
+        if self._world_map.view_covers_map(location, no_fog_distance):
+            if self._encoded_whole_map is None:
+                self._encoded_whole_map = self._encode_cells(
+                    encode_json(cell.serialise()) for cell in self._world_map.all_cells())
+            return self._encoded_whole_map
+        return self._encode_cells(
+            self._encode_cell(cell, partially_fogged) for cell, partially_fogged
+            in self._world_map.cells_in_view(location, no_fog_distance, partial_fog_distance))
+
+
 class GameState(object):
     """
     Encapsulates the entire game state, including avatars, their code, and the world.
@@ -12,6 +99,11 @@ class GameState(object):
         self.avatar_manager = avatar_manager
         self._completion_callback = completion_check_callback
         self.main_avatar_id = None
+        self.turn = 0
+        self._changed_locations_by_turn = OrderedDict()
+        # The players which were sent the whole map each turn. The changes can only be
+        # applied by a worker whose copy of the map is whole.
+        self._whole_map_players_by_turn = OrderedDict()
         self._lock = RLock()
 
     def add_avatar(self, player_id, location=None):
@@ -39,8 +131,7 @@ class GameState(object):
 
     def _update_effects(self):
         with self._lock:
-            for avatar in self.avatar_manager.active_avatars:
-                avatar.update_effects()
+            self.avatar_manager.effect_timers.advance()
 
     def update_environment(self):
         with self._lock:
@@ -57,26 +148,127 @@ class GameState(object):
             return self.avatar_manager.avatars_by_id[self.main_avatar_id]
 
     def serialise(self):
+        serialised = self.serialise_terrain()
+        serialised.update(self.serialise_entities())
+        return serialised
+
+    def serialise_terrain(self):
+        """
+        The static layer of the game state for the frontend, which only changes when the
+        terrain version does.
+        """
         return {
-            'era': "less_flat",
+            'terrainVersion': self.world_map.get_terrain_version(),
             'southWestCorner': self.world_map.get_serialised_south_west_corner(),
             'northEastCorner': self.world_map.get_serialised_north_east_corner(),
+            'obstacles': self.world_map.serialise_obstacles()
+        }
+
+    def serialise_entities(self):
+        """
+        The dynamic layer of the game state for the frontend, sent every turn.
+        """
+        return {
+            'era': "less_flat",
+            'terrainVersion': self.world_map.get_terrain_version(),
             'players': self.avatar_manager.serialise_players(),
             'pickups': serialise_pickups(self.world_map),
             'scoreLocations': (self.world_map.serialise_score_location()),
-            'obstacles': self.world_map.serialise_obstacles()
         }
 
+    def _fog_distances_for(self, avatar_wrapper):
+        return (self.world_map.get_no_fog_distance() + avatar_wrapper.fog_of_war_modifier,
+                self.world_map.get_partial_fog_distance() + avatar_wrapper.fog_of_war_modifier)
+
+    def _serialise_avatar_for_worker(self, avatar_wrapper):
+        avatar_state = avatar_wrapper.serialise()
+        avatar_state['events'] = self.avatar_manager.event_log.serialise_events_for(avatar_wrapper.player_id)
+        return avatar_state
+
     def serialise_for_worker(self, avatar_wrapper):
+        """
+        Each worker only gets the cells within the fog of war distances of its avatar.
+        """
         with self._lock:
+            no_fog_distance, partial_fog_distance = self._fog_distances_for(avatar_wrapper)
             return {
-                'avatar_state': avatar_wrapper.serialise(),
+                'avatar_state': self._serialise_avatar_for_worker(avatar_wrapper),
                 'world_map': {
-                    'cells': [cell.serialise() for cell in self.world_map.all_cells()]
+                    'cells': self.world_map.serialise_view(avatar_wrapper.location,
+                                                           no_fog_distance,
+                                                           partial_fog_distance)
                 }
             }
 
-    def get_serialised_game_states_for_workers(self):
+    def _record_turn_changes(self):
+        self.turn += 1
+        self._whole_map_players_by_turn[self.turn] = set()
+        while len(self._whole_map_players_by_turn) > MAX_DELTA_TURNS:
+            self._whole_map_players_by_turn.popitem(last=False)
+        changed_locations = self.world_map.take_changed_locations()
+        if changed_locations is None:
+            # The map can't tell us what changed, so no changes can be sent until the
+            # history has been rebuilt.
+            self._changed_locations_by_turn.clear()
+            return
+        self._changed_locations_by_turn[self.turn] = changed_locations
+        while len(self._changed_locations_by_turn) > MAX_DELTA_TURNS:
+            self._changed_locations_by_turn.popitem(last=False)
+
+    def _changed_locations_since(self, base_turn):
+        """
+        :return: The locations of all the cells which may differ between the given turn
+        and the current one, or None if they are not known.
+        """
+        if base_turn is None or base_turn >= self.turn:
+            return None
+        if base_turn + 1 not in self._changed_locations_by_turn:
+            return None
+        changed_locations = set()
+        for turn in range(base_turn + 1, self.turn + 1):
+            changed_locations |= self._changed_locations_by_turn[turn]
+        # The avatars' own state (health, score...) is serialised in their cells.
+        changed_locations.update(cell.location for cell in self.world_map.occupied_cells())
+        return changed_locations
+
+    def get_serialised_game_states_for_workers(self, player_id_to_acknowledged_turn=None):
+        """
+        Builds the view of every worker for this turn. The world map is encoded once and
+        shared, only the avatar state differs between workers.
+
+        Workers which see the whole map and have acknowledged a recent turn in which
+        they were sent the whole map as well are also given just the cells changed since
+        that turn.
+
+        :param player_id_to_acknowledged_turn: The last turn each worker has received.
+        :return: A dictionary of player ids to WorkerStateView objects.
+        """
+        if player_id_to_acknowledged_turn is None:
+            player_id_to_acknowledged_turn = {}
         with self._lock:
-            return {player_id: self.serialise_for_worker(avatar_wrapper) for player_id, avatar_wrapper
-                    in self.avatar_manager.avatars_by_id.items()}
+            self._record_turn_changes()
+            world_map_encoder = _WorldMapEncoder(self.world_map)
+            encoded_changes_by_base_turn = {}
+            state_views = {}
+            for player_id, avatar_wrapper in self.avatar_manager.avatars_by_id.items():
+                no_fog_distance, partial_fog_distance = self._fog_distances_for(avatar_wrapper)
+                location = avatar_wrapper.location
+                encoded_changes = None
+                if self.world_map.view_covers_map(location, no_fog_distance):
+                    self._whole_map_players_by_turn[self.turn].add(player_id)
+                    base_turn = player_id_to_acknowledged_turn.get(player_id)
+                    if player_id not in self._whole_map_players_by_turn.get(base_turn, ()):
+                        # The worker only has the part of the map it could see then.
+                        base_turn = None
+                    if base_turn not in encoded_changes_by_base_turn:
+                        changed_locations = self._changed_locations_since(base_turn)
+                        encoded_changes_by_base_turn[base_turn] = (
+                            None if changed_locations is None
+                            else world_map_encoder.encode_changes(base_turn, changed_locations))
+                    encoded_changes = encoded_changes_by_base_turn[base_turn]
+                state_views[player_id] = WorkerStateView(
+                    self._serialise_avatar_for_worker(avatar_wrapper),
+                    world_map_encoder.encode_view(location, no_fog_distance, partial_fog_distance),
+                    self.turn,
+                    encoded_changes)
+            return state_views
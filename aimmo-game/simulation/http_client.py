@@ -0,0 +1,103 @@
+import json
+
+import aiohttp
+from prometheus_client import Counter
+
+CONNECT_TIMEOUT = 1
+READ_TIMEOUT = 2
+# Open connections are kept alive for this long, so that they can be reused next turn.
+KEEPALIVE_TIMEOUT = 30
+MAX_CONNECTIONS = 100
+MAX_CONNECTIONS_PER_HOST = 4
+
+CONNECTIONS = Counter('aimmo_game_http_connections',
+                      'Connections used by the game for its HTTP requests.',
+                      ['reused'])
+REQUESTS = Counter('aimmo_game_http_requests', 'HTTP requests made by the game.')
+
+
+class HTTPError(Exception):
+    def __init__(self, status, url):
+        super(HTTPError, self).__init__('{} error for url {}'.format(status, url))
+        self.status = status
+
+
+class HTTPResponse(object):
+    """
+    A response whose body has already been read, so that its connection has gone back
+    to the pool.
+    """
+
+    def __init__(self, url, status, body, headers=None):
+        self.url = url
+        self.status = status
+        self.body = body
+        self.headers = {} if headers is None else headers
+
+    def json(self):
+        return json.loads(self.body.decode('utf-8'))
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise HTTPError(self.status, self.url)
+
+
+class HTTPClient(object):
+    """
+    A pool of keep-alive connections, shared by all the HTTP requests of a game to
+    its workers and to Django.
+
+    The session is created on first use, as it has to be created in the event loop.
+    """
+
+    def __init__(self, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 max_connections=MAX_CONNECTIONS, max_connections_per_host=MAX_CONNECTIONS_PER_HOST):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.new_connections = 0
+        self.reused_connections = 0
+        self._session = None
+
+    def _create_session(self):
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(self._on_connection_created)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+        connector = aiohttp.TCPConnector(limit=self.max_connections,
+                                         limit_per_host=self.max_connections_per_host,
+                                         keepalive_timeout=KEEPALIVE_TIMEOUT)
+        timeout = aiohttp.ClientTimeout(sock_connect=self.connect_timeout,
+                                        sock_read=self.read_timeout)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                     trace_configs=[trace_config])
+
+    async def _on_connection_created(self, session, context, params):
+        self.new_connections += 1
+        CONNECTIONS.labels(reused='false').inc()
+
+    async def _on_connection_reused(self, session, context, params):
+        self.reused_connections += 1
+        CONNECTIONS.labels(reused='true').inc()
+
+    async def request(self, method, url, **kwargs):
+        """
+        :return: An HTTPResponse. Raises aiohttp.ClientError if the request fails and
+        asyncio.TimeoutError if it takes longer than the timeouts.
+        """
+        if self._session is None:
+            self._session = self._create_session()
+        REQUESTS.inc()
+        async with self._session.request(method, url, **kwargs) as response:
+            return HTTPResponse(url, response.status, await response.read(), response.headers)
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -2,13 +2,12 @@ import logging
 import asyncio
 from abc import ABCMeta, abstractmethod
 from concurrent.futures import ALL_COMPLETED, ThreadPoolExecutor
-from simulation.action import PRIORITIES, WaitAction
+from simulation.action import PRIORITIES, WaitAction, process_moves
+from simulation.turn_actions import TurnActions
 from threading import Thread
 
 LOGGER = logging.getLogger(__name__)
 
-TURN_INTERVAL = 2
-
 
 class SimulationRunner(object):
     """
@@ -20,6 +19,7 @@ class SimulationRunner(object):
     def __init__(self, game_state, communicator):
         self.game_state = game_state
         self.communicator = communicator
+        self.turn_actions = None
 
     @abstractmethod
     async def run_turn(self, player_id_to_serialised_actions):
@@ -35,20 +35,20 @@ class SimulationRunner(object):
     def _register_actions(self, avatar, serialised_action):
         """
         Calls a function that constructs the action object, does error handling,
-        and finally registers it onto the avatar.
+        and finally registers it onto the avatar and in the actions of this turn.
 
         :param avatar: Avatar wrapper object
         :param serialised_action: A string representing the action
         """
         if avatar.decide_action(serialised_action):
-            avatar.action.register(self.game_state.world_map)
+            self.turn_actions.register(avatar.action)
 
     def _update_environment(self, game_state):
         num_avatars = len(game_state.avatar_manager.active_avatars)
         game_state.world_map.reconstruct_interactive_state(num_avatars)
 
-    def _mark_complete(self):
-        self.communicator.mark_game_complete(data=self.game_state.serialise())
+    async def _mark_complete(self):
+        await self.communicator.mark_game_complete(data=self.game_state.serialise())
 
     async def run_single_turn(self, player_id_to_serialised_actions):
         await self.run_turn(player_id_to_serialised_actions)
@@ -60,13 +60,15 @@ class SequentialSimulationRunner(SimulationRunner):
         """
         Get and apply each avatar's action in turn.
         """
+        self.game_state.avatar_manager.event_log.start_turn()
         avatars = self.game_state.avatar_manager.active_avatars
 
         for avatar in avatars:
+            # Each action is processed on its own, before the next one is registered.
+            self.turn_actions = TurnActions()
             await self._run_turn_for_avatar(avatar, player_id_to_serialised_actions[avatar.player_id])
-            location_to_clear = avatar.action.target_location
-            avatar.action.process(self.game_state.world_map)
-            self.game_state.world_map.clear_cell_actions(location_to_clear)
+            avatar.action.process(self.game_state.world_map, self.turn_actions)
+        self.turn_actions = None
 
 
 class ConcurrentSimulationRunner(SimulationRunner):
@@ -77,21 +79,22 @@ class ConcurrentSimulationRunner(SimulationRunner):
     async def run_turn(self, player_id_to_serialised_actions):
         """
         Concurrently get the intended actions from all avatars and register
-        them on the world map. Then apply actions in order of priority.
+        them in the actions of this turn. Then apply actions in order of priority, with
+        all the moves resolved together.
         """
 
+        self.game_state.avatar_manager.event_log.start_turn()
         avatars = self.game_state.avatar_manager.active_avatars
+        self.turn_actions = TurnActions()
         args = [(avatar, player_id_to_serialised_actions[avatar.player_id]) for avatar in avatars]
         await self.async_map(self._run_turn_for_avatar, args)
 
         # Waits applied first, then attacks, then moves.
         avatars.sort(key=lambda a: PRIORITIES[type(a.action)])
 
-        locations_to_clear = {a.action.target_location for a in avatars
-                              if a.action is not None}
-
-        for action in (a.action for a in avatars if a.action is not None):
-            action.process(self.game_state.world_map)
+        world_map = self.game_state.world_map
+        for action in (a.action for a in avatars if a.action is not None and not a.is_moving):
+            action.process(world_map, self.turn_actions)
+        process_moves([a.action for a in avatars if a.is_moving], world_map, self.turn_actions)
 
-        for location in locations_to_clear:
-            self.game_state.world_map.clear_cell_actions(location)
+        self.turn_actions = None
@@ -0,0 +1,39 @@
+from collections import defaultdict
+
+
+class TimerWheel(object):
+    """
+    Calls back timers on the turn they expire, such as the end of the timed effects.
+
+    The timers are kept in slots keyed by the turn they expire on, so advancing a turn
+    only touches the timers expiring on it, however many others are pending.
+    """
+
+    def __init__(self):
+        self.turn = 0
+        self._slots = defaultdict(list)
+
+    def schedule(self, callback, turns):
+        """
+        :param turns: In how many turns the callback is called, at least one.
+        :return: The turn the callback will be called on, which is needed to cancel it.
+        """
+        expiry_turn = self.turn + max(turns, 1)
+        self._slots[expiry_turn].append(callback)
+        return expiry_turn
+
+    def cancel(self, callback, expiry_turn):
+        slot = self._slots.get(expiry_turn)
+        if slot is None or callback not in slot:
+            return
+        slot.remove(callback)
+        if not slot:
+            del self._slots[expiry_turn]
+
+    def advance(self):
+        self.turn += 1
+        for callback in self._slots.pop(self.turn, ()):
+            callback()
+
+    def __len__(self):
+        return sum(len(slot) for slot in self._slots.values())
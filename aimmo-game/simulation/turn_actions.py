@@ -0,0 +1,34 @@
+from collections import defaultdict
+
+
+class TurnActions(object):
+    """
+    The actions the avatars intend to take this turn, indexed by their target location
+    and type.
+
+    The simulation runner builds one at the start of each turn and drops it once the turn
+    has been processed, so no turn state is left on the cells of the world map.
+    """
+
+    def __init__(self):
+        self._actions = defaultdict(list)
+        self._count = 0
+
+    def register(self, action):
+        self._actions[(action.target_location, type(action))].append(action)
+        self._count += 1
+
+    def actions_into(self, location, action_type):
+        """
+        :return: The actions of the given type targeting the location.
+        """
+        return self._actions.get((location, action_type), [])
+
+    def count(self, location, action_type):
+        """
+        :return: How many actions of the given type target the location.
+        """
+        return len(self.actions_into(location, action_type))
+
+    def __len__(self):
+        return self._count
@@ -0,0 +1,88 @@
+import math
+from collections import deque
+
+from prometheus_client import Gauge
+
+# The bounds of the turn deadline, in seconds.
+MIN_DEADLINE = 0.25
+MAX_DEADLINE = 2
+DEADLINE_PERCENTILE = 95
+# Extra time on top of the observed latency, as a factor of it.
+DEADLINE_HEADROOM = 1.25
+# How many of the latest requests of each worker are kept.
+LATENCY_WINDOW = 50
+# A worker which misses this many deadlines in a row is flagged as slow.
+SLOW_WORKER_MISSES = 3
+
+TURN_DEADLINE = Gauge('aimmo_game_turn_deadline_seconds',
+                      'How long the game waits for the workers each turn.')
+SLOW_WORKERS = Gauge('aimmo_game_slow_workers',
+                     'Workers which keep missing the turn deadline.')
+
+
+def percentile(sorted_values, percent):
+    """
+    :return: The nearest-rank percentile of a non-empty sorted list.
+    """
+    rank = int(math.ceil(percent / 100.0 * len(sorted_values)))
+    return sorted_values[max(rank, 1) - 1]
+
+
+class LatencyHistogram(object):
+    """
+    The response times of the latest requests to a worker, in seconds.
+    """
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._samples = deque(maxlen=window)
+
+    def record(self, seconds):
+        self._samples.append(seconds)
+
+    def samples(self):
+        return list(self._samples)
+
+    def percentile(self, percent):
+        """
+        :return: The given percentile of the latency, None if nothing has been recorded.
+        """
+        if not self._samples:
+            return None
+        return percentile(sorted(self._samples), percent)
+
+    def __len__(self):
+        return len(self._samples)
+
+
+class TurnDeadline(object):
+    """
+    Works out how long to wait for the workers each turn from their recent latencies.
+
+    The deadline is a percentile of the latencies of all the workers with some headroom,
+    kept between a minimum and a maximum. Workers flagged as slow are left out, so that
+    a single struggling worker does not hold up every turn.
+    """
+
+    def __init__(self, percent=DEADLINE_PERCENTILE, min_deadline=MIN_DEADLINE,
+                 max_deadline=MAX_DEADLINE, headroom=DEADLINE_HEADROOM):
+        self.percent = percent
+        self.min_deadline = min_deadline
+        self.max_deadline = max_deadline
+        self.headroom = headroom
+
+    def get_deadline(self, workers):
+        """
+        :param workers: The workers of this turn.
+        :return: The deadline in seconds.
+        """
+        workers = list(workers)
+        SLOW_WORKERS.set(sum(1 for worker in workers if worker.is_slow))
+        samples = sorted(sample for worker in workers if not worker.is_slow
+                         for sample in worker.latency.samples())
+        if samples:
+            deadline = percentile(samples, self.percent) * self.headroom
+            deadline = min(max(deadline, self.min_deadline), self.max_deadline)
+        else:
+            deadline = self.max_deadline
+        TURN_DEADLINE.set(deadline)
+        return deadline
@@ -1,43 +1,180 @@
+import asyncio
+import hashlib
 import logging
+import time
+
+import aiohttp
+from prometheus_client import Counter
+
+from simulation.action_plan import ActionPlan
+from simulation.turn_deadline import LatencyHistogram, SLOW_WORKER_MISSES
+from simulation.worker_health import WorkerHealth, STARTING, READY
 
-import requests
 LOGGER = logging.getLogger(__name__)
 
+# The reply used for a worker which isn't sent a request this turn.
+SKIPPED_TURN = {'action': {'action_type': 'wait'}, 'log': None, 'avatar_updated': False}
+
+PLANNED_TURNS = Counter('aimmo_game_planned_turns',
+                        'Turns for which a worker was not sent a request as it had planned its action.')
+
+
+def hash_code(code):
+    """
+    :return: The hash identifying a version of the avatar code, None if there is no code.
+    """
+    if code is None:
+        return None
+    return hashlib.sha256(code.encode('utf-8')).hexdigest()
+
 
 class Worker(object):
-    def __init__(self, worker_url):
+    def __init__(self, worker_url, http_client, ready_url=None):
+        """
+        :param ready_url: The readiness probe of the worker. Without one the worker is
+        assumed to be ready straight away.
+        """
         self.url = worker_url
+        self.ready_url = ready_url
+        self.http_client = http_client
+        self.health = WorkerHealth(state=READY if ready_url is None else STARTING)
         self.log = None
         self.code = None
+        self.code_revision = None
+        self.acknowledged_code_hash = None
         self.serialised_action = None
         self.has_code_updated = False
+        self.acknowledged_turn = None
+        self.latency = LatencyHistogram()
+        self.missed_deadlines = 0
+
+    @property
+    def code(self):
+        return self._code
+
+    @code.setter
+    def code(self, code):
+        self._code = code
+        self.code_hash = hash_code(code)
+        # The plan was made by the previous code.
+        self.plan = ActionPlan()
+
+    @property
+    def is_slow(self):
+        """
+        Whether the worker has missed the last few turn deadlines in a row.
+        """
+        return self.missed_deadlines >= SLOW_WORKER_MISSES
+
+    def record_missed_deadline(self, deadline):
+        """
+        The worker took at least as long as the deadline, which is recorded as its
+        latency so that the deadline can grow again if it was too tight.
+        """
+        self.latency.record(deadline)
+        self.missed_deadlines += 1
+        if self.missed_deadlines == SLOW_WORKER_MISSES:
+            LOGGER.warning('Worker %s has missed %s turn deadlines in a row', self.url,
+                           self.missed_deadlines)
 
     def _set_defaults(self):
         self.log = None
         self.serialised_action = None
         self.has_code_updated = False
+        self.acknowledged_turn = None
+        self.acknowledged_code_hash = None
+        self.plan = ActionPlan()
+
+    def _planned_data(self, action, plan):
+        """
+        :return: The data the worker would have replied with, had it been sent a request.
+        """
+        return {'action': action, 'log': None, 'avatar_updated': False, 'plan': plan.steps,
+                'turn': self.acknowledged_turn, 'code_hash': self.acknowledged_code_hash}
+
+    async def _post_state_view(self, state_view, full=False):
+        """
+        :param full: Send the whole map and the code, rather than what the worker is
+        missing since the last turn it acknowledged.
+        """
+        fields = {'code_hash': self.code_hash, 'options': {}, 'state': None}
+        if full or self.acknowledged_code_hash != self.code_hash:
+            fields['code'] = self.code
+        data = state_view.encode(full=full, **fields)
+        return await self.http_client.post(self.url, data=data,
+                                           headers={'Content-Type': 'application/json'})
+
+    async def probe(self):
+        """
+        Checks whether the worker's server is up, and updates its health with the result.
+        """
+        try:
+            response = await self.http_client.get(self.ready_url)
+            response.raise_for_status()
+        except asyncio.CancelledError:
+            # Cut off by the turn deadline, which says nothing about the worker.
+            raise
+        except Exception as e:
+            LOGGER.debug('Worker %s is not ready: %r', self.url, e)
+            self.health.record_failure()
+        else:
+            self.health.record_success()
 
-    def fetch_data(self, state_view):
+    async def request_data(self, state_view):
+        """
+        :param state_view: The WorkerStateView for this worker's avatar.
+        :return: The data the worker replied with, or None if the request failed.
+        Workers which have planned this turn aren't sent the request, and reply with
+        their planned action. Workers which aren't ready aren't sent the request either,
+        and reply SKIPPED_TURN.
+        """
+        planned = self.plan.next_action(state_view.avatar_state)
+        if planned is not None:
+            PLANNED_TURNS.inc()
+            return self._planned_data(*planned)
+        if not self.health.accepts_requests:
+            if self.health.probe_due and self.ready_url is not None:
+                await self.probe()
+            return SKIPPED_TURN
         try:
-            code_and_options = {
-                'code': self.code,
-                'options': {},
-                'state': None,
-            }
-            data = {**state_view, **code_and_options}
-            response = requests.post(self.url, json=data)
+            start = time.monotonic()
+            response = await self._post_state_view(state_view)
+            if response.status == 409:
+                # The worker does not have the turn the changes are based on or the code
+                # (for example if it has restarted), so it needs everything.
+                response = await self._post_state_view(state_view, full=True)
             response.raise_for_status()
-            data = response.json()
+            self.latency.record(time.monotonic() - start)
+            self.missed_deadlines = 0
+            self.health.record_success()
+            return response.json()
+        except aiohttp.ClientConnectionError:
+            LOGGER.info('Could not connect to worker %s', self.url)
+        except asyncio.TimeoutError:
+            LOGGER.info('Worker timed out')
+        except Exception as e:
+            LOGGER.exception('Unknown error while fetching turn data.')
+            LOGGER.exception(e)
+        self.health.record_failure()
+        return None
+
+    def update_from_data(self, data):
+        """
+        :param data: The reply of the worker for this turn, None if there wasn't one.
+        """
+        if data is None:
+            self._set_defaults()
+            return
+        try:
             self.serialised_action = data['action']
             self.log = data['log']
             self.has_code_updated = data['avatar_updated']
-        except requests.exceptions.ConnectionError:
-            LOGGER.info('Could not connect to worker, probably not ready yet')
-            self._set_defaults()
+            self.acknowledged_turn = data.get('turn')
+            self.acknowledged_code_hash = data.get('code_hash')
+            self.plan = ActionPlan(data.get('plan') or ())
         except KeyError as e:
             LOGGER.error('Missing key in data from worker: {}'.format(e))
             self._set_defaults()
-        except Exception as e:
-            LOGGER.exception('Unknown error while fetching turn data.')
-            LOGGER.exception(e)
-            self._set_defaults()
+
+    async def fetch_data(self, state_view):
+        self.update_from_data(await self.request_data(state_view))
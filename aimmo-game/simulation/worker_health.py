@@ -0,0 +1,62 @@
+import logging
+import time
+
+LOGGER = logging.getLogger(__name__)
+
+STARTING = 'starting'
+READY = 'ready'
+DEGRADED = 'degraded'
+OPEN = 'open'
+
+# Failed turn requests in a row after which a worker is no longer sent requests.
+FAILURES_TO_OPEN = 3
+# How long to wait before probing a worker which isn't ready, in seconds. The backoff
+# doubles after each failed probe.
+INITIAL_BACKOFF = 0.5
+MAX_BACKOFF = 30
+
+
+class WorkerHealth(object):
+    """
+    A circuit breaker for the turn requests of a worker.
+
+    A worker is starting until its readiness probe succeeds. A ready worker which fails
+    a turn request is degraded, but still sent requests, until it has failed
+    FAILURES_TO_OPEN requests in a row and its circuit opens. Starting and open workers
+    are not sent turn requests, and are probed with an exponential backoff until they
+    are ready again.
+    """
+
+    def __init__(self, state=STARTING, clock=time.monotonic):
+        self.state = state
+        self.failures = 0
+        self._clock = clock
+        self._backoff = INITIAL_BACKOFF
+        self._next_probe = clock()
+
+    @property
+    def accepts_requests(self):
+        return self.state in (READY, DEGRADED)
+
+    @property
+    def probe_due(self):
+        return not self.accepts_requests and self._clock() >= self._next_probe
+
+    def record_success(self):
+        if self.state != READY:
+            LOGGER.info('Worker is ready after being %s', self.state)
+        self.state = READY
+        self.failures = 0
+        self._backoff = INITIAL_BACKOFF
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == STARTING or self.state == OPEN:
+            self._next_probe = self._clock() + self._backoff
+            self._backoff = min(self._backoff * 2, MAX_BACKOFF)
+        elif self.failures >= FAILURES_TO_OPEN:
+            LOGGER.warning('Worker failed %s turn requests in a row, skipping it', self.failures)
+            self.state = OPEN
+            self._next_probe = self._clock() + self._backoff
+        else:
+            self.state = DEGRADED
@@ -54,6 +54,9 @@ class KubernetesWorkerManager(WorkerManager):
             ports=[client.V1ContainerPort(
                 container_port=5000,
                 protocol='TCP')],
+            readiness_probe=client.V1Probe(
+                http_get=client.V1HTTPGetAction(path='/ready/', port=5000),
+                period_seconds=1),
             resources=client.V1ResourceRequirements(
                 limits={'cpu': '10m', 'memory': '64Mi'},
                 requests={'cpu': '7m', 'memory': '32Mi'}),
@@ -1,48 +1,111 @@
+import asyncio
 import logging
-import time
+from collections import Counter
 
 from eventlet.semaphore import Semaphore
-from threading import Thread
 from concurrent import futures
 
-from simulation.worker import Worker
+from prometheus_client import Gauge
+
+from simulation.http_client import HTTPClient
+from simulation.worker import Worker, SKIPPED_TURN
+from simulation.worker_health import STARTING, READY, DEGRADED, OPEN
 
 LOGGER = logging.getLogger(__name__)
 
+HEALTH_STATES = (STARTING, READY, DEGRADED, OPEN)
+WORKERS = Gauge('aimmo_game_workers', 'Workers of the game by health state.', ['state'])
+
 
 class WorkerManager(object):
     """
     Methods of this class must be thread safe unless explicitly stated.
     """
-    def __init__(self, port=5000):
+    def __init__(self, port=5000, http_client=None):
+        """
+        :param http_client: The HTTPClient shared by the workers, a new one by default.
+        """
         self.player_id_to_worker = {}
         self.port = port
+        self.http_client = HTTPClient() if http_client is None else http_client
 
     def get_code(self, player_id):
         return self.player_id_to_worker[player_id].code
 
-    def fetch_all_worker_data(self, player_id_to_game_state):
-        """
-        Creates a thread for each worker to send a request for their data. After
-        a set duration these threads will close, giving a consistent turn time.
+    async def request_all_worker_data(self, player_id_to_game_state, deadline):
         """
-        def prepare_request_threads():
-            return [Thread(target=worker.fetch_data,
-                           args=(player_id_to_game_state[player_id],))
-                    for (player_id, worker) in self.player_id_to_worker.items()]
+        Sends the turn requests of all the workers concurrently, and waits until they
+        have all replied or the deadline has passed. Requests which haven't finished
+        by then are cancelled. The workers which aren't accepting requests may be
+        probed instead, and a probe cut off by the deadline doesn't count as a missed
+        deadline, since the worker wasn't sent the turn.
 
-        def timed_process_for_worker_turn_requests(duration):
-            threads = prepare_request_threads()
+        The workers themselves are not changed, see apply_worker_data.
 
-            [thread.setDaemon(True) for thread in threads]
-            [thread.start() for thread in threads]
-            time.sleep(duration)
-
-        timed_process_for_worker_turn_requests(2)
+        :param deadline: The maximum time to wait for the workers, in seconds.
+        :return: A dictionary of workers to the data they replied with, or None for
+        the workers which failed or missed the deadline.
+        """
+        self._update_health_metrics()
+        probing_workers = {worker for worker in self.player_id_to_worker.values()
+                           if not worker.health.accepts_requests}
+        worker_to_request = {worker: asyncio.ensure_future(
+                                 worker.request_data(player_id_to_game_state[player_id]))
+                             for player_id, worker in self.player_id_to_worker.items()}
+        if worker_to_request:
+            await asyncio.wait(worker_to_request.values(), timeout=deadline)
+
+        worker_to_data = {}
+        for worker, request in worker_to_request.items():
+            if request.done():
+                worker_to_data[worker] = request.result()
+            else:
+                request.cancel()
+                if worker in probing_workers:
+                    worker_to_data[worker] = SKIPPED_TURN
+                else:
+                    worker.record_missed_deadline(deadline)
+                    worker_to_data[worker] = None
+        return worker_to_data
+
+    def _update_health_metrics(self):
+        states = Counter(worker.health.state for worker in self.player_id_to_worker.values())
+        for state in HEALTH_STATES:
+            WORKERS.labels(state=state).set(states[state])
+
+    def apply_worker_data(self, worker_to_data):
+        for worker, data in worker_to_data.items():
+            worker.update_from_data(data)
+
+    async def fetch_all_worker_data(self, player_id_to_game_state, deadline):
+        """
+        Requests the data of all the workers, see request_all_worker_data, and updates
+        them with it. Workers which didn't reply make no action this turn.
+        """
+        self.apply_worker_data(await self.request_all_worker_data(player_id_to_game_state,
+                                                                  deadline))
 
     def get_player_id_to_serialised_actions(self):
         return {player_id: self.player_id_to_worker[player_id].serialised_action for player_id in self.player_id_to_worker}
 
+    def get_slow_player_ids(self):
+        """
+        :return: The players whose workers keep missing the turn deadline.
+        """
+        return [player_id for player_id, worker in self.player_id_to_worker.items()
+                if worker.is_slow]
+
+    def get_unavailable_player_ids(self):
+        """
+        :return: The players whose workers are starting or have their circuit open.
+        """
+        return [player_id for player_id, worker in self.player_id_to_worker.items()
+                if not worker.health.accepts_requests]
+
+    def get_player_id_to_acknowledged_turn(self):
+        return {player_id: worker.acknowledged_turn
+                for player_id, worker in self.player_id_to_worker.items()}
+
     def clear_logs(self):
         for worker in self.player_id_to_worker.values():
             worker.log = None
@@ -54,11 +117,23 @@ class WorkerManager(object):
         raise NotImplementedError
 
     def update_code(self, player):
-        self.player_id_to_worker[player['id']].code = player['code']
+        worker = self.player_id_to_worker[player['id']]
+        worker.code = player['code']
+        worker.code_revision = player['code_revision']
+
+    def get_players_with_changed_code(self, players):
+        """
+        :param players: The players of the game metadata, with their code revisions.
+        :return: The ids of the players whose workers don't have the latest code.
+        """
+        return [player['id'] for player in players
+                if player['id'] in self.player_id_to_worker and
+                self.player_id_to_worker[player['id']].code_revision != player['code_revision']]
 
     def add_new_worker(self, player_id):
         worker_url_base = self.create_worker(player_id)
-        self.player_id_to_worker[player_id] = Worker(f'{worker_url_base}/turn/')
+        self.player_id_to_worker[player_id] = Worker(f'{worker_url_base}/turn/', self.http_client,
+                                                     ready_url=f'{worker_url_base}/ready/')
 
     def _parallel_map(self, func, iterable_args):
         with futures.ThreadPoolExecutor() as executor:
@@ -1,6 +1,7 @@
 import math
 from logging import getLogger
 
+from simulation.action import MoveAction
 from simulation.level_settings import DEFAULT_LEVEL_SETTINGS
 from simulation.location import Location
 from simulation.game_logic import SpawnLocationFinder, ScoreLocationUpdater, MapContext, PickupUpdater, MapExpander
@@ -8,20 +9,49 @@ from simulation.cell import Cell
 
 LOGGER = getLogger(__name__)
 
+# The (min_x, max_x, min_y, max_y) of a map without cells, which has no rows or columns.
+EMPTY_BOUNDS = (0, -1, 0, -1)
+
 
 class WorldMap(object):
     """
     The non-player world state.
     """
 
-    def __init__(self, grid, settings):
+    def __init__(self, grid, settings, bounds=None):
         """
         :param grid: All types of cells to be inserted into the map.
         :param settings: Constant values provided when generating a level/map.
+        :param bounds: Optional (min_x, max_x, min_y, max_y) of the grid, if already known.
         """
         self.grid = grid
         self.settings = settings
         self._spawn_location_finder = SpawnLocationFinder(self)
+        self._bounds = list(bounds) if bounds is not None else self._bounds_from_grid()
+        self._score_cells = {}
+        self._pickup_cells = {}
+        self._occupied_cells = {}
+        self._obstacle_cells = {}
+        self._terrain_version = 0
+        self._changed_locations = set()
+        self._build_cell_indexes()
+
+    def _build_cell_indexes(self):
+        for cell in self.grid.values():
+            cell.attach_to(self)
+
+    def _bounds_from_grid(self):
+        """
+        Scans the grid once to find the bounding box of the map. After this, the bounds
+        are kept up to date by add_cell.
+
+        :return: A list of [min_x, max_x, min_y, max_y], or None if the grid is empty.
+        """
+        if not self.grid:
+            return None
+        xs = [location.x for location in self.grid.keys()]
+        ys = [location.y for location in self.grid.keys()]
+        return [min(xs), max(xs), min(ys), max(ys)]
 
     @classmethod
     def _min_max_from_dimensions(cls, height, width):
@@ -46,16 +76,48 @@ class WorldMap(object):
             for y in range(min_y, max_y + 1):
                 location = Location(x, y)
                 grid[location] = Cell(location)
-        return cls(grid, new_settings)
+        return cls(grid, new_settings, bounds=(min_x, max_x, min_y, max_y))
 
     def all_cells(self):
         return self.grid.values()
 
     def score_cells(self):
-        return (c for c in self.all_cells() if c.generates_score)
+        return list(self._score_cells.values())
 
     def pickup_cells(self):
-        return (c for c in self.all_cells() if c.pickup)
+        return list(self._pickup_cells.values())
+
+    def occupied_cells(self):
+        return list(self._occupied_cells.values())
+
+    def update_cell_indexes(self, cell):
+        """
+        Called by the cells of this map whenever one of the attributes we keep an index
+        of changes, so that the scans above don't need to walk the whole grid.
+        """
+        _set_membership(self._score_cells, cell, cell.generates_score)
+        _set_membership(self._pickup_cells, cell, cell.pickup is not None)
+        _set_membership(self._occupied_cells, cell, cell.is_occupied)
+        if _set_membership(self._obstacle_cells, cell, not cell.habitable):
+            self._terrain_version += 1
+        self._spawn_location_finder.update_cell(cell)
+        self._changed_locations.add(cell.location)
+
+    def get_terrain_version(self):
+        """
+        :return: A number which changes whenever the obstacles or the bounds of the map
+        change, so that the terrain only needs to be sent to clients when it does.
+        """
+        return self._terrain_version
+
+    def take_changed_locations(self):
+        """
+        :return: The set of locations of the cells which have been added or changed since
+        the last call. Changes to the state of the avatars themselves are not tracked,
+        look at the occupied cells for those.
+        """
+        changed_locations, self._changed_locations = self._changed_locations, set()
+        return changed_locations
 
     def is_on_map(self, location):
         try:
@@ -74,24 +136,38 @@ class WorldMap(object):
     def get_cell_by_coords(self, x, y):
         return self.get_cell(Location(x, y))
 
-    def clear_cell_actions(self, location):
-        try:
-            cell = self.get_cell(location)
-            cell.actions = []
-        except ValueError:
+    def add_cell(self, cell):
+        """
+        Inserts a cell into the grid, keeping the map bounds up to date. All cells added
+        after the map is created must go through this method.
+        """
+        location = cell.location
+        self.grid[location] = cell
+        cell.attach_to(self)
+        self._terrain_version += 1
+        if self._bounds is None:
+            self._bounds = [location.x, location.x, location.y, location.y]
             return
+        self._bounds[0] = min(self._bounds[0], location.x)
+        self._bounds[1] = max(self._bounds[1], location.x)
+        self._bounds[2] = min(self._bounds[2], location.y)
+        self._bounds[3] = max(self._bounds[3], location.y)
+
+    @property
+    def _current_bounds(self):
+        return EMPTY_BOUNDS if self._bounds is None else self._bounds
 
     def max_y(self):
-        return max(self.grid.keys(), key=lambda c: c.y).y
+        return self._current_bounds[3]
 
     def min_y(self):
-        return min(self.grid.keys(), key=lambda c: c.y).y
+        return self._current_bounds[2]
 
     def max_x(self):
-        return max(self.grid.keys(), key=lambda c: c.x).x
+        return self._current_bounds[1]
 
     def min_x(self):
-        return min(self.grid.keys(), key=lambda c: c.x).x
+        return self._current_bounds[0]
 
     @property
     def num_rows(self):
@@ -131,19 +207,23 @@ class WorldMap(object):
         ScoreLocationUpdater().update(self, context=context)
         PickupUpdater().update(self, context=context)
 
-    def can_move_to(self, target_location):
+    def can_move_to(self, target_location, turn_actions=None):
+        """
+        :param turn_actions: The actions registered this turn, if any, so that a cell
+        several avatars are trying to move into is refused.
+        """
         if not self.is_on_map(target_location):
             return False
         cell = self.get_cell(target_location)
 
         return (cell.habitable
                 and (not cell.is_occupied or cell.avatar.is_moving)
-                and len(cell.moves) <= 1)
+                and (turn_actions is None or turn_actions.count(target_location, MoveAction) <= 1))
 
-    def attackable_avatar(self, target_location):
+    def attackable_avatar(self, target_location, turn_actions=None):
         """
         Return a boolean if the avatar is attackable at the given location (or will be
-        after next move), else return None.
+        after next move, according to the actions registered this turn), else return None.
         """
         try:
             cell = self.get_cell(target_location)
@@ -153,8 +233,10 @@ class WorldMap(object):
         if cell.avatar:
             return cell.avatar
 
-        if len(cell.moves) == 1:
-            return cell.moves[0].avatar
+        if turn_actions is not None:
+            moves = turn_actions.actions_into(target_location, MoveAction)
+            if len(moves) == 1:
+                return moves[0].avatar
 
         return None
 
@@ -167,6 +249,44 @@ class WorldMap(object):
     def get_random_spawn_location(self):
         return self._spawn_location_finder.get_random_spawn_location()
 
+    def cells_in_view(self, location, no_fog_distance, partial_fog_distance):
+        """
+        Yields the cells in the square window around a location, together with whether
+        they are partially fogged: cells further than the no fog distance (but within the
+        partial fog distance) are partially fogged, cells further than that are skipped.
+
+        The window is clipped to the map, so the cost is O(min(distance^2, map area)).
+        """
+        min_x = max(self.min_x(), location.x - partial_fog_distance)
+        max_x = min(self.max_x(), location.x + partial_fog_distance)
+        min_y = max(self.min_y(), location.y - partial_fog_distance)
+        max_y = min(self.max_y(), location.y + partial_fog_distance)
+
+        for x in range(min_x, max_x + 1):
+            for y in range(min_y, max_y + 1):
+                try:
+                    cell = self.get_cell_by_coords(x, y)
+                except ValueError:
+                    continue
+                yield cell, max(abs(x - location.x), abs(y - location.y)) > no_fog_distance
+
+    def view_covers_map(self, location, no_fog_distance):
+        """
+        :return: True if every cell of the map is fully in view from the location.
+        """
+        return (location.x - no_fog_distance <= self.min_x() and
+                location.x + no_fog_distance >= self.max_x() and
+                location.y - no_fog_distance <= self.min_y() and
+                location.y + no_fog_distance >= self.max_y())
+
+    def serialise_view(self, location, no_fog_distance, partial_fog_distance):
+        """
+        Serialises only the cells in view from a location, see cells_in_view.
+        """
+        return [cell.serialise_partially_fogged() if partially_fogged else cell.serialise()
+                for cell, partially_fogged
+                in self.cells_in_view(location, no_fog_distance, partial_fog_distance)]
+
     def __repr__(self):
         return repr(self.grid)
 
@@ -213,11 +333,11 @@ class WorldMap(object):
         def get_coords(cell):
             return {'location': {'x': cell.location.x, 'y': cell.location.y}}
 
-        return [get_coords(cell) for cell in self.all_cells() if cell.generates_score]
+        return [get_coords(cell) for cell in self.score_cells()]
 
     def serialise_obstacles(self):
         """
-        Used to serialise the obstacle locations on every update.
+        Used to serialise the obstacle locations whenever the terrain changes.
 
         :return: A list that contains all the obstacle information generated by inner method.
         """
@@ -233,7 +353,22 @@ class WorldMap(object):
                     'orientation': "north",
                     }
 
-        return [serialise_obstacle(cell) for cell in self.all_cells() if not cell.habitable]
+        return [serialise_obstacle(cell) for cell in self._obstacle_cells.values()]
+
+
+def _set_membership(index, cell, is_member):
+    """
+    The indexes are keyed by the identity of the cell, as cells compare equal by
+    location, and kept in insertion order so that iteration is deterministic.
+
+    :return: True if the membership of the cell has changed.
+    """
+    if is_member:
+        if id(cell) in index:
+            return False
+        index[id(cell)] = cell
+        return True
+    return index.pop(id(cell), None) is not None
 
 
 def WorldMapStaticSpawnDecorator(world_map, spawn_location):
@@ -47,7 +47,7 @@ class TestEffectExpiry(TestCase):
             ))
 
         self.assertTrue(isinstance(list(self.avatar.effects)[0], pickup_created.EFFECT))
-        self.assertEqual(list(self.avatar.effects)[0]._time_remaining, 5)
+        self.assertEqual(list(self.avatar.effects)[0].time_remaining, 5)
         self.assertEqual(self.avatar.attack_strength, 11)
 
         # Run 5 more turns and expect the effect to expire.
@@ -74,7 +74,7 @@ class TestEffectExpiry(TestCase):
             loop.run_until_complete(self.game.simulation_runner.run_single_turn(self.game.avatar_manager.get_player_id_to_serialised_action()))
 
         self.assertTrue(isinstance(list(self.avatar.effects)[0], pickup_created.EFFECT))
-        self.assertEqual(list(self.avatar.effects)[0]._time_remaining, 5)
+        self.assertEqual(list(self.avatar.effects)[0].time_remaining, 5)
         self.assertEqual(self.avatar.resistance, INVULNERABILITY_RESISTANCE)
 
         # Run 5 more turns and expect the effect to expire.
@@ -107,7 +107,7 @@ class TestEffectExpiry(TestCase):
 
         self.assertTrue(isinstance(list(self.avatar.effects)[0], pickup_created_one.EFFECT))
         self.assertEqual(len(self.avatar.effects), 1)
-        self.assertEqual(list(self.avatar.effects)[0]._time_remaining, 10)
+        self.assertEqual(list(self.avatar.effects)[0].time_remaining, 10)
         self.assertEqual(self.avatar.attack_strength, 11)
 
         # Move twice to the second pickup.
@@ -127,7 +127,7 @@ class TestEffectExpiry(TestCase):
             ))
 
         self.assertEqual(len(self.avatar.effects), 1)
-        self.assertEqual(list(self.avatar.effects)[0]._time_remaining, 2)
+        self.assertEqual(list(self.avatar.effects)[0].time_remaining, 2)
         self.assertEqual(self.avatar.attack_strength, 16)
 
         # Two turns later, the second pickup expires too.
@@ -162,7 +162,7 @@ class TestEffectExpiry(TestCase):
 
         self.assertTrue(isinstance(list(self.avatar.effects)[0], pickup_created_one.EFFECT))
         self.assertEqual(len(self.avatar.effects), 1)
-        self.assertEqual(list(self.avatar.effects)[0]._time_remaining, 10)
+        self.assertEqual(list(self.avatar.effects)[0].time_remaining, 10)
         self.assertEqual(self.avatar.resistance, INVULNERABILITY_RESISTANCE)
 
         # Move twice to the second pickup.
@@ -182,7 +182,7 @@ class TestEffectExpiry(TestCase):
             ))
 
         self.assertEqual(len(self.avatar.effects), 1)
-        self.assertEqual(list(self.avatar.effects)[0]._time_remaining, 2)
+        self.assertEqual(list(self.avatar.effects)[0].time_remaining, 2)
         self.assertEqual(self.avatar.resistance, INVULNERABILITY_RESISTANCE)
 
         # Two turns later, the second pickup expires too.
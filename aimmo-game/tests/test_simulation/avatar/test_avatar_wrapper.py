@@ -1,30 +1,16 @@
 from __future__ import absolute_import
 
+import asyncio
 import json
 from unittest import TestCase
 from httmock import HTTMock
 
 from simulation.avatar import avatar_wrapper
 from simulation.location import Location
+from simulation.http_client import HTTPClient
+from simulation.game_state import WorkerStateView
 from simulation.worker import Worker
 
-class MockEffect(object):
-    def __init__(self, avatar):
-        self.turns = 0
-        self.is_expired = False
-        self.removed = False
-        self.expire = False
-        self.avatar = avatar
-
-    def on_turn(self):
-        self.is_expired = self.expire
-        self.turns += 1
-
-    def remove(self):
-        self.removed = True
-        self.avatar.effects.remove(self)
-
-
 class MockAction(object):
     def __init__(self, avatar, **options):
         global actions_created
@@ -60,7 +46,7 @@ class TestAvatarWrapper(TestCase):
     def setUp(self):
         global actions_created
         actions_created = []
-        self.worker = Worker(worker_url='http://test')
+        self.worker = Worker(worker_url='http://test', http_client=HTTPClient())
         self.avatar = avatar_wrapper.AvatarWrapper(player_id=None,
                                                    initial_location=None,
                                                    avatar_appearance=None)
@@ -69,7 +55,7 @@ class TestAvatarWrapper(TestCase):
         if request_mock is None:
             request_mock = ActionRequest()
         with HTTMock(request_mock):
-            worker_data = self.worker.fetch_data(None)
+            worker_data = asyncio.get_event_loop().run_until_complete(self.worker.fetch_data(WorkerStateView({}, b'{}')))
             self.avatar.decide_action(worker_data)
 
     def test_bad_action_data_given(self):
@@ -82,38 +68,6 @@ class TestAvatarWrapper(TestCase):
         self.take_turn(request_mock)
         self.assertEqual(actions_created, [], 'No action should have been applied')
 
-    def add_effects(self, num=2):
-        effects = []
-        for _ in range(num):
-            effect = MockEffect(self.avatar)
-            self.avatar.effects.add(effect)
-            effects.append(effect)
-        return effects
-
-    def test_effects_on_turn_are_called(self):
-        effect1, effect2 = self.add_effects()
-        self.avatar.update_effects()
-        self.assertEqual(effect1.turns, 1)
-        self.assertEqual(effect2.turns, 1)
-
-    def test_effects_not_removed(self):
-        effect1, effect2 = self.add_effects()
-        self.avatar.update_effects()
-        self.assertEqual(set((effect1, effect2)), self.avatar.effects)
-
-    def test_expired_effects_removed(self):
-        effect1, effect2 = self.add_effects()
-        effect1.expire = True
-        self.avatar.update_effects()
-        self.assertEqual(effect2.turns, 1)
-        self.assertEqual(self.avatar.effects, set((effect2,)))
-
-    def test_effects_applied_on_invalid_action(self):
-        self.take_turn(InvalidJSONRequest)
-        effect = self.add_effects(1)[0]
-        self.avatar.update_effects()
-        self.assertEqual(effect.turns, 1)
-
     def test_avatar_dies_health(self):
         self.avatar.die(None)
         self.assertEqual(self.avatar.health, 5)
@@ -5,6 +5,7 @@ from simulation.action import MoveAction, WaitAction
 from simulation.avatar.avatar_manager import AvatarManager
 from simulation.avatar.avatar_wrapper import AvatarWrapper
 from simulation.direction import NORTH, EAST, SOUTH, WEST
+from simulation.event import EventLog
 LOGGER = logging.getLogger(__name__)
 
 
@@ -19,6 +20,7 @@ class DummyAvatar(AvatarWrapper):
         self.attack_strength = 1
         self.effects = set()
         self.resistance = 0
+        self.event_log = EventLog()
 
     def decide_action(self, worker_data):
         raise NotImplementedError()
@@ -26,9 +28,6 @@ class DummyAvatar(AvatarWrapper):
     def next_turn(self, world_map=None, avatar_state=None):
         raise NotImplementedError()
 
-    def add_event(self, event):
-        self.events.append(event)
-
     def die(self, respawn_loc):
         self.location = respawn_loc
         self.times_died += 1
@@ -122,10 +121,12 @@ class DummyAvatarManager(AvatarManager):
             dummy = self.dummy_list.pop(0)
         except IndexError:
             dummy = WaitDummy
-        self.avatars_by_id[player_id] = dummy(player_id, location)
+        self.add_avatar_directly(dummy(player_id, location))
         return self.avatars_by_id[player_id]
 
     def add_avatar_directly(self, avatar):
+        avatar.effect_timers = self.effect_timers
+        avatar.event_log = self.event_log
         self.avatars_by_id[avatar.player_id] = avatar
 
     def get_player_id_to_serialised_action(self):
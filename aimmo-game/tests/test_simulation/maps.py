@@ -25,14 +25,13 @@ class MockPickup(object):
 
 class MockCell(Cell):
     def __init__(self, location=Location(0, 0), habitable=True, generates_score=False,
-                 avatar=None, pickup=None, name=None, actions=[]):
+                 avatar=None, pickup=None, name=None):
         self.location = location
         self.habitable = habitable
         self.generates_score = generates_score
         self.avatar = avatar
         self.pickup = pickup
         self.name = name
-        self.actions = actions
         self.partially_fogged = False
 
     def __eq__(self, other):
@@ -62,6 +61,15 @@ class InfiniteMap(WorldMap):
         self.updates += 1
         self.num_avatars = num_avatars
 
+    def serialise_view(self, location, no_fog_distance, partial_fog_distance):
+        return [cell.serialise() for cell in self.all_cells()]
+
+    def view_covers_map(self, location, no_fog_distance):
+        return True
+
+    def take_changed_locations(self):
+        return None
+
     @property
     def num_rows(self):
         return float('inf')
@@ -78,7 +86,7 @@ class EmptyMap(WorldMap):
     def get_random_spawn_location(self):
         return Location(10, 10)
 
-    def can_move_to(self, target_location):
+    def can_move_to(self, target_location, turn_actions=None):
         return False
 
     def all_cells(self):
@@ -1,4 +1,11 @@
+from simulation.worker import hash_code
+
+
 class MockCommunicator(object):
+    """
+    Holds the code of the players in its data, and serves the game metadata with only
+    the code revisions like Django does.
+    """
     def __init__(self):
         self.data = {
             "main": {
@@ -23,11 +30,20 @@ class MockCommunicator(object):
                 ]
             }
         }
+        self.code_requests = []
+
+    async def get_game_metadata(self):
+        main = dict(self.data['main'])
+        main['users'] = [{'id': user['id'], 'code_revision': hash_code(user['code'])}
+                         for user in main['users']]
+        return {'main': main}
 
-    def get_game_metadata(self):
-        return self.data
+    async def get_avatar_code(self, avatar_ids):
+        self.code_requests.append(avatar_ids)
+        return [{'id': user['id'], 'code': user['code'], 'code_revision': hash_code(user['code'])}
+                for user in self.data['main']['users'] if user['id'] in avatar_ids]
 
-    def mark_game_complete(self):
+    async def mark_game_complete(self, data=None):
         return {}
 
     def change_code(self, avatar_id, new_code):
@@ -69,23 +69,23 @@ class TestAction(unittest.TestCase):
 
         self.assertEqual(self.avatar.events,
                          [event.PerformedAttackEvent(
-                             self.other_avatar,
+                             self.other_avatar.player_id,
                              target_location,
                              damage_dealt)])
         self.assertEqual(self.other_avatar.events,
-                         [event.ReceivedAttackEvent(self.avatar, damage_dealt)])
+                         [event.ReceivedAttackEvent(self.avatar.player_id, damage_dealt)])
 
     def test_successful_multiple_attack_actions(self):
         game_state = GameState(AvatarMap(self.other_avatar), self.avatar_manager)
         action.AttackAction(self.avatar, {'x': 0, 'y': 1}).process(game_state.world_map)
 
         self.assertEqual(self.other_avatar.events,
-                         [event.ReceivedAttackEvent(self.avatar, 1)])
+                         [event.ReceivedAttackEvent(self.avatar.player_id, 1)])
 
         action.AttackAction(self.avatar, {'x': 0, 'y': 1}).process(game_state.world_map)
 
         self.assertEqual(self.other_avatar.events,
-                         [event.ReceivedAttackEvent(self.avatar, 1), event.ReceivedAttackEvent(self.avatar, 1)])
+                         [event.ReceivedAttackEvent(self.avatar.player_id, 1), event.ReceivedAttackEvent(self.avatar.player_id, 1)])
 
         self.assertEqual(self.avatar.location, ORIGIN)
         self.assertEqual(self.other_avatar.location, EAST_OF_ORIGIN)
@@ -112,11 +112,11 @@ class TestAction(unittest.TestCase):
         damage_dealt = 1
         self.assertEqual(self.avatar.events,
                          [event.PerformedAttackEvent(
-                             self.other_avatar,
+                             self.other_avatar.player_id,
                              target_location,
                              damage_dealt)])
         self.assertEqual(self.other_avatar.events,
-                         [event.ReceivedAttackEvent(self.avatar, damage_dealt)])
+                         [event.ReceivedAttackEvent(self.avatar.player_id, damage_dealt)])
 
         self.assertEqual(self.avatar.location, ORIGIN)
         self.assertEqual(self.other_avatar.health, 0)
@@ -0,0 +1,40 @@
+from unittest import TestCase
+
+from simulation.action_plan import ActionPlan, MAX_PLAN_LENGTH
+
+WAIT = {'action_type': 'wait'}
+MOVE = {'action_type': 'move', 'options': {'direction': {'x': 0, 'y': 1}}}
+
+
+def avatar_state(x, y):
+    return {'location': {'x': x, 'y': y}, 'health': 5, 'score': 0}
+
+
+class TestActionPlan(TestCase):
+    def test_empty_plan(self):
+        self.assertIsNone(ActionPlan().next_action(avatar_state(0, 0)))
+
+    def test_actions_followed_while_conditions_hold(self):
+        plan = ActionPlan([{'action': MOVE, 'condition': {'location': {'x': 0, 'y': 0}}},
+                           {'action': WAIT, 'condition': {'location': {'x': 0, 'y': 1}}}])
+
+        action, plan = plan.next_action(avatar_state(0, 0))
+        self.assertEqual(action, MOVE)
+        action, plan = plan.next_action(avatar_state(0, 1))
+        self.assertEqual(action, WAIT)
+        self.assertIsNone(plan.next_action(avatar_state(0, 1)))
+
+    def test_plan_abandoned_when_condition_fails(self):
+        plan = ActionPlan([{'action': MOVE, 'condition': {'location': {'x': 0, 'y': 1}}}])
+        self.assertIsNone(plan.next_action(avatar_state(0, 0)))
+
+    def test_unconditional_step(self):
+        action, _ = ActionPlan([{'action': WAIT}]).next_action(avatar_state(0, 0))
+        self.assertEqual(action, WAIT)
+
+    def test_bad_plan(self):
+        for steps in (['wait'], [{'condition': {}}], [{'action': WAIT, 'condition': 'x'}]):
+            self.assertIsNone(ActionPlan(steps).next_action(avatar_state(0, 0)))
+
+    def test_plan_is_truncated(self):
+        self.assertEqual(len(ActionPlan([{'action': WAIT}] * (MAX_PLAN_LENGTH + 1))), MAX_PLAN_LENGTH)
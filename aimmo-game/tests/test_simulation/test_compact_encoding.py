@@ -0,0 +1,50 @@
+from __future__ import absolute_import
+
+import struct
+from unittest import TestCase
+
+from simulation.compact_encoding import encode_entities, encode_terrain, UNKNOWN
+from simulation.game_state import GameState
+from simulation.location import Location
+from simulation.pickups import HealthPickup
+from simulation.world_map import WorldMap
+from .dummy_avatar import DummyAvatarManager
+
+
+class TestCompactEncoding(TestCase):
+    def setUp(self):
+        world_map = WorldMap.generate_empty_map(5, 5, {})
+        world_map.get_cell(Location(-1, 2)).habitable = False
+        world_map.get_cell(Location(1, -2)).generates_score = True
+        cell = world_map.get_cell(Location(2, 2))
+        cell.pickup = HealthPickup(cell)
+        self.game_state = GameState(world_map, DummyAvatarManager())
+        self.game_state.add_avatar(7, Location(0, 1))
+
+    def test_entities_frame(self):
+        entities = self.game_state.serialise_entities()
+        entities['players'][0].update(score=3, health=5)
+        frame = encode_entities(entities)
+
+        header = struct.unpack_from('<BBHHHi', frame)
+        self.assertEqual(header, (1, 1, 1, 1, 1, entities['terrainVersion']))
+        fields = struct.unpack_from('<iihhhBBhhhh', frame, 12)
+        self.assertEqual(fields, (7, 3, 5, 0, 1, 0, 0, 2, 2, 1, -2))
+        self.assertEqual(len(frame), 12 + struct.calcsize('<iihhhBBhhhh'))
+
+    def test_terrain_frame(self):
+        terrain = self.game_state.serialise_terrain()
+        frame = encode_terrain(terrain)
+
+        header = struct.unpack_from('<BBHiIhhhh', frame)
+        self.assertEqual(header, (1, 2, 0, terrain['terrainVersion'], 1, -2, -2, 2, 2))
+        self.assertEqual(struct.unpack_from('<hh', frame, 20), (-1, 2))
+        self.assertEqual(len(frame), 24)
+
+    def test_unknown_values(self):
+        entities = {'terrainVersion': 0, 'scoreLocations': [],
+                    'players': [{'id': 1, 'score': 0, 'health': 5, 'orientation': 'up',
+                                 'location': {'x': 0, 'y': 0}}],
+                    'pickups': [{'type': 'new', 'location': {'x': 0, 'y': 0}}]}
+        frame = encode_entities(entities)
+        self.assertEqual(struct.unpack_from('<BB', frame, 12 + 14), (UNKNOWN, UNKNOWN))
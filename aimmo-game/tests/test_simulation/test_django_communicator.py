@@ -0,0 +1,59 @@
+import asyncio
+from unittest import TestCase
+
+from asynctest import CoroutineMock
+
+from simulation.django_communicator import DjangoCommunicator
+from simulation.http_client import HTTPResponse
+
+
+class TestDjangoCommunicator(TestCase):
+    def setUp(self):
+        self.http_client = CoroutineMock()
+        self.communicator = DjangoCommunicator(django_api_url='http://test/games/1/',
+                                               completion_url='http://test/games/1/complete/',
+                                               http_client=self.http_client)
+
+    def get_game_metadata(self):
+        return asyncio.get_event_loop().run_until_complete(self.communicator.get_game_metadata())
+
+    def test_metadata_reused_when_not_modified(self):
+        self.http_client.get = CoroutineMock(side_effect=[
+            HTTPResponse('http://test/games/1/', 200, b'{"main": {"users": []}}', {'ETag': '"1"'}),
+            HTTPResponse('http://test/games/1/', 304, b'')])
+
+        first = self.get_game_metadata()
+        second = self.get_game_metadata()
+
+        self.assertEqual(first, {'main': {'users': []}})
+        self.assertIs(second, first)
+        self.assertEqual(self.http_client.get.call_args_list[0][1]['headers'], {})
+        self.assertEqual(self.http_client.get.call_args_list[1][1]['headers'], {'If-None-Match': '"1"'})
+
+    def test_failed_metadata_request_not_cached(self):
+        self.http_client.get = CoroutineMock(side_effect=[
+            HTTPResponse('http://test/games/1/', 200, b'{"main": {"users": []}}', {'ETag': '"1"'}),
+            HTTPResponse('http://test/games/1/', 500, b'<html>Server Error</html>', {'ETag': '"2"'}),
+            HTTPResponse('http://test/games/1/', 304, b'')])
+
+        first = self.get_game_metadata()
+        self.assertIsNone(self.get_game_metadata())
+        self.assertIs(self.get_game_metadata(), first)
+        self.assertEqual(self.http_client.get.call_args_list[2][1]['headers'], {'If-None-Match': '"1"'})
+
+    def test_failed_avatar_code_request(self):
+        self.http_client.get = CoroutineMock(return_value=HTTPResponse(
+            'http://test/games/1/code/', 502, b'<html>Bad Gateway</html>'))
+
+        users = asyncio.get_event_loop().run_until_complete(self.communicator.get_avatar_code([1]))
+
+        self.assertIsNone(users)
+
+    def test_avatar_code_requested_in_one_batch(self):
+        self.http_client.get = CoroutineMock(return_value=HTTPResponse(
+            'http://test/games/1/code/', 200, b'{"users": [{"id": 1, "code": "c", "code_revision": "r"}]}'))
+
+        users = asyncio.get_event_loop().run_until_complete(self.communicator.get_avatar_code([1, 2]))
+
+        self.assertEqual(users, [{'id': 1, 'code': 'c', 'code_revision': 'r'}])
+        self.http_client.get.assert_called_once_with('http://test/games/1/code/', params={'ids': '1,2'})
@@ -4,6 +4,7 @@ import abc
 from unittest import TestCase
 
 from simulation import effects
+from simulation.timer_wheel import TimerWheel
 from .dummy_avatar import DummyAvatar
 
 
@@ -17,6 +18,8 @@ class _BaseCases(object):
 
         def setUp(self):
             self.avatar = DummyAvatar(1, None)
+            self.timer_wheel = TimerWheel()
+            self.avatar.effect_timers = self.timer_wheel
             self.effect = self.make_effect(self.avatar)
             self.avatar.effects.add(self.effect)
 
@@ -28,9 +31,18 @@ class _BaseCases(object):
             self.assertNoEffects()
 
         def test_effect_expires(self):
-            for _ in range(10):
-                self.effect.on_turn()
+            for _ in range(9):
+                self.timer_wheel.advance()
+            self.assertEqual(self.effect.time_remaining, 1)
+            self.assertFalse(self.effect.is_expired)
+
+            self.timer_wheel.advance()
             self.assertTrue(self.effect.is_expired)
+            self.assertNoEffects()
+
+        def test_removed_effect_not_expired(self):
+            self.effect.remove()
+            self.assertEqual(len(self.timer_wheel), 0)
 
 
 class TestInvulnerabilityEffect(_BaseCases.BaseTimedEffectTestCase):
@@ -0,0 +1,48 @@
+from unittest import TestCase
+
+from simulation.event import (
+    EventLog, EventRecord, FailedAttackEvent, MovedEvent, ReceivedAttackEvent,
+    serialise_event
+)
+from simulation.location import Location
+
+ORIGIN = Location(0, 0)
+EAST_OF_ORIGIN = Location(1, 0)
+
+
+class TestEventLog(TestCase):
+    def setUp(self):
+        self.event_log = EventLog(capacity=3)
+        self.event_log.start_turn()
+
+    def test_events_of_the_turn_kept_by_player(self):
+        self.event_log.add(1, MovedEvent(ORIGIN, EAST_OF_ORIGIN))
+        self.event_log.add(2, ReceivedAttackEvent(1, 1))
+
+        self.assertEqual(self.event_log.events_for(1), [MovedEvent(ORIGIN, EAST_OF_ORIGIN)])
+        self.assertEqual(self.event_log.events_for(2), [ReceivedAttackEvent(1, 1)])
+        self.assertEqual(self.event_log.events_for(3), [])
+
+    def test_events_of_previous_turns_not_in_view(self):
+        self.event_log.add(1, FailedAttackEvent(EAST_OF_ORIGIN))
+        self.event_log.start_turn()
+
+        self.assertEqual(self.event_log.events_for(1), [])
+        self.assertEqual(self.event_log.records(),
+                         [EventRecord(1, 1, FailedAttackEvent(EAST_OF_ORIGIN))])
+
+    def test_oldest_records_dropped_at_capacity(self):
+        for turn in range(5):
+            self.event_log.add(1, FailedAttackEvent(Location(turn, 0)))
+            self.event_log.start_turn()
+
+        self.assertEqual(len(self.event_log), 3)
+        self.assertEqual([record.turn for record in self.event_log.records()], [3, 4, 5])
+
+    def test_serialise_event(self):
+        self.assertEqual(serialise_event(ReceivedAttackEvent(2, 1)),
+                         {'type': 'ReceivedAttackEvent', 'attacking_avatar_id': 2, 'damage_dealt': 1})
+        self.assertEqual(serialise_event(MovedEvent(ORIGIN, EAST_OF_ORIGIN)),
+                         {'type': 'MovedEvent',
+                          'source_location': {'x': 0, 'y': 0},
+                          'target_location': {'x': 1, 'y': 0}})
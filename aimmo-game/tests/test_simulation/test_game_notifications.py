@@ -0,0 +1,76 @@
+import asyncio
+import json
+import socket
+from unittest import TestCase
+
+from simulation.game_notifications import (GameChangeListener, GameNotificationProtocol,
+                                           listen_for_notifications)
+
+
+class MockClock(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestGameChangeListener(TestCase):
+    def setUp(self):
+        self.clock = MockClock()
+        self.listener = GameChangeListener(poll_interval=30, clock=self.clock)
+
+    def test_refreshed_every_turn_without_poll_interval(self):
+        listener = GameChangeListener()
+        listener.refreshed()
+        self.assertTrue(listener.refresh_due)
+
+    def test_refreshed_only_when_notified(self):
+        self.assertTrue(self.listener.refresh_due)
+        self.listener.refreshed()
+        self.assertFalse(self.listener.refresh_due)
+
+        self.listener.notify()
+        self.assertTrue(self.listener.refresh_due)
+
+    def test_safety_poll(self):
+        self.listener.refreshed()
+        self.clock.now = 29
+        self.assertFalse(self.listener.refresh_due)
+        self.clock.now = 30
+        self.assertTrue(self.listener.refresh_due)
+
+
+class TestGameNotificationProtocol(TestCase):
+    def setUp(self):
+        self.listener = GameChangeListener(poll_interval=30)
+        self.listener.refreshed()
+
+    def test_only_notified_for_own_game(self):
+        protocol = GameNotificationProtocol('1', self.listener)
+        protocol.datagram_received(b'{"game_id": 2}', None)
+        self.assertFalse(self.listener.refresh_due)
+
+        protocol.datagram_received(b'{"game_id": 1}', None)
+        self.assertTrue(self.listener.refresh_due)
+
+    def test_malformed_notifications_ignored(self):
+        protocol = GameNotificationProtocol('1', self.listener)
+        for data in (b'not json', b'{}', b'[1]'):
+            protocol.datagram_received(data, None)
+        self.assertFalse(self.listener.refresh_due)
+
+    def test_notification_over_udp(self):
+        loop = asyncio.get_event_loop()
+        transport = loop.run_until_complete(
+            listen_for_notifications('1', self.listener, '127.0.0.1', 0))
+        try:
+            udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            udp_socket.sendto(json.dumps({'game_id': 1}).encode('utf-8'),
+                              transport.get_extra_info('sockname'))
+            udp_socket.close()
+            loop.run_until_complete(asyncio.sleep(0.1))
+        finally:
+            transport.close()
+
+        self.assertTrue(self.listener.refresh_due)
@@ -3,12 +3,14 @@ from json import dumps
 import asyncio
 import pytest
 import mock
+from asynctest import CoroutineMock
 
 from .mock_communicator import MockCommunicator
 from .maps import InfiniteMap
 from simulation.avatar.avatar_manager import AvatarManager
 from simulation.game_state import GameState
 from simulation.game_runner import GameRunner
+from simulation.game_notifications import GameChangeListener
 from .concrete_worker_manager import ConcreteWorkerManager
 
 
@@ -41,7 +43,7 @@ class RequestMock(object):
 
 
 @pytest.fixture
-def game_runner():
+async def game_runner():
     async def mock_callback():
         pass
     game_state = GameState(InfiniteMap(), AvatarManager())
@@ -52,12 +54,13 @@ def game_runner():
 
     game_runner.communicator = MockCommunicator()
     game_runner.set_end_turn_callback(mock_callback)
-    return game_runner
+    yield game_runner
+    await game_runner.close()
 
 
 @pytest.mark.asyncio
 async def test_correct_url(game_runner):
-    game_runner.communicator.get_game_metadata = mock.MagicMock()
+    game_runner.communicator.get_game_metadata = CoroutineMock()
     await game_runner.update()
     # noinspection PyUnresolvedReferences
     game_runner.communicator.get_game_metadata.assert_called_once()
@@ -94,10 +97,22 @@ async def test_changed_code(game_runner):
         assert i in game_runner.worker_manager.updated_workers
         assert game_runner.worker_manager.get_code(i) in 'changed %s' % i
 
+    assert game_runner.communicator.code_requests == [[0, 1, 2, 3], [0, 2]]
 
-def test_logs_cleared_at_each_update(game_runner):
+
+@pytest.mark.asyncio
+async def test_code_not_fetched_when_unchanged(game_runner):
+    game_runner.communicator.data = RequestMock(2).value
+    await game_runner.update_players()
+    await game_runner.update_players()
+
+    assert game_runner.communicator.code_requests == [[0, 1]]
+
+
+@pytest.mark.asyncio
+async def test_logs_cleared_at_each_update(game_runner):
     game_runner.communicator.data = RequestMock(3).value
-    game_runner.update_workers()
+    await game_runner.update_workers()
     first_worker = game_runner.worker_manager.player_id_to_worker[0]
     first_worker.log = 'test logs'
 
@@ -120,3 +135,104 @@ async def test_remove_avatars(game_runner):
         else:
             assert i in game_runner.worker_manager.final_workers
             assert i in game_runner.game_state.avatar_manager.avatars_by_id
+
+
+@pytest.mark.asyncio
+async def test_pipelined_update_broadcasts_while_workers_think(game_runner):
+    game_runner.communicator.data = RequestMock(2).value
+    await game_runner.update_workers()
+    events = []
+    worker_replied = asyncio.Event()
+    turn_requested = game_runner.game_state.turn
+
+    async def request_all_worker_data(player_id_to_game_state, deadline):
+        events.append(('request', sorted(player_id_to_game_state)))
+        await worker_replied.wait()
+        return {worker: {'action': None, 'log': 'next turn', 'avatar_updated': False}
+                for worker in game_runner.worker_manager.player_id_to_worker.values()}
+
+    async def broadcast():
+        events.append(('broadcast', game_runner.worker_manager.player_id_to_worker[0].log))
+        worker_replied.set()
+
+    game_runner.worker_manager.player_id_to_worker[0].log = 'this turn'
+    game_runner.worker_manager.request_all_worker_data = request_all_worker_data
+    game_runner.set_end_turn_callback(broadcast)
+    await game_runner.update_pipelined()
+
+    assert events == [('request', [0, 1]), ('broadcast', 'this turn')]
+    assert game_runner.game_state.turn == turn_requested + 1
+    assert game_runner.worker_manager.player_id_to_worker[0].log == 'next turn'
+
+
+@pytest.mark.asyncio
+async def test_players_refreshed_only_when_notified(game_runner):
+    game_runner.change_listener = GameChangeListener(poll_interval=30)
+    game_runner.communicator.data = RequestMock(2).value
+    await game_runner.update_players()
+    game_runner.communicator.data = RequestMock(3).value
+
+    await game_runner.update_players()
+    assert len(game_runner.worker_manager.final_workers) == 2
+
+    game_runner.change_listener.notify()
+    await game_runner.update_players()
+    assert len(game_runner.worker_manager.final_workers) == 3
+
+
+@pytest.mark.asyncio
+async def test_turns_take_at_least_the_min_turn_time(game_runner):
+    game_runner.change_listener = GameChangeListener(poll_interval=30)
+    game_runner.change_listener.refreshed()
+    game_runner.min_turn_time = 0.05
+    other_task_runs = []
+
+    async def other_task():
+        while True:
+            other_task_runs.append(game_runner.game_state.turn)
+            await asyncio.sleep(0)
+
+    other = asyncio.ensure_future(other_task())
+    run = asyncio.ensure_future(game_runner.run())
+    await asyncio.sleep(0.22)
+    run.cancel()
+    other.cancel()
+
+    assert 1 <= game_runner.game_state.turn <= 5
+    assert len(set(other_task_runs)) == game_runner.game_state.turn + 1
+
+
+@pytest.mark.asyncio
+async def test_slow_turns_still_yield(game_runner):
+    game_runner.min_turn_time = 0
+    updates = []
+
+    async def update():
+        updates.append(1)
+
+    with mock.patch('asyncio.sleep', new=CoroutineMock()) as mocked_sleep:
+        await game_runner.run_turn(update)
+
+    assert updates == [1]
+    mocked_sleep.assert_called_once_with(0)
+
+
+@pytest.mark.asyncio
+async def test_players_kept_when_metadata_request_fails(game_runner):
+    game_runner.change_listener = GameChangeListener(poll_interval=30)
+    game_runner.communicator.data = RequestMock(2).value
+    await game_runner.update_players()
+
+    game_runner.communicator.get_game_metadata = CoroutineMock(return_value=None)
+    game_runner.change_listener.notify()
+    await game_runner.update_players()
+
+    assert len(game_runner.worker_manager.final_workers) == 2
+    assert game_runner.change_listener.refresh_due
+
+
+@pytest.mark.asyncio
+async def test_close_closes_the_http_client(game_runner):
+    game_runner.http_client.close = CoroutineMock()
+    await game_runner.close()
+    game_runner.http_client.close.assert_called_once_with()
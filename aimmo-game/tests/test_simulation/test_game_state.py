@@ -1,12 +1,17 @@
 from __future__ import absolute_import
 
+import json
 from unittest import TestCase
 
-from simulation.game_state import GameState
+from simulation.avatar.avatar_manager import AvatarManager
+from simulation.effects import InvulnerabilityPickupEffect
+from simulation.event import MovedEvent
+from simulation.game_state import GameState, MAX_DELTA_TURNS
 from simulation.location import Location
+from simulation.world_map import WorldMap
 from .dummy_avatar import DummyAvatar
 from .dummy_avatar import DummyAvatarManager
-from .maps import InfiniteMap, AvatarMap, EmptyMap
+from .maps import InfiniteMap, AvatarMap, EmptyMap, MockPickup
 
 
 class TestGameState(TestCase):
@@ -58,6 +63,23 @@ class TestGameState(TestCase):
         avatar = state.avatar_manager.avatars_by_id[7]
         self.assertEqual(avatar.location.x, 10)
         self.assertEqual(avatar.location.y, 10)
+        self.assertIs(avatar.effect_timers, state.avatar_manager.effect_timers)
+
+    def test_update_environment_advances_effect_timers(self):
+        state = GameState(InfiniteMap(), DummyAvatarManager())
+        state.update_environment()
+        self.assertEqual(state.avatar_manager.effect_timers.turn, 1)
+
+    def test_effects_of_avatars_added_by_the_manager_expire(self):
+        avatar_manager = AvatarManager()
+        avatar = avatar_manager.add_avatar(1, Location(0, 0))
+        state = GameState(InfiniteMap(), avatar_manager)
+        avatar.effects.add(InvulnerabilityPickupEffect(avatar))
+
+        for _ in range(InvulnerabilityPickupEffect.EFFECT_TIME):
+            state.update_environment()
+        self.assertEqual(avatar.effects, set())
+        self.assertEqual(avatar.resistance, 0)
 
     def test_updates_map(self):
         map = InfiniteMap()
@@ -87,6 +109,151 @@ class TestGameState(TestCase):
         game_state.main_avatar_id = avatar.player_id
         self.assertEqual(game_state.get_main_avatar(), avatar)
 
+    def test_serialise_for_worker_uses_fog_distances(self):
+        world_map = WorldMap.generate_empty_map(11, 11, {'NO_FOG_OF_WAR_DISTANCE': 1,
+                                                         'PARTIAL_FOG_OF_WAR_DISTANCE': 2})
+        game_state = GameState(world_map, DummyAvatarManager())
+        game_state.add_avatar(1, Location(0, 0))
+        avatar = game_state.avatar_manager.get_avatar(1)
+
+        cells = game_state.serialise_for_worker(avatar)['world_map']['cells']
+        self.assertEqual(len(cells), 25)
+        self.assertEqual(len([c for c in cells if c['partially_fogged']]), 16)
+
+        avatar.fog_of_war_modifier = 1
+        cells = game_state.serialise_for_worker(avatar)['world_map']['cells']
+        self.assertEqual(len(cells), 49)
+        self.assertEqual(len([c for c in cells if c['partially_fogged']]), 24)
+
+    def test_worker_views_include_events_of_the_turn(self):
+        world_map = WorldMap.generate_empty_map(3, 3, {})
+        game_state = GameState(world_map, DummyAvatarManager())
+        game_state.add_avatar(1, Location(0, 0))
+        avatar = game_state.avatar_manager.get_avatar(1)
+        game_state.avatar_manager.event_log.start_turn()
+        avatar.add_event(MovedEvent(Location(-1, 0), Location(0, 0)))
+
+        avatar_state = game_state.get_serialised_game_states_for_workers()[1].avatar_state
+        self.assertEqual(avatar_state['events'], [{'type': 'MovedEvent',
+                                                   'source_location': {'x': -1, 'y': 0},
+                                                   'target_location': {'x': 0, 'y': 0}}])
+
+        game_state.avatar_manager.event_log.start_turn()
+        avatar_state = game_state.get_serialised_game_states_for_workers()[1].avatar_state
+        self.assertEqual(avatar_state['events'], [])
+
+    def test_events_of_avatars_added_by_the_manager_are_recorded(self):
+        avatar_manager = AvatarManager()
+        avatar = avatar_manager.add_avatar(1, Location(0, 0))
+        game_state = GameState(WorldMap.generate_empty_map(3, 3, {}), avatar_manager)
+        game_state.world_map.get_cell(Location(0, 0)).avatar = avatar
+        avatar_manager.event_log.start_turn()
+        avatar.add_event(MovedEvent(Location(-1, 0), Location(0, 0)))
+
+        avatar_state = game_state.get_serialised_game_states_for_workers()[1].avatar_state
+        self.assertEqual(len(avatar_state['events']), 1)
+
+    def test_workers_share_the_encoded_world_map(self):
+        world_map = WorldMap.generate_empty_map(3, 3, {})
+        game_state = GameState(world_map, DummyAvatarManager())
+        game_state.add_avatar(1, Location(0, 0))
+        game_state.add_avatar(2, Location(1, 1))
+
+        views = game_state.get_serialised_game_states_for_workers()
+        self.assertIs(views[1].encoded_world_map, views[2].encoded_world_map)
+        for player_id, view in views.items():
+            avatar = game_state.avatar_manager.get_avatar(player_id)
+            self.assertEqual(json.loads(view.encode().decode('utf-8')),
+                             dict(game_state.serialise_for_worker(avatar), turn=1))
+
+    def test_encoded_views_follow_fog_of_war(self):
+        world_map = WorldMap.generate_empty_map(11, 11, {'NO_FOG_OF_WAR_DISTANCE': 1,
+                                                         'PARTIAL_FOG_OF_WAR_DISTANCE': 2})
+        game_state = GameState(world_map, DummyAvatarManager())
+        game_state.add_avatar(1, Location(0, 0))
+        game_state.add_avatar(2, Location(4, 4))
+
+        views = game_state.get_serialised_game_states_for_workers()
+        for player_id, view in views.items():
+            avatar = game_state.avatar_manager.get_avatar(player_id)
+            self.assertEqual(json.loads(view.encode(code='x').decode('utf-8')),
+                             dict(game_state.serialise_for_worker(avatar), code='x', turn=1))
+
+    def _game_state_for_changes(self):
+        world_map = WorldMap.generate_empty_map(5, 5, {})
+        game_state = GameState(world_map, DummyAvatarManager())
+        game_state.add_avatar(1, Location(0, 0))
+        return game_state, world_map
+
+    def _decode_world_map(self, view, full=False):
+        return json.loads(view.encode(full=full).decode('utf-8'))['world_map']
+
+    def test_only_changed_cells_sent_after_acknowledgement(self):
+        game_state, world_map = self._game_state_for_changes()
+        views = game_state.get_serialised_game_states_for_workers()
+        self.assertEqual(len(self._decode_world_map(views[1])['cells']), 25)
+
+        world_map.get_cell(Location(2, 2)).generates_score = True
+        views = game_state.get_serialised_game_states_for_workers({1: 1})
+        changes = self._decode_world_map(views[1])
+        self.assertEqual(changes['base_turn'], 1)
+        self.assertEqual(sorted((c['location']['x'], c['location']['y']) for c in changes['changed_cells']),
+                         [(0, 0), (2, 2)])
+        self.assertEqual(len(self._decode_world_map(views[1], full=True)['cells']), 25)
+
+    def test_changes_accumulate_over_several_turns(self):
+        game_state, world_map = self._game_state_for_changes()
+        game_state.get_serialised_game_states_for_workers()
+        world_map.get_cell(Location(1, 1)).habitable = False
+        game_state.get_serialised_game_states_for_workers({1: 1})
+        world_map.get_cell(Location(-1, -1)).pickup = MockPickup()
+        views = game_state.get_serialised_game_states_for_workers({1: 1})
+
+        changes = self._decode_world_map(views[1])
+        self.assertEqual(sorted((c['location']['x'], c['location']['y']) for c in changes['changed_cells']),
+                         [(-1, -1), (0, 0), (1, 1)])
+
+    def test_whole_map_sent_after_a_fogged_view(self):
+        world_map = WorldMap.generate_empty_map(9, 9, {'NO_FOG_OF_WAR_DISTANCE': 4,
+                                                       'PARTIAL_FOG_OF_WAR_DISTANCE': 4})
+        game_state = GameState(world_map, DummyAvatarManager())
+        game_state.add_avatar(1, Location(-4, -4))
+        views = game_state.get_serialised_game_states_for_workers()
+        self.assertEqual(len(self._decode_world_map(views[1])['cells']), 25)
+
+        avatar = game_state.avatar_manager.get_avatar(1)
+        world_map.get_cell(avatar.location).avatar = None
+        avatar.location = Location(0, 0)
+        world_map.get_cell(avatar.location).avatar = avatar
+        views = game_state.get_serialised_game_states_for_workers({1: 1})
+        self.assertEqual(len(self._decode_world_map(views[1])['cells']), 81)
+
+        views = game_state.get_serialised_game_states_for_workers({1: 2})
+        self.assertIn('changed_cells', self._decode_world_map(views[1]))
+
+    def test_whole_map_sent_without_a_known_turn(self):
+        game_state, world_map = self._game_state_for_changes()
+        for _ in range(MAX_DELTA_TURNS + 1):
+            game_state.get_serialised_game_states_for_workers()
+        views = game_state.get_serialised_game_states_for_workers({1: 1})
+        self.assertIn('cells', self._decode_world_map(views[1]))
+        views = game_state.get_serialised_game_states_for_workers({1: game_state.turn + 1})
+        self.assertIn('cells', self._decode_world_map(views[1]))
+        views = game_state.get_serialised_game_states_for_workers({1: None})
+        self.assertIn('cells', self._decode_world_map(views[1]))
+
+    def test_terrain_and_entities_layers(self):
+        world_map = WorldMap.generate_empty_map(3, 3, {})
+        world_map.get_cell(Location(1, 1)).habitable = False
+        game_state = GameState(world_map, DummyAvatarManager())
+
+        terrain = game_state.serialise_terrain()
+        entities = game_state.serialise_entities()
+        self.assertEqual(len(terrain['obstacles']), 1)
+        self.assertNotIn('obstacles', entities)
+        self.assertEqual(terrain['terrainVersion'], entities['terrainVersion'])
+        self.assertEqual(game_state.serialise(), dict(terrain, **entities))
+
     def test_is_complete_calls_lambda(self):
         class LambdaTest(object):
             def __init__(self, return_value):
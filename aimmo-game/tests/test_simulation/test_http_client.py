@@ -0,0 +1,63 @@
+import asyncio
+from unittest import TestCase
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from simulation.http_client import HTTPClient, HTTPError
+
+
+class TestHTTPClient(TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def run_with_server(self, client_coroutine, handler_delay=0):
+        async def handler(request):
+            await asyncio.sleep(handler_delay)
+            if request.path == '/missing':
+                return web.Response(status=404)
+            return web.json_response({'body': (await request.read()).decode('utf-8')})
+
+        async def run():
+            app = web.Application()
+            app.router.add_route('*', '/{path}', handler)
+            server = TestServer(app)
+            await server.start_server(loop=self.loop)
+            http_client = HTTPClient(read_timeout=0.2)
+            try:
+                return await client_coroutine(http_client, str(server.make_url('')))
+            finally:
+                await http_client.close()
+                await server.close()
+
+        return self.loop.run_until_complete(run())
+
+    def test_connections_are_reused(self):
+        async def make_requests(http_client, url):
+            for turn in range(5):
+                response = await http_client.post(url + '/turn', data=b'turn %d' % turn)
+                self.assertEqual(response.json(), {'body': 'turn %d' % turn})
+            return http_client
+
+        http_client = self.run_with_server(make_requests)
+        self.assertEqual(http_client.new_connections, 1)
+        self.assertEqual(http_client.reused_connections, 4)
+
+    def test_error_status(self):
+        async def make_request(http_client, url):
+            return await http_client.get(url + '/missing')
+
+        response = self.run_with_server(make_request)
+        self.assertEqual(response.status, 404)
+        with self.assertRaises(HTTPError):
+            response.raise_for_status()
+
+    def test_read_timeout(self):
+        async def make_request(http_client, url):
+            with self.assertRaises(asyncio.TimeoutError):
+                await http_client.get(url + '/slow')
+
+        self.run_with_server(make_request, handler_delay=0.5)
@@ -74,6 +74,11 @@ class TestSimulationRunner(unittest.TestCase):
         self.run_turn()
         self.assert_at(avatar, RIGHT_OF_ORIGIN)
 
+    def test_turn_actions_discarded_after_turn(self):
+        self.construct_simulation_runner([MoveEastDummy], [ORIGIN])
+        self.run_turn()
+        self.assertIsNone(self.simulation_runner.turn_actions)
+
     def test_run_several_turns(self):
         """
         Given:  > _ _ _ _ _
@@ -221,6 +226,38 @@ class TestSimulationRunner(unittest.TestCase):
         self.run_turn()
         [self.assert_at(avatars[i], locations[i]) for i in range(5)]
 
+    def test_long_move_chain_succeeds(self):
+        """
+        Given:  > > ... > > _
+
+        Expect: _ o ... o o o
+        """
+        length = 3000
+        self.construct_simulation_runner([MoveEastDummy for _ in range(length)],
+                                         [Location(x, 0) for x in range(length)])
+        avatars = [self.get_avatar(i) for i in range(length)]
+
+        self.run_turn()
+        [self.assert_at(avatars[x], Location(x + 1, 0)) for x in range(length)]
+        self.assertIsNone(self.game_state.world_map.get_cell(ORIGIN).avatar)
+
+    def test_move_chains_resolved_independently(self):
+        """
+        Given:  > > _ > x
+
+        Expect: _ o o x x
+        """
+        locations = [Location(x, 0) for x in (0, 1, 3, 4)]
+        self.construct_simulation_runner([MoveEastDummy, MoveEastDummy, MoveEastDummy, WaitDummy],
+                                         locations)
+        avatars = [self.get_avatar(i) for i in range(4)]
+
+        self.run_turn()
+        self.assert_at(avatars[0], Location(1, 0))
+        self.assert_at(avatars[1], Location(2, 0))
+        self.assert_at(avatars[2], Location(3, 0))
+        self.assert_at(avatars[3], Location(4, 0))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,73 @@
+from __future__ import absolute_import
+
+import random
+from unittest import TestCase
+
+from simulation.game_logic.spawn_location_finder import IndexedSet
+from simulation.location import Location
+from simulation.world_map import WorldMap
+from .dummy_avatar import DummyAvatar
+from .maps import MockCell, MockPickup
+
+
+class TestIndexedSet(TestCase):
+    def test_add_and_discard(self):
+        items = [object() for _ in range(5)]
+        indexed_set = IndexedSet(items)
+        indexed_set.add(items[0])
+        self.assertEqual(len(indexed_set), 5)
+
+        indexed_set.discard(items[1])
+        indexed_set.discard(items[1])
+        self.assertEqual(len(indexed_set), 4)
+        self.assertNotIn(items[1], indexed_set)
+        self.assertEqual(set(map(id, indexed_set)), set(map(id, items)) - {id(items[1])})
+
+    def test_discard_last_item(self):
+        items = [object(), object()]
+        indexed_set = IndexedSet(items)
+        indexed_set.discard(items[1])
+        indexed_set.discard(items[0])
+        self.assertEqual(len(indexed_set), 0)
+
+    def test_sample_is_distinct(self):
+        indexed_set = IndexedSet(range(100))
+        sample = indexed_set.sample(30, rng=random.Random(1))
+        self.assertEqual(len(sample), 30)
+        self.assertEqual(len(set(sample)), 30)
+
+    def test_sample_more_than_available(self):
+        indexed_set = IndexedSet(['a', 'b'])
+        self.assertEqual(sorted(indexed_set.sample(5)), ['a', 'b'])
+
+
+class TestSpawnLocationFinder(TestCase):
+    def setUp(self):
+        self.grid = {Location(x, 0): MockCell(Location(x, 0)) for x in range(4)}
+        self.world_map = WorldMap(self.grid, {})
+
+    def spawn_locations(self):
+        return set(cell.location for cell in self.world_map._spawn_location_finder.get_random_spawn_locations(10))
+
+    def test_all_free_cells_are_found(self):
+        self.assertEqual(self.spawn_locations(), set(self.grid.keys()))
+
+    def test_index_follows_cell_changes(self):
+        self.assertEqual(len(self.spawn_locations()), 4)
+        self.grid[Location(0, 0)].habitable = False
+        self.grid[Location(1, 0)].generates_score = True
+        self.grid[Location(2, 0)].avatar = DummyAvatar()
+        self.assertEqual(self.spawn_locations(), {Location(3, 0)})
+
+        self.grid[Location(3, 0)].pickup = MockPickup()
+        self.assertEqual(self.spawn_locations(), set())
+        with self.assertRaises(IndexError):
+            self.world_map.get_random_spawn_location()
+
+        self.grid[Location(2, 0)].avatar = None
+        self.assertEqual(self.world_map.get_random_spawn_location(), Location(2, 0))
+
+    def test_added_cells_are_free(self):
+        self.world_map.get_random_spawn_location()
+        self.world_map.add_cell(MockCell(Location(4, 0)))
+        self.assertIn(Location(4, 0), self.spawn_locations())
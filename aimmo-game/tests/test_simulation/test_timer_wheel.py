@@ -0,0 +1,47 @@
+from unittest import TestCase
+
+from simulation.timer_wheel import TimerWheel
+
+
+class TestTimerWheel(TestCase):
+    def setUp(self):
+        self.timer_wheel = TimerWheel()
+        self.called = []
+
+    def callback(self, name):
+        return lambda: self.called.append(name)
+
+    def advance(self, turns):
+        for _ in range(turns):
+            self.timer_wheel.advance()
+
+    def test_timers_called_on_their_turn(self):
+        self.timer_wheel.schedule(self.callback('late'), 3)
+        self.timer_wheel.schedule(self.callback('early'), 1)
+
+        self.advance(1)
+        self.assertEqual(self.called, ['early'])
+        self.advance(1)
+        self.assertEqual(self.called, ['early'])
+        self.advance(1)
+        self.assertEqual(self.called, ['early', 'late'])
+        self.assertEqual(len(self.timer_wheel), 0)
+
+    def test_schedule_returns_expiry_turn(self):
+        self.advance(2)
+        self.assertEqual(self.timer_wheel.schedule(self.callback('timer'), 5), 7)
+
+    def test_timer_called_next_turn_at_the_earliest(self):
+        self.timer_wheel.schedule(self.callback('timer'), 0)
+        self.advance(1)
+        self.assertEqual(self.called, ['timer'])
+
+    def test_cancelled_timer_not_called(self):
+        callback = self.callback('cancelled')
+        expiry_turn = self.timer_wheel.schedule(callback, 2)
+        self.timer_wheel.schedule(self.callback('kept'), 2)
+        self.timer_wheel.cancel(callback, expiry_turn)
+        self.timer_wheel.cancel(callback, expiry_turn)
+
+        self.advance(2)
+        self.assertEqual(self.called, ['kept'])
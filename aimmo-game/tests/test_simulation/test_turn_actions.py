@@ -0,0 +1,40 @@
+from unittest import TestCase
+
+from simulation.action import AttackAction, MoveAction, WaitAction
+from simulation.location import Location
+from simulation.turn_actions import TurnActions
+
+from .dummy_avatar import DummyAvatar
+
+EAST = {'x': 1, 'y': 0}
+WEST = {'x': -1, 'y': 0}
+
+
+class TestTurnActions(TestCase):
+    def setUp(self):
+        self.turn_actions = TurnActions()
+        self.west_of_target = DummyAvatar(1, Location(0, 0))
+        self.east_of_target = DummyAvatar(2, Location(2, 0))
+        self.target = Location(1, 0)
+
+    def test_empty(self):
+        self.assertEqual(len(self.turn_actions), 0)
+        self.assertEqual(self.turn_actions.count(self.target, MoveAction), 0)
+        self.assertEqual(self.turn_actions.actions_into(self.target, MoveAction), [])
+
+    def test_actions_indexed_by_target_and_type(self):
+        move = MoveAction(self.west_of_target, EAST)
+        attack = AttackAction(self.east_of_target, WEST)
+        self.turn_actions.register(move)
+        self.turn_actions.register(attack)
+
+        self.assertEqual(len(self.turn_actions), 2)
+        self.assertEqual(self.turn_actions.actions_into(self.target, MoveAction), [move])
+        self.assertEqual(self.turn_actions.actions_into(self.target, AttackAction), [attack])
+        self.assertEqual(self.turn_actions.count(self.target, WaitAction), 0)
+        self.assertEqual(self.turn_actions.count(Location(0, 0), MoveAction), 0)
+
+    def test_moves_into_location_counted(self):
+        self.turn_actions.register(MoveAction(self.west_of_target, EAST))
+        self.turn_actions.register(MoveAction(self.east_of_target, WEST))
+        self.assertEqual(self.turn_actions.count(self.target, MoveAction), 2)
@@ -0,0 +1,50 @@
+from unittest import TestCase
+
+from simulation.turn_deadline import LatencyHistogram, TurnDeadline, percentile
+
+
+class MockWorker(object):
+    def __init__(self, latencies, is_slow=False):
+        self.latency = LatencyHistogram()
+        for latency in latencies:
+            self.latency.record(latency)
+        self.is_slow = is_slow
+
+
+class TestLatencyHistogram(TestCase):
+    def test_percentile(self):
+        self.assertEqual(percentile([1, 2, 3, 4], 50), 2)
+        self.assertEqual(percentile([1, 2, 3, 4], 95), 4)
+        self.assertEqual(percentile([1, 2, 3, 4], 0), 1)
+
+    def test_no_samples(self):
+        self.assertIsNone(LatencyHistogram().percentile(95))
+
+    def test_only_latest_samples_kept(self):
+        histogram = LatencyHistogram(window=3)
+        for latency in (10, 1, 2, 3):
+            histogram.record(latency)
+
+        self.assertEqual(histogram.samples(), [1, 2, 3])
+        self.assertEqual(histogram.percentile(100), 3)
+
+
+class TestTurnDeadline(TestCase):
+    def setUp(self):
+        self.turn_deadline = TurnDeadline(percent=50, min_deadline=0.1, max_deadline=2, headroom=2)
+
+    def test_deadline_follows_latency(self):
+        workers = [MockWorker([0.2, 0.3]), MockWorker([0.4, 0.5])]
+        self.assertAlmostEqual(self.turn_deadline.get_deadline(workers), 0.6)
+
+    def test_deadline_is_clamped(self):
+        self.assertEqual(self.turn_deadline.get_deadline([MockWorker([0.01])]), 0.1)
+        self.assertEqual(self.turn_deadline.get_deadline([MockWorker([5])]), 2)
+
+    def test_maximum_used_without_samples(self):
+        self.assertEqual(self.turn_deadline.get_deadline([]), 2)
+        self.assertEqual(self.turn_deadline.get_deadline([MockWorker([])]), 2)
+
+    def test_slow_workers_are_ignored(self):
+        workers = [MockWorker([0.2]), MockWorker([1.5, 1.5, 1.5], is_slow=True)]
+        self.assertAlmostEqual(self.turn_deadline.get_deadline(workers), 0.4)
@@ -1,7 +1,17 @@
-import mock
+import asyncio
+import json
 from unittest import TestCase
-from requests import Response
-from simulation.worker import Worker
+
+import aiohttp
+import mock
+from asynctest import CoroutineMock
+
+from simulation.action_plan import ActionPlan
+from simulation.game_state import WorkerStateView
+from simulation.http_client import HTTPResponse
+from simulation.turn_deadline import SLOW_WORKER_MISSES
+from simulation.worker import Worker, SKIPPED_TURN, hash_code
+from simulation.worker_health import FAILURES_TO_OPEN, READY, DEGRADED, OPEN, STARTING
 
 DEFAULT_RESPONSE_CONTENT = b'{"action": "test_action",' \
                            b'"log": "test_log",' \
@@ -14,22 +24,27 @@ MISSING_KEY_RESPONSE_CONTENT = b'{"corruptedKey": "test_action",' \
 
 def construct_test_response(status_code=200,
                             response_content=DEFAULT_RESPONSE_CONTENT):
-    post_response = Response()
-    post_response.status_code = status_code
-    post_response._content = response_content
-    return post_response
+    return HTTPResponse('http://test', status_code, response_content)
+
+
+class MockHTTPClient(object):
+    def __init__(self, **kwargs):
+        self.post = CoroutineMock(**kwargs)
+        self.get = CoroutineMock(return_value=construct_test_response())
 
 
 class TestWorker(TestCase):
     def setUp(self):
-        self.worker = Worker(worker_url='http://test')
+        self.http_client = MockHTTPClient(return_value=construct_test_response())
+        self.worker = Worker(worker_url='http://test', http_client=self.http_client)
+
+    def fetch_data(self, state_view):
+        asyncio.get_event_loop().run_until_complete(self.worker.fetch_data(state_view=state_view))
 
-    @mock.patch('simulation.worker.requests.post',
-                return_value=construct_test_response())
-    def test_fetch_data_fetches_correct_response(self, mocked_post):
-        self.worker.fetch_data(state_view={})
+    def test_fetch_data_fetches_correct_response(self):
+        self.fetch_data(state_view=WorkerStateView({}, b'{}'))
 
-        mocked_post.assert_called_once()
+        self.http_client.post.assert_called_once()
         self.assertEqual(self.worker.serialised_action, 'test_action')
         self.assertEqual(self.worker.log, 'test_log')
         self.assertEqual(self.worker.has_code_updated, 'True')
@@ -45,22 +60,169 @@ class TestWorker(TestCase):
         self.assertIsNone(self.worker.log)
         self.assertFalse(self.worker.has_code_updated)
 
-    @mock.patch('simulation.worker.requests.post',
-                return_value=construct_test_response(status_code=500))
     @mock.patch.object(target=Worker, attribute='_set_defaults')
-    def test_fetch_data_cannot_connect_to_worker(self, mocked_set_defaults,
-                                                 mocked_post):
-        self.worker.fetch_data(state_view={})
+    def test_fetch_data_cannot_connect_to_worker(self, mocked_set_defaults):
+        self.http_client.post.return_value = construct_test_response(status_code=500)
+        self.fetch_data(state_view=WorkerStateView({}, b'{}'))
 
-        mocked_post.assert_called_once()
+        self.http_client.post.assert_called_once()
         mocked_set_defaults.assert_called_once()
 
-    @mock.patch('simulation.worker.requests.post',
-                return_value=construct_test_response(response_content=MISSING_KEY_RESPONSE_CONTENT))
     @mock.patch.object(target=Worker, attribute='_set_defaults')
-    def test_missing_key_in_worker_data(self, mocked_set_defaults,
-                                        mocked_post):
-        self.worker.fetch_data(state_view={})
+    def test_connection_errors_and_timeouts(self, mocked_set_defaults):
+        for error in (aiohttp.ClientConnectionError(), asyncio.TimeoutError()):
+            self.http_client.post.side_effect = error
+            self.fetch_data(state_view=WorkerStateView({}, b'{}'))
+        self.assertEqual(mocked_set_defaults.call_count, 2)
 
-        mocked_post.assert_called_once()
+    @mock.patch.object(target=Worker, attribute='_set_defaults')
+    def test_missing_key_in_worker_data(self, mocked_set_defaults):
+        self.http_client.post.return_value = construct_test_response(
+            response_content=MISSING_KEY_RESPONSE_CONTENT)
+        self.fetch_data(state_view=WorkerStateView({}, b'{}'))
+
+        self.http_client.post.assert_called_once()
         mocked_set_defaults.assert_called_once()
+
+    def test_fetch_data_sends_encoded_view_and_code(self):
+        self.worker.code = 'code'
+        self.fetch_data(state_view=WorkerStateView({'score': 1}, b'{"cells":[]}'))
+
+        self.assertEqual(self.http_client.post.call_args[0], ('http://test',))
+        sent = json.loads(self.http_client.post.call_args[1]['data'].decode('utf-8'))
+        self.assertEqual(sent, {'avatar_state': {'score': 1},
+                                'world_map': {'cells': []},
+                                'turn': None,
+                                'code': 'code',
+                                'code_hash': hash_code('code'),
+                                'options': {},
+                                'state': None})
+
+    def test_whole_map_resent_on_turn_mismatch(self):
+        self.http_client.post.side_effect = [
+            construct_test_response(status_code=409),
+            construct_test_response(response_content=b'{"action": "a", "log": "",'
+                                                     b'"avatar_updated": false, "turn": 3}')]
+        state_view = WorkerStateView({}, b'{"cells":[]}', 3, b'{"base_turn":2,"changed_cells":[]}')
+        self.fetch_data(state_view=state_view)
+
+        first, second = [json.loads(call[1]['data'].decode('utf-8'))
+                         for call in self.http_client.post.call_args_list]
+        self.assertEqual(first['world_map'], {'base_turn': 2, 'changed_cells': []})
+        self.assertEqual(second['world_map'], {'cells': []})
+        self.assertEqual(self.worker.serialised_action, 'a')
+        self.assertEqual(self.worker.acknowledged_turn, 3)
+
+    def test_latency_recorded_for_replies(self):
+        self.worker.missed_deadlines = 2
+        self.fetch_data(state_view=WorkerStateView({}, b'{}'))
+
+        self.assertEqual(len(self.worker.latency), 1)
+        self.assertEqual(self.worker.missed_deadlines, 0)
+
+    def test_worker_flagged_slow_after_missed_deadlines(self):
+        for _ in range(SLOW_WORKER_MISSES - 1):
+            self.worker.record_missed_deadline(0.5)
+        self.assertFalse(self.worker.is_slow)
+
+        self.worker.record_missed_deadline(0.5)
+
+        self.assertTrue(self.worker.is_slow)
+        self.assertEqual(self.worker.latency.samples(), [0.5] * SLOW_WORKER_MISSES)
+
+    def test_circuit_opens_after_failed_requests(self):
+        self.http_client.post.side_effect = aiohttp.ClientConnectionError()
+        self.fetch_data(state_view=WorkerStateView({}, b'{}'))
+        self.assertEqual(self.worker.health.state, DEGRADED)
+
+        for _ in range(FAILURES_TO_OPEN - 1):
+            self.fetch_data(state_view=WorkerStateView({}, b'{}'))
+        self.assertEqual(self.worker.health.state, OPEN)
+        self.assertEqual(self.http_client.post.call_count, FAILURES_TO_OPEN)
+
+    def test_starting_worker_is_skipped_until_probe_succeeds(self):
+        worker = Worker(worker_url='http://test/turn/', http_client=self.http_client,
+                        ready_url='http://test/ready/')
+        self.assertEqual(worker.health.state, STARTING)
+
+        self.http_client.get.return_value = construct_test_response(status_code=503)
+        data = asyncio.get_event_loop().run_until_complete(
+            worker.request_data(WorkerStateView({}, b'{}')))
+        self.assertEqual(data, SKIPPED_TURN)
+        self.assertEqual(worker.health.state, STARTING)
+
+        worker.health._next_probe = 0
+        self.http_client.get.return_value = construct_test_response()
+        asyncio.get_event_loop().run_until_complete(worker.request_data(WorkerStateView({}, b'{}')))
+        self.assertEqual(worker.health.state, READY)
+        self.http_client.post.assert_not_called()
+        self.http_client.get.assert_called_with('http://test/ready/')
+
+    def test_skipped_worker_waits(self):
+        worker = Worker(worker_url='http://test/turn/', http_client=self.http_client,
+                        ready_url='http://test/ready/')
+        worker.update_from_data(SKIPPED_TURN)
+        self.assertEqual(worker.serialised_action, {'action_type': 'wait'})
+
+    def sent_requests(self):
+        return [json.loads(call[1]['data'].decode('utf-8'))
+                for call in self.http_client.post.call_args_list]
+
+    def test_code_only_sent_until_acknowledged(self):
+        self.worker.code = 'code'
+        self.http_client.post.return_value = construct_test_response(
+            response_content=b'{"action": "a", "log": "", "avatar_updated": false, "code_hash": "%s"}'
+                             % hash_code('code').encode('utf-8'))
+        self.fetch_data(state_view=WorkerStateView({}, b'{}'))
+        self.fetch_data(state_view=WorkerStateView({}, b'{}'))
+        self.worker.code = 'new code'
+        self.fetch_data(state_view=WorkerStateView({}, b'{}'))
+
+        first, second, third = self.sent_requests()
+        self.assertEqual(first['code'], 'code')
+        self.assertNotIn('code', second)
+        self.assertEqual(second['code_hash'], hash_code('code'))
+        self.assertEqual(third['code'], 'new code')
+
+    def test_code_resent_when_unknown(self):
+        self.worker.code = 'code'
+        self.worker.acknowledged_code_hash = hash_code('code')
+        self.http_client.post.side_effect = [
+            construct_test_response(status_code=409, response_content=b'{"error": "unknown code"}'),
+            construct_test_response()]
+        self.fetch_data(state_view=WorkerStateView({}, b'{}'))
+
+        first, second = self.sent_requests()
+        self.assertNotIn('code', first)
+        self.assertEqual(second['code'], 'code')
+        self.assertEqual(self.worker.serialised_action, 'test_action')
+
+    def test_worker_not_requested_while_plan_holds(self):
+        self.http_client.post.return_value = construct_test_response(
+            response_content=b'{"action": {"action_type": "move"}, "log": "", "avatar_updated": false,'
+                             b'"turn": 1, "plan": [{"action": {"action_type": "wait"},'
+                             b'"condition": {"location": {"x": 0, "y": 1}}}]}')
+        self.fetch_data(state_view=WorkerStateView({'location': {'x': 0, 'y': 0}}, b'{}', 1))
+        self.assertEqual(self.worker.serialised_action, {'action_type': 'move'})
+
+        self.fetch_data(state_view=WorkerStateView({'location': {'x': 0, 'y': 1}}, b'{}', 2))
+        self.assertEqual(self.worker.serialised_action, {'action_type': 'wait'})
+        self.assertEqual(self.worker.acknowledged_turn, 1)
+        self.assertEqual(self.http_client.post.call_count, 1)
+
+        self.fetch_data(state_view=WorkerStateView({'location': {'x': 0, 'y': 1}}, b'{}', 3))
+        self.assertEqual(self.http_client.post.call_count, 2)
+
+    def test_plan_abandoned_when_avatar_is_elsewhere(self):
+        self.worker.plan = ActionPlan([{'action': {'action_type': 'wait'},
+                                        'condition': {'location': {'x': 0, 'y': 1}}}])
+        self.fetch_data(state_view=WorkerStateView({'location': {'x': 5, 'y': 5}}, b'{}'))
+
+        self.http_client.post.assert_called_once()
+        self.assertEqual(self.worker.serialised_action, 'test_action')
+        self.assertEqual(len(self.worker.plan), 0)
+
+    def test_plan_dropped_when_code_changes(self):
+        self.worker.plan = ActionPlan([{'action': {'action_type': 'wait'}}])
+        self.worker.code = 'new code'
+        self.assertEqual(len(self.worker.plan), 0)
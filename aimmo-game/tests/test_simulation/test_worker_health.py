@@ -0,0 +1,68 @@
+from unittest import TestCase
+
+from simulation.worker_health import (WorkerHealth, FAILURES_TO_OPEN, INITIAL_BACKOFF, MAX_BACKOFF,
+                                      STARTING, READY, DEGRADED, OPEN)
+
+
+class MockClock(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestWorkerHealth(TestCase):
+    def setUp(self):
+        self.clock = MockClock()
+        self.health = WorkerHealth(clock=self.clock)
+
+    def test_starting_worker_probed_straight_away(self):
+        self.assertEqual(self.health.state, STARTING)
+        self.assertFalse(self.health.accepts_requests)
+        self.assertTrue(self.health.probe_due)
+
+    def test_probes_back_off_exponentially(self):
+        delays = []
+        for _ in range(10):
+            self.health.record_failure()
+            start = self.clock.now
+            while not self.health.probe_due:
+                self.clock.now += INITIAL_BACKOFF
+            delays.append(self.clock.now - start)
+
+        self.assertEqual(delays[:3], [INITIAL_BACKOFF, 2 * INITIAL_BACKOFF, 4 * INITIAL_BACKOFF])
+        self.assertEqual(delays[-1], MAX_BACKOFF)
+        self.assertEqual(self.health.state, STARTING)
+
+    def test_ready_after_success(self):
+        self.health.record_failure()
+        self.health.record_success()
+
+        self.assertEqual(self.health.state, READY)
+        self.assertTrue(self.health.accepts_requests)
+        self.assertFalse(self.health.probe_due)
+
+    def test_circuit_opens_after_failures_in_a_row(self):
+        self.health.record_success()
+        self.health.record_failure()
+        self.assertEqual(self.health.state, DEGRADED)
+        self.assertTrue(self.health.accepts_requests)
+
+        for _ in range(FAILURES_TO_OPEN - 1):
+            self.health.record_failure()
+        self.assertEqual(self.health.state, OPEN)
+        self.assertFalse(self.health.accepts_requests)
+        self.assertFalse(self.health.probe_due)
+
+        self.clock.now += INITIAL_BACKOFF
+        self.assertTrue(self.health.probe_due)
+
+    def test_success_resets_failures(self):
+        self.health.record_success()
+        for _ in range(FAILURES_TO_OPEN - 1):
+            self.health.record_failure()
+        self.health.record_success()
+        self.health.record_failure()
+
+        self.assertEqual(self.health.state, DEGRADED)
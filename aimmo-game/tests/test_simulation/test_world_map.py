@@ -4,7 +4,11 @@ import math
 from string import ascii_uppercase
 from unittest import TestCase
 
+import mock
+
+from simulation.action import MoveAction
 from simulation.location import Location
+from simulation.turn_actions import TurnActions
 from simulation.world_map import WorldMap, WorldMapStaticSpawnDecorator
 from simulation.game_logic import SpawnLocationFinder
 from .dummy_avatar import DummyAvatar
@@ -117,6 +121,58 @@ class TestWorldMap(TestCase):
         self.assertIn(pickup_cell2, cells)
         self.assertEqual(len(cells), 2, "Non-pickup cells present")
 
+    def test_score_cells_follow_cell_changes(self):
+        grid = self._generate_grid()
+        world_map = WorldMap(grid, self.settings)
+        cell = list(grid.values())[0]
+        cell.generates_score = True
+        self.assertEqual(world_map.score_cells(), [cell])
+        cell.generates_score = False
+        self.assertEqual(world_map.score_cells(), [])
+
+    def test_pickup_cells_follow_cell_changes(self):
+        grid = self._generate_grid()
+        world_map = WorldMap(grid, self.settings)
+        cell = list(grid.values())[1]
+        cell.pickup = MockPickup()
+        self.assertEqual(world_map.pickup_cells(), [cell])
+        cell.pickup = None
+        self.assertEqual(world_map.pickup_cells(), [])
+
+    def test_occupied_cells(self):
+        grid = self._generate_grid()
+        world_map = WorldMap(grid, self.settings)
+        self.assertEqual(world_map.occupied_cells(), [])
+        cell = list(grid.values())[2]
+        cell.avatar = DummyAvatar()
+        self.assertEqual(world_map.occupied_cells(), [cell])
+        cell.avatar = None
+        self.assertEqual(world_map.occupied_cells(), [])
+
+    def test_added_cells_are_indexed(self):
+        world_map = WorldMap(self._generate_grid(), self.settings)
+        new_cell = MockCell(Location(5, 5), generates_score=True)
+        world_map.add_cell(new_cell)
+        self.assertIn(new_cell, world_map.score_cells())
+
+    def test_terrain_version_follows_obstacles_and_bounds(self):
+        grid = self._generate_grid()
+        world_map = WorldMap(grid, self.settings)
+        version = world_map.get_terrain_version()
+
+        grid[Location(0, 0)].generates_score = True
+        grid[Location(0, 0)].avatar = DummyAvatar()
+        self.assertEqual(world_map.get_terrain_version(), version)
+
+        grid[Location(0, 1)].habitable = False
+        self.assertGreater(world_map.get_terrain_version(), version)
+        self.assertEqual([obstacle['location'] for obstacle in world_map.serialise_obstacles()],
+                         [{'x': 0, 'y': 1}])
+
+        version = world_map.get_terrain_version()
+        world_map.add_cell(MockCell(Location(5, 5)))
+        self.assertGreater(world_map.get_terrain_version(), version)
+
     def test_location_on_map(self):
         world_map = WorldMap(self._generate_grid(), self.settings)
         for x in (0, 1):
@@ -313,10 +369,51 @@ class TestWorldMap(TestCase):
         target = Location(0, 0)
         self.assertFalse(world_map.can_move_to(target))
 
+    def test_cannot_move_to_cell_several_avatars_move_into(self):
+        world_map = WorldMap(self._generate_grid(), self.settings)
+        target = Location(1, 1)
+        turn_actions = TurnActions()
+        turn_actions.register(MoveAction(DummyAvatar(1, Location(0, 1)), {'x': 1, 'y': 0}))
+        self.assertTrue(world_map.can_move_to(target, turn_actions))
+        turn_actions.register(MoveAction(DummyAvatar(2, Location(1, 0)), {'x': 0, 'y': 1}))
+        self.assertFalse(world_map.can_move_to(target, turn_actions))
+
     def test_empty_grid(self):
         world_map = WorldMap({}, self.settings)
         self.assertFalse(world_map.is_on_map(Location(0, 0)))
 
+    def test_add_cell_updates_bounds(self):
+        world_map = WorldMap({}, self.settings)
+        world_map.add_cell(MockCell(Location(1, 2)))
+        self.assertGridSize(world_map, 1)
+        world_map.add_cell(MockCell(Location(-1, 3)))
+        self.assertEqual(world_map.get_serialised_south_west_corner(), {'x': -1, 'y': 2})
+        self.assertEqual(world_map.get_serialised_north_east_corner(), {'x': 1, 'y': 3})
+        self.assertEqual(world_map.num_cells, 6)
+        self.assertTrue(world_map.is_on_map(Location(-1, 3)))
+
+    def test_bounds_not_rescanned(self):
+        world_map = WorldMap(self._generate_grid(), self.settings)
+        world_map.grid = mock.MagicMock(wraps=world_map.grid)
+        self.assertEqual(world_map.num_cells, 4)
+        self.assertEqual(world_map.num_rows, 2)
+        self.assertEqual(world_map.num_cols, 2)
+        world_map.grid.__iter__.assert_not_called()
+        world_map.grid.keys.assert_not_called()
+        world_map.grid.values.assert_not_called()
+        world_map.grid.items.assert_not_called()
+
+    def test_empty_map_bounds(self):
+        world_map = WorldMap({}, self.settings)
+        self.assertEqual(world_map.num_rows, 0)
+        self.assertEqual(world_map.num_cols, 0)
+        self.assertEqual(world_map.num_cells, 0)
+
+        world_map.add_cell(MockCell(Location(2, -3)))
+        self.assertEqual((world_map.min_x(), world_map.max_x()), (2, 2))
+        self.assertEqual((world_map.min_y(), world_map.max_y()), (-3, -3))
+        self.assertEqual(world_map.num_cells, 1)
+
     def test_iter(self):
         grid = [
             [MockCell(Location(-1, -1), name='A'), MockCell(Location(-1, 0), name='B'), MockCell(Location(-1, 1), name='C')],
@@ -326,6 +423,30 @@ class TestWorldMap(TestCase):
         world_map = WorldMap(self._grid_from_list(grid), self.settings)
         self.assertEqual([list(column) for column in world_map], grid)
 
+    def test_serialise_view_clipped_to_map(self):
+        world_map = WorldMap.generate_empty_map(5, 5, self.settings)
+        cells = world_map.serialise_view(Location(2, 2), 1, 1)
+        self.assertEqual(sorted((c['location']['x'], c['location']['y']) for c in cells),
+                         [(1, 1), (1, 2), (2, 1), (2, 2)])
+        self.assertFalse(any(c['partially_fogged'] for c in cells))
+
+    def test_serialise_view_partially_fogs_outer_ring(self):
+        world_map = WorldMap.generate_empty_map(5, 5, self.settings)
+        world_map.get_cell(Location(2, 0)).generates_score = True
+        cells = {(c['location']['x'], c['location']['y']): c
+                 for c in world_map.serialise_view(Location(0, 0), 1, 2)}
+        self.assertEqual(len(cells), 25)
+        self.assertEqual(cells[(1, -1)]['habitable'], True)
+        self.assertFalse(cells[(1, -1)]['partially_fogged'])
+        self.assertEqual(cells[(2, 0)], {'generates_score': True,
+                                         'location': {'x': 2, 'y': 0},
+                                         'partially_fogged': True})
+
+    def test_serialise_view_skips_missing_cells(self):
+        world_map = WorldMap(self._grid_from_list([[MockCell(Location(0, 0))]]), self.settings)
+        world_map.add_cell(MockCell(Location(2, 2)))
+        self.assertEqual(len(world_map.serialise_view(Location(1, 1), 2, 2)), 2)
+
     def test_attackable_avatar_returns_none(self):
         world_map = WorldMap(self._generate_grid(), self.settings)
         for x in (0, 1):
@@ -338,6 +459,15 @@ class TestWorldMap(TestCase):
 
         self.assertEqual(world_map.attackable_avatar(Location(0, 0)), avatar)
 
+    def test_attackable_avatar_returns_avatar_moving_in(self):
+        world_map = WorldMap(self._generate_grid(), self.settings)
+        avatar = DummyAvatar(1, Location(0, 1))
+        turn_actions = TurnActions()
+        turn_actions.register(MoveAction(avatar, {'x': 1, 'y': 0}))
+
+        self.assertIsNone(world_map.attackable_avatar(Location(1, 1)))
+        self.assertEqual(world_map.attackable_avatar(Location(1, 1), turn_actions), avatar)
+
 
 class TestWorldMapWithOriginCentre(TestWorldMap):
     def _generate_grid(self, columns=2, rows=2):
@@ -0,0 +1,121 @@
+import asyncio
+import time
+from unittest import TestCase
+
+import mock
+from asynctest import CoroutineMock
+
+from simulation.game_state import WorkerStateView
+from simulation.worker import Worker
+from simulation.worker_health import WorkerHealth, READY, OPEN, STARTING, INITIAL_BACKOFF
+from ..concrete_worker_manager import ConcreteWorkerManager
+
+
+class MockWorker(object):
+    def __init__(self, reply_after):
+        self.reply_after = reply_after
+        self.serialised_action = 'previous action'
+        self.state_view = None
+        self.missed_deadlines = []
+        self.is_slow = False
+        self.health = WorkerHealth(state=READY)
+
+    def record_missed_deadline(self, deadline):
+        self.missed_deadlines.append(deadline)
+
+    async def request_data(self, state_view):
+        await asyncio.sleep(self.reply_after)
+        return {'action': 'action', 'state_view': state_view}
+
+    def update_from_data(self, data):
+        self.serialised_action = data and data['action']
+        self.state_view = data and data['state_view']
+
+
+class TestWorkerManager(TestCase):
+    def setUp(self):
+        self.worker_manager = ConcreteWorkerManager()
+
+    def fetch_all_worker_data(self, workers, deadline):
+        self.worker_manager.player_id_to_worker = workers
+        start = time.time()
+        asyncio.get_event_loop().run_until_complete(self.worker_manager.fetch_all_worker_data(
+            {player_id: 'view %s' % player_id for player_id in workers}, deadline=deadline))
+        return time.time() - start
+
+    def test_finishes_when_all_workers_have_replied(self):
+        workers = {player_id: MockWorker(0.01) for player_id in range(20)}
+        elapsed = self.fetch_all_worker_data(workers, deadline=5)
+
+        self.assertLess(elapsed, 1)
+        for player_id, worker in workers.items():
+            self.assertEqual(worker.serialised_action, 'action')
+            self.assertEqual(worker.state_view, 'view %s' % player_id)
+
+    def test_slow_workers_are_cut_off_at_the_deadline(self):
+        fast_worker, slow_worker = MockWorker(0), MockWorker(10)
+        elapsed = self.fetch_all_worker_data({1: fast_worker, 2: slow_worker}, deadline=0.1)
+
+        self.assertLess(elapsed, 1)
+        self.assertEqual(fast_worker.serialised_action, 'action')
+        self.assertIsNone(slow_worker.serialised_action)
+        self.assertIsNone(slow_worker.state_view)
+        self.assertEqual(slow_worker.missed_deadlines, [0.1])
+        self.assertEqual(fast_worker.missed_deadlines, [])
+
+    def test_probe_cut_off_at_the_deadline_is_not_a_missed_turn(self):
+        async def hang(url):
+            await asyncio.sleep(10)
+
+        http_client = mock.Mock(get=CoroutineMock(side_effect=hang))
+        worker = Worker('http://test/turn/', http_client, ready_url='http://test/ready/')
+        self.worker_manager.player_id_to_worker = {1: worker}
+        asyncio.get_event_loop().run_until_complete(self.worker_manager.fetch_all_worker_data(
+            {1: WorkerStateView({}, b'{}')}, deadline=0.1))
+        asyncio.get_event_loop().run_until_complete(asyncio.sleep(0))
+
+        http_client.get.assert_called_once_with('http://test/ready/')
+        self.assertEqual(worker.serialised_action, {'action_type': 'wait'})
+        self.assertEqual(worker.missed_deadlines, 0)
+        self.assertEqual(worker.health.state, STARTING)
+        self.assertEqual(worker.health.failures, 0)
+        self.assertEqual(worker.health._backoff, INITIAL_BACKOFF)
+
+    def test_no_workers(self):
+        self.assertLess(self.fetch_all_worker_data({}, deadline=5), 1)
+
+    def test_workers_only_updated_when_data_applied(self):
+        worker = MockWorker(0)
+        self.worker_manager.player_id_to_worker = {1: worker}
+        worker_to_data = asyncio.get_event_loop().run_until_complete(
+            self.worker_manager.request_all_worker_data({1: 'view'}, deadline=5))
+
+        self.assertEqual(worker.serialised_action, 'previous action')
+        self.worker_manager.apply_worker_data(worker_to_data)
+        self.assertEqual(worker.serialised_action, 'action')
+
+    def test_slow_player_ids(self):
+        fast_worker, slow_worker = MockWorker(0), MockWorker(0)
+        slow_worker.is_slow = True
+        self.worker_manager.player_id_to_worker = {1: fast_worker, 2: slow_worker}
+
+        self.assertEqual(self.worker_manager.get_slow_player_ids(), [2])
+
+    def test_unavailable_player_ids(self):
+        ready_worker, open_worker = MockWorker(0), MockWorker(0)
+        open_worker.health.state = OPEN
+        self.worker_manager.player_id_to_worker = {1: ready_worker, 2: open_worker}
+
+        self.assertEqual(self.worker_manager.get_unavailable_player_ids(), [2])
+
+    def test_players_with_changed_code(self):
+        workers = {player_id: MockWorker(0) for player_id in range(3)}
+        for player_id, worker in workers.items():
+            worker.code_revision = 'revision %s' % player_id
+        self.worker_manager.player_id_to_worker = workers
+        players = [{'id': 0, 'code_revision': 'revision 0'},
+                   {'id': 1, 'code_revision': 'new revision'},
+                   {'id': 2, 'code_revision': 'revision 2'},
+                   {'id': 3, 'code_revision': 'revision 3'}]
+
+        self.assertEqual(self.worker_manager.get_players_with_changed_code(players), [1])
@@ -11,10 +11,24 @@ from simulation.worker_managers.local_worker_manager import LocalWorkerManager
 from simulation.game_runner import GameRunner
 
 
+class MockWorldMap(object):
+    def __init__(self):
+        self.terrain_version = 0
+
+    def get_terrain_version(self):
+        return self.terrain_version
+
+
 class MockGameState(object):
-    def serialise(self):
+    def __init__(self):
+        self.world_map = MockWorldMap()
+
+    def serialise_entities(self):
         return {'foo': 'bar'}
 
+    def serialise_terrain(self):
+        return {'terrainVersion': self.world_map.terrain_version}
+
 
 class MockedSocketIOServer(mock.MagicMock):
     """ Decorator function that just returns the function. Needed because we decorate
@@ -33,6 +47,7 @@ class TestSocketIO:
         self.environ = {'QUERY_STRING': 'avatar_id=1&EIO=3&transport=polling&t=MJhoMgb'}
         self.game_api = self.create_game_api()
         self.mocked_mappings = self.game_api._socket_session_id_to_player_id
+        self.game_api._sent_terrain_version = 0
         self.sid = ''.join(random.choice(string.ascii_uppercase +
                                          string.ascii_lowercase +
                                          string.digits)
@@ -60,6 +75,16 @@ class TestSocketIO:
 
         assert mocked_socketio.manager.emit.mockreturn_value.emit.assert_called_once
 
+    @pytest.mark.asyncio
+    async def test_session_joins_game_room_on_connect(self):
+        self.game_api.worker_manager.add_new_worker(1)
+        with mock.patch('service.socketio_server') as mocked_socketio:
+            mocked_socketio.on.return_value = lambda func: func
+            mocked_socketio.emit = CoroutineMock()
+            await self.game_api.register_world_update_on_connect()(self.sid, self.environ)
+
+            mocked_socketio.enter_room.assert_called_once_with(self.sid, service.GAME_ROOM)
+
     @pytest.mark.asyncio
     @mock.patch('service.app')
     @mock.patch('service.socketio_server.emit', new_callable=CoroutineMock())
@@ -100,7 +125,8 @@ class TestSocketIO:
         with mock.patch('service.socketio_server.emit', new=CoroutineMock()) as mocked_emit:
             await self.game_api.send_updates()
 
-            game_state_call = mock.call('game-state', {'foo': 'bar'}, room=self.sid)
+            game_state_call = mock.call('game-state', service.EncodedJSON({'foo': 'bar'}),
+                                        room=service.GAME_ROOM)
             log_call = mock.call('log', 'Logs one', room=self.sid)
 
             mocked_emit.assert_has_calls([game_state_call, log_call], any_order=True)
@@ -116,7 +142,8 @@ class TestSocketIO:
         with mock.patch('service.socketio_server.emit', new=CoroutineMock()) as mocked_emit:
             await self.game_api.send_updates()
 
-            mocked_emit.assert_called_once_with('game-state', {'foo': 'bar'}, room=self.sid)
+            mocked_emit.assert_called_once_with('game-state', service.EncodedJSON({'foo': 'bar'}),
+                                                room=service.GAME_ROOM)
 
     @pytest.mark.asyncio
     @mock.patch('service.app')
@@ -132,7 +159,8 @@ class TestSocketIO:
         with mock.patch('service.socketio_server.emit', new=CoroutineMock()) as mocked_emit:
             await self.game_api.send_updates()
 
-            mocked_emit.assert_called_once_with('game-state', {'foo': 'bar'}, room=self.sid)
+            mocked_emit.assert_called_once_with('game-state', service.EncodedJSON({'foo': 'bar'}),
+                                                room=service.GAME_ROOM)
 
     @pytest.mark.asyncio
     @mock.patch('service.app')
@@ -151,15 +179,15 @@ class TestSocketIO:
         with mock.patch('service.socketio_server.emit', new=CoroutineMock()) as mocked_emit:
             await self.game_api.send_updates()
 
-            user_one_game_state_call = mock.call('game-state', {'foo': 'bar'}, room=self.sid)
-            user_two_game_state_call = mock.call('game-state', {'foo': 'bar'}, room='differentsid')
+            game_state_call = mock.call('game-state', service.EncodedJSON({'foo': 'bar'}),
+                                        room=service.GAME_ROOM)
             user_one_log_call = mock.call('log', 'Logs one', room=self.sid)
             user_two_log_call = mock.call('log', 'Logs two', room='differentsid')
 
-            mocked_emit.assert_has_calls([user_one_game_state_call,
-                                                   user_two_game_state_call,
-                                                   user_one_log_call,
-                                                   user_two_log_call], any_order=True)
+            mocked_emit.assert_has_calls([game_state_call,
+                                          user_one_log_call,
+                                          user_two_log_call], any_order=True)
+            assert mocked_emit.call_count == 3
 
     @pytest.mark.asyncio
     @mock.patch('service.app')
@@ -173,7 +201,8 @@ class TestSocketIO:
         with mock.patch('service.socketio_server.emit', new=CoroutineMock()) as mocked_emit:        
             await self.game_api.send_updates()
 
-            user_game_state_call = mock.call('game-state', {'foo': 'bar'}, room=self.sid)
+            user_game_state_call = mock.call('game-state', service.EncodedJSON({'foo': 'bar'}),
+                                             room=service.GAME_ROOM)
             user_game_code_changed_call = mock.call('feedback-avatar-updated', {}, room=self.sid)
 
             mocked_emit.assert_has_calls([user_game_state_call, user_game_code_changed_call], any_order=True)
@@ -190,7 +219,76 @@ class TestSocketIO:
         with mock.patch('service.socketio_server.emit', new=CoroutineMock()) as mocked_emit:
             await self.game_api.send_updates()
 
-            mocked_emit.assert_called_once_with('game-state', {'foo': 'bar'}, room=self.sid)
+            mocked_emit.assert_called_once_with('game-state', service.EncodedJSON({'foo': 'bar'}),
+                                                room=service.GAME_ROOM)
+
+    @pytest.mark.asyncio
+    async def test_terrain_only_sent_when_it_changes(self):
+        self.mocked_mappings[self.sid] = 1
+        self.game_api.worker_manager.add_new_worker(self.mocked_mappings[self.sid])
+        terrain_call = mock.call('game-terrain', service.EncodedJSON({'terrainVersion': 1}),
+                                 room=service.GAME_ROOM)
+
+        with mock.patch('service.socketio_server.emit', new=CoroutineMock()) as mocked_emit:
+            self.game_api.game_state.world_map.terrain_version = 1
+            await self.game_api.send_updates()
+            await self.game_api.send_updates()
+
+            assert mocked_emit.call_args_list.count(terrain_call) == 1
+            assert mocked_emit.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_terrain_sent_to_new_session_on_connect(self):
+        self.game_api.worker_manager.add_new_worker(1)
+        with mock.patch('service.socketio_server') as mocked_socketio:
+            mocked_socketio.on.return_value = lambda func: func
+            mocked_socketio.emit = CoroutineMock()
+            await self.game_api.register_world_update_on_connect()(self.sid, self.environ)
+
+            mocked_socketio.emit.assert_any_call('game-terrain',
+                                                 service.EncodedJSON({'terrainVersion': 0}),
+                                                 room=self.sid)
+
+    @pytest.mark.asyncio
+    async def test_terrain_sent_once_on_first_connect(self):
+        self.game_api._sent_terrain_version = None
+        self.game_api.worker_manager.add_new_worker(1)
+        with mock.patch('service.socketio_server') as mocked_socketio:
+            mocked_socketio.on.return_value = lambda func: func
+            mocked_socketio.emit = CoroutineMock()
+            await self.game_api.register_world_update_on_connect()(self.sid, self.environ)
+
+            terrain_calls = [call for call in mocked_socketio.emit.call_args_list
+                             if call[0][0] == 'game-terrain']
+            assert terrain_calls == [mock.call('game-terrain',
+                                               service.EncodedJSON({'terrainVersion': 0}),
+                                               room=service.GAME_ROOM)]
+
+    @pytest.mark.asyncio
+    async def test_compact_encoding_negotiated_in_query(self):
+        self.environ['QUERY_STRING'] = 'avatar_id=1&encoding=compact&EIO=3&transport=polling'
+        self.game_api.worker_manager.add_new_worker(1)
+        entities = {'terrainVersion': 0, 'players': [], 'pickups': [], 'scoreLocations': []}
+        terrain = {'terrainVersion': 0, 'obstacles': [],
+                   'southWestCorner': {'x': -1, 'y': -1}, 'northEastCorner': {'x': 1, 'y': 1}}
+        self.game_api.game_state.serialise_entities = lambda: entities
+        self.game_api.game_state.serialise_terrain = lambda: terrain
+
+        with mock.patch('service.socketio_server') as mocked_socketio:
+            mocked_socketio.on.return_value = lambda func: func
+            mocked_socketio.emit = CoroutineMock()
+            await self.game_api.register_world_update_on_connect()(self.sid, self.environ)
+
+            mocked_socketio.enter_room.assert_called_once_with(self.sid, service.COMPACT_GAME_ROOM)
+            mocked_socketio.emit.assert_any_call('game-terrain', service.encode_terrain(terrain),
+                                                 room=self.sid)
+            mocked_socketio.emit.assert_any_call('game-state', service.encode_entities(entities),
+                                                 room=service.COMPACT_GAME_ROOM)
+            mocked_socketio.emit.assert_any_call('game-state', service.EncodedJSON(entities),
+                                                 room=service.GAME_ROOM)
+
+        await self.game_api.register_remove_session_id_from_mappings()(sid=self.sid)
+        assert not self.game_api._compact_session_ids
 
     @pytest.mark.asyncio
     async def test_remove_session_id_on_disconnect(self):
@@ -203,3 +301,15 @@ class TestSocketIO:
 
         assert self.sid not in self.mocked_mappings
         assert len(self.mocked_mappings) ==  0
+
+
+class TestPacketJSON(TestCase):
+    def test_encoded_json_is_spliced_into_packet(self):
+        encoded = service.EncodedJSON({'foo': [1, 2]})
+        packet = service._PacketJSON.dumps(['game-state', encoded], separators=(',', ':'))
+        self.assertEqual(packet, '["game-state",{"foo":[1,2]}]')
+        self.assertEqual(service._PacketJSON.loads(packet), ['game-state', {'foo': [1, 2]}])
+
+    def test_other_data_is_encoded_as_usual(self):
+        self.assertEqual(service._PacketJSON.dumps(['log', 'text'], separators=(',', ':')),
+                         '["log","text"]')
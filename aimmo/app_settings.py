@@ -9,6 +9,10 @@ GAME_SERVER_PORT_FUNCTION = getattr(settings, 'AIMMO_GAME_SERVER_PORT_FUNCTION',
 GAME_SERVER_SSL_FLAG = getattr(settings, 'AIMMO_GAME_SERVER_SSL_FLAG', False)
 PREVIEW_USER_AIMMO_DECORATOR = getattr(settings, 'PREVIEW_USER_AIMMO_DECORATOR', None)
 USERS_FOR_NEW_AIMMO_GAME = getattr(settings, 'USERS_FOR_NEW_AIMMO_GAME', None)
+#: Import path of a function called with the id of a game whose players or code have
+#: changed, see aimmo.notifications
+GAME_NOTIFIER = getattr(settings, 'AIMMO_GAME_NOTIFIER', None)
+GAME_NOTIFICATION_HOST = getattr(settings, 'AIMMO_GAME_NOTIFICATION_HOST', '127.0.0.1')
 
 
 def get_aimmo_preview_user_decorator():
@@ -37,6 +41,16 @@ def get_users_for_new_game(request):
     return User.objects.all()
 
 
+def notify_game_changed(game_id):
+    """
+    Tells the game server that the players of a game or their code have changed, if a
+    notifier is set up. Otherwise the game finds out on its next poll.
+    """
+    if GAME_NOTIFIER:
+        notifier = import_string(GAME_NOTIFIER)
+        notifier(game_id)
+
+
 preview_user_required = get_aimmo_preview_user_decorator()
 
 MAX_LEVEL = 1
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from hashlib import sha256
+
+from django.db import migrations, models
+from django.utils.encoding import force_bytes
+
+
+def generate_code_revision(code):
+    """
+    A copy of aimmo.models.generate_code_revision as it was when this migration was
+    written, so that later changes to it don't change the migration.
+    """
+    return sha256(force_bytes(code)).hexdigest()
+
+
+def set_code_revisions(apps, schema_editor):
+    Avatar = apps.get_model('aimmo', 'Avatar')
+    for avatar in Avatar.objects.all():
+        avatar.code_revision = generate_code_revision(avatar.code)
+        avatar.save(update_fields=['code_revision'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aimmo', '0008_default_public_field'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='avatar',
+            name='code_revision',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.RunPython(set_code_revisions, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,12 @@
 from base64 import urlsafe_b64encode
+from hashlib import sha256
 from os import urandom
 
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils.encoding import force_bytes
 
 from aimmo import app_settings
 
@@ -15,6 +19,10 @@ def generate_auth_token():
     return urlsafe_b64encode(urandom(16))
 
 
+def generate_code_revision(code):
+    return sha256(force_bytes(code)).hexdigest()
+
+
 class GameQuerySet(models.QuerySet):
     def for_user(self, user):
         if user.is_authenticated():
@@ -36,6 +44,8 @@ class Game(models.Model):
     main_user = models.ForeignKey(User, blank=True, null=True, related_name='games_for_user')
     objects = GameQuerySet.as_manager()
     static_data = models.TextField(blank=True, null=True)
+    # Incremented whenever the game or its avatars change, to tag the game API responses.
+    version = models.PositiveIntegerField(default=0, editable=False)
 
     # Game config
     generator = models.CharField(max_length=20, choices=GAME_GENERATORS, default=GAME_GENERATORS[0][0])
@@ -73,18 +83,60 @@ class Game(models.Model):
 
     def save(self, *args, **kwargs):
         super(Game, self).full_clean()
-        super(Game, self).save(*args, **kwargs)
+        adding = self._state.adding
+        loaded_version = self.version
+        if not adding:
+            # Incremented in the database, as the version may have changed since this
+            # game was loaded.
+            self.version = models.F('version') + 1
+        try:
+            super(Game, self).save(*args, **kwargs)
+        except Exception:
+            self.version = loaded_version
+            raise
+        if not adding:
+            self.refresh_from_db(fields=['version'])
+            notify_game_changed_on_commit(self.pk)
+
+
+def notify_game_changed_on_commit(game_id):
+    """
+    Notifies the game once the change is committed, so that it doesn't fetch its players
+    before it can see the change. Django 1.8 has no commit hooks, so the game is notified
+    straight away there.
+    """
+    on_commit = getattr(transaction, 'on_commit', None)
+    if on_commit is None:
+        app_settings.notify_game_changed(game_id)
+    else:
+        on_commit(lambda: app_settings.notify_game_changed(game_id))
+
+
+def increment_game_version(game_id):
+    Game.objects.filter(pk=game_id).update(version=models.F('version') + 1)
+    notify_game_changed_on_commit(game_id)
 
 
 class Avatar(models.Model):
     owner = models.ForeignKey(User)
     game = models.ForeignKey(Game)
     code = models.TextField()
+    code_revision = models.CharField(max_length=64, blank=True, editable=False)
     auth_token = models.CharField(max_length=24, default=generate_auth_token)
 
     class Meta:
         unique_together = ('owner', 'game')
 
+    def save(self, *args, **kwargs):
+        self.code_revision = generate_code_revision(self.code)
+        super(Avatar, self).save(*args, **kwargs)
+        increment_game_version(self.game_id)
+
+
+@receiver(post_delete, sender=Avatar)
+def _avatar_deleted(sender, instance, **kwargs):
+    increment_game_version(instance.game_id)
+
 
 class LevelAttempt(models.Model):
     level_number = models.IntegerField()
@@ -0,0 +1,48 @@
+"""
+Notifiers telling the game servers that the players of a game or their code have
+changed, so that they don't have to poll for it. One of them is chosen with the
+AIMMO_GAME_NOTIFIER setting.
+"""
+import json
+import logging
+import socket
+
+from aimmo import app_settings
+
+LOGGER = logging.getLogger(__name__)
+
+_in_process_subscribers = []
+
+
+def publish_over_udp(game_id):
+    """
+    Sends the notification as a UDP datagram to the game's port, on which games started
+    with GAME_NOTIFICATIONS=udp listen. Notifications may be lost, which the games
+    make up for by still polling every so often.
+    """
+    message = json.dumps({'game_id': game_id}).encode('utf-8')
+    address = (app_settings.GAME_NOTIFICATION_HOST, app_settings.GAME_SERVER_PORT_FUNCTION(game_id))
+    udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        udp_socket.sendto(message, address)
+    except socket.error as e:
+        LOGGER.warning('Could not notify game %s: %s', game_id, e)
+    finally:
+        udp_socket.close()
+
+
+def subscribe_in_process(callback):
+    _in_process_subscribers.append(callback)
+
+
+def unsubscribe_in_process(callback):
+    _in_process_subscribers.remove(callback)
+
+
+def publish_in_process(game_id):
+    """
+    Calls the subscribed callbacks with the id of the game, for tests and for games
+    running in the same process.
+    """
+    for callback in list(_in_process_subscribers):
+        callback(game_id)
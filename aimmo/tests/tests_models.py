@@ -1,7 +1,11 @@
 from django.contrib.auth.models import AnonymousUser, User
-from django.test import TestCase
+from django.db import DatabaseError, transaction
+from django.test import TestCase, TransactionTestCase
+from unittest import skipUnless
 
-from aimmo import models, app_settings
+import mock
+
+from aimmo import models, app_settings, notifications
 
 app_settings.GAME_SERVER_URL_FUNCTION = lambda game_id: ('base %s' % game_id, 'path %s' % game_id)
 app_settings.GAME_SERVER_PORT_FUNCTION = lambda game_id: 0
@@ -51,3 +55,61 @@ class TestModels(TestCase):
         self.game.completed = True
         self.game.save()
         self.assertFalse(self.game.is_active)
+
+    def test_avatar_code_revision_changes_with_code(self):
+        avatar = models.Avatar(owner=self.user1, code='class Avatar: pass', game=self.game)
+        avatar.save()
+        first_revision = avatar.code_revision
+
+        avatar.save()
+        self.assertEqual(avatar.code_revision, first_revision)
+
+        avatar.code = 'class Avatar: pass\n'
+        avatar.save()
+        self.assertNotEqual(avatar.code_revision, first_revision)
+        self.assertEqual(models.Avatar.objects.get(pk=avatar.pk).code_revision, avatar.code_revision)
+
+    def test_failed_save_keeps_version(self):
+        version = self.game.version
+        with mock.patch('django.db.models.Model.save', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.game.save()
+        self.assertEqual(self.game.version, version)
+
+
+class TestGameNotifications(TransactionTestCase):
+    """
+    The notifications are only sent once the changes are committed, which the
+    transactions of TestCase never are.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user('test', 'test@example.com', 'password')
+        self.game = models.Game(id=1, name='test', public=False)
+        self.game.save()
+        self.notified_games = []
+        notifications.subscribe_in_process(self.notified_games.append)
+
+    def tearDown(self):
+        notifications.unsubscribe_in_process(self.notified_games.append)
+        app_settings.GAME_NOTIFIER = None
+
+    def test_game_notified_of_avatar_changes(self):
+        app_settings.GAME_NOTIFIER = 'aimmo.notifications.publish_in_process'
+        avatar = models.Avatar(owner=self.user, code='class Avatar: pass', game=self.game)
+        avatar.save()
+        avatar.delete()
+
+        self.assertEqual(self.notified_games, [self.game.pk, self.game.pk])
+
+    @skipUnless(hasattr(transaction, 'on_commit'), 'Django 1.8 has no commit hooks')
+    def test_game_notified_after_commit(self):
+        app_settings.GAME_NOTIFIER = 'aimmo.notifications.publish_in_process'
+        with transaction.atomic():
+            models.Avatar(owner=self.user, code='class Avatar: pass', game=self.game).save()
+            self.assertEqual(self.notified_games, [])
+        self.assertEqual(self.notified_games, [self.game.pk])
+
+    def test_no_notification_without_notifier(self):
+        models.Avatar(owner=self.user, code='class Avatar: pass', game=self.game).save()
+        self.assertEqual(self.notified_games, [])
@@ -6,6 +6,7 @@ from django.core.urlresolvers import reverse
 from django.test import Client, TestCase
 
 from aimmo import models, app_settings
+from aimmo.models import generate_code_revision
 
 app_settings.GAME_SERVER_URL_FUNCTION = lambda game_id: ('base %s' % game_id, 'path %s' % game_id)
 app_settings.GAME_SERVER_PORT_FUNCTION = lambda game_id: 0
@@ -22,15 +23,15 @@ class TestViews(TestCase):
             'users': [
                 {
                     'id': 1,
-                    'code': CODE,
+                    'code_revision': generate_code_revision(CODE),
                 },
                 {
                     'id': 2,
-                    'code': 'test2',
+                    'code_revision': generate_code_revision('test2'),
                 },
                 {
                     'id': 3,
-                    'code': 'test3',
+                    'code_revision': generate_code_revision('test3'),
                 },
             ]
         }
@@ -153,6 +154,54 @@ class TestViews(TestCase):
         response = c.get(reverse('aimmo/game_details', kwargs={'id': 1}))
         self.assertJSONEqual(response.content, self.EXPECTED_GAMES)
 
+    def test_game_code_api(self):
+        user2 = User.objects.create_user(username='2', password='password')
+        user3 = User.objects.create_user(username='3', password='password')
+        models.Avatar(owner=self.user, code=self.CODE, pk=1, game=self.game).save()
+        models.Avatar(owner=user2, code='test2', pk=2, game=self.game).save()
+        models.Avatar(owner=user3, code='test3', pk=3, game=self.game).save()
+        c = Client()
+        response = c.get(reverse('aimmo/game_code', kwargs={'id': 1}), {'ids': '1,3'})
+        users = sorted(json.loads(response.content)['users'], key=lambda user: user['id'])
+        self.assertEqual(users, [
+            {'id': 1, 'code': self.CODE, 'code_revision': generate_code_revision(self.CODE)},
+            {'id': 3, 'code': 'test3', 'code_revision': generate_code_revision('test3')},
+        ])
+
+    def test_game_code_api_with_invalid_ids(self):
+        c = Client()
+        response = c.get(reverse('aimmo/game_code', kwargs={'id': 1}), {'ids': '1,a'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_games_api_not_modified(self):
+        models.Avatar(owner=self.user, code=self.CODE, pk=1, game=self.game).save()
+        c = Client()
+        response = c.get(reverse('aimmo/game_details', kwargs={'id': 1}))
+        etag = response['ETag']
+
+        response = c.get(reverse('aimmo/game_details', kwargs={'id': 1}), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        avatar = models.Avatar.objects.get(pk=1)
+        avatar.code = 'class Avatar: changed'
+        avatar.save()
+        response = c.get(reverse('aimmo/game_details', kwargs={'id': 1}), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_games_list_not_modified(self):
+        c = Client()
+        response = c.get(reverse('aimmo/games'))
+        etag = response['ETag']
+
+        response = c.get(reverse('aimmo/games'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.game.name = 'renamed'
+        self.game.save()
+        response = c.get(reverse('aimmo/games'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
     def test_games_api_for_non_existent_game(self):
         response = self._go_to_page('aimmo/game_details', 'id', 5)
         self.assertEqual(response.status_code, 404)
@@ -2,13 +2,14 @@ import cPickle as pickle
 import logging
 import os
 import json
+from hashlib import sha1
 
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ValidationError
 from django.http import HttpResponse, JsonResponse, Http404, HttpResponseForbidden
 from django.shortcuts import redirect, render, get_object_or_404
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import condition, require_http_methods
 from django.views.generic import TemplateView
 from django.middleware.csrf import get_token
 
@@ -59,6 +60,19 @@ def code(request, id):
         return JsonResponse({'code': avatar.code})
 
 
+def _games_etag(request):
+    games = Game.objects.exclude_inactive().order_by('pk').values_list('pk', 'version')
+    return sha1(json.dumps(list(games))).hexdigest()
+
+
+def _game_etag(request, id):
+    version = Game.objects.filter(pk=id).values_list('version', flat=True).first()
+    if version is None:
+        return None
+    return 'game-{}-{}'.format(id, version)
+
+
+@condition(etag_func=_games_etag)
 def list_games(request):
     response = {
         game.pk:
@@ -70,6 +84,7 @@ def list_games(request):
     return JsonResponse(response)
 
 
+@condition(etag_func=_game_etag)
 def get_game(request, id):
     game = get_object_or_404(Game, id=id)
     response = {
@@ -79,16 +94,36 @@ def get_game(request, id):
             'users': [],
         }
     }
-    for avatar in game.avatar_set.all():
+    for avatar in game.avatar_set.only('id', 'owner_id', 'code_revision'):
         if avatar.owner_id == game.main_user_id:
             response['main']['main_avatar'] = avatar.id
         response['main']['users'].append({
             'id': avatar.id,
-            'code': avatar.code,
+            'code_revision': avatar.code_revision,
         })
     return JsonResponse(response)
 
 
+def get_avatar_code(request, id):
+    """
+    An API view which returns the code of some of the avatars of a game, given by
+    the comma separated 'ids' query parameter.
+    """
+    game = get_object_or_404(Game, id=id)
+    try:
+        avatar_ids = [int(avatar_id) for avatar_id in request.GET.get('ids', '').split(',') if avatar_id]
+    except ValueError:
+        return HttpResponse(status=400)
+    response = {
+        'users': [{
+            'id': avatar.id,
+            'code': avatar.code,
+            'code_revision': avatar.code_revision,
+        } for avatar in game.avatar_set.filter(id__in=avatar_ids)]
+    }
+    return JsonResponse(response)
+
+
 def connection_parameters(request, game_id):
     """
     An API view which returns the correct connection settings required
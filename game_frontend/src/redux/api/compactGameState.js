@@ -0,0 +1,107 @@
+// Reference decoder of the compact game state encoding, the layout of the frames is
+// described in aimmo-game/simulation/compact_encoding.py. The decoded frames have the
+// same shape as the JSON game state.
+
+const FORMAT_VERSION = 1
+const ENTITIES_FRAME = 1
+const TERRAIN_FRAME = 2
+
+const ORIENTATIONS = ['north', 'east', 'south', 'west']
+const PICKUP_TYPES = ['health', 'invulnerability', 'damage_boost']
+
+class FrameReader {
+  constructor (buffer) {
+    this.view = new DataView(buffer)
+    this.offset = 0
+  }
+
+  read (getter, size, count) {
+    const values = []
+    for (let i = 0; i < count; i++) {
+      values.push(getter.call(this.view, this.offset, true))
+      this.offset += size
+    }
+    return values
+  }
+
+  uint8 (count = 1) { return this.read(DataView.prototype.getUint8, 1, count) }
+  uint16 (count = 1) { return this.read(DataView.prototype.getUint16, 2, count) }
+  int16 (count = 1) { return this.read(DataView.prototype.getInt16, 2, count) }
+  int32 (count = 1) { return this.read(DataView.prototype.getInt32, 4, count) }
+  uint32 (count = 1) { return this.read(DataView.prototype.getUint32, 4, count) }
+
+  locations (count) {
+    const coordinates = this.int16(count * 2)
+    const locations = []
+    for (let i = 0; i < count; i++) {
+      locations.push({ x: coordinates[2 * i], y: coordinates[2 * i + 1] })
+    }
+    return locations
+  }
+}
+
+const decodeEntities = reader => {
+  const [numPlayers, numPickups, numScoreLocations] = reader.uint16(3)
+  const [terrainVersion] = reader.int32()
+  const ids = reader.int32(numPlayers)
+  const scores = reader.int32(numPlayers)
+  const health = reader.int16(numPlayers)
+  const playerLocations = reader.locations(numPlayers)
+  const orientations = reader.uint8(numPlayers)
+  const pickupTypes = reader.uint8(numPickups)
+  const pickupLocations = reader.locations(numPickups)
+  const scoreLocations = reader.locations(numScoreLocations)
+  return {
+    era: 'less_flat',
+    terrainVersion,
+    players: ids.map((id, i) => ({
+      id,
+      score: scores[i],
+      health: health[i],
+      location: playerLocations[i],
+      orientation: ORIENTATIONS[orientations[i]] || null
+    })),
+    pickups: pickupTypes.map((type, i) => ({
+      type: PICKUP_TYPES[type] || null,
+      location: pickupLocations[i]
+    })),
+    scoreLocations: scoreLocations.map(location => ({ location }))
+  }
+}
+
+const decodeTerrain = reader => {
+  reader.uint16()
+  const [terrainVersion] = reader.int32()
+  const [numObstacles] = reader.uint32()
+  const [southWestCorner, northEastCorner] = reader.locations(2)
+  return {
+    terrainVersion,
+    southWestCorner,
+    northEastCorner,
+    obstacles: reader.locations(numObstacles).map(location => ({
+      location,
+      width: 1,
+      height: 1,
+      type: 'wall',
+      orientation: 'north'
+    }))
+  }
+}
+
+export const decodeFrame = buffer => {
+  const reader = new FrameReader(buffer)
+  const [version, kind] = reader.uint8(2)
+  if (version !== FORMAT_VERSION) {
+    throw new Error(`Unsupported game state format version ${version}`)
+  }
+  switch (kind) {
+    case ENTITIES_FRAME:
+      return decodeEntities(reader)
+    case TERRAIN_FRAME:
+      return decodeTerrain(reader)
+    default:
+      throw new Error(`Unknown game state frame ${kind}`)
+  }
+}
+
+export default { decodeFrame }
@@ -0,0 +1,43 @@
+/* eslint-env jest */
+import { decodeFrame } from './compactGameState'
+
+// Frames produced by aimmo-game/simulation/compact_encoding.py
+const toArrayBuffer = base64 => {
+  const bytes = Buffer.from(base64, 'base64')
+  return bytes.buffer.slice(bytes.byteOffset, bytes.byteOffset + bytes.length)
+}
+
+describe('compact game state decoder', () => {
+  it('decodes an entities frame', () => {
+    const frame = toArrayBuffer('AQEBAAEAAQAEAAAABwAAAAMAAAAFAP3/DAABAgIA/v8BAAAA')
+    expect(decodeFrame(frame)).toEqual({
+      era: 'less_flat',
+      terrainVersion: 4,
+      players: [
+        { id: 7, score: 3, health: 5, orientation: 'east', location: { x: -3, y: 12 } }
+      ],
+      pickups: [
+        { type: 'damage_boost', location: { x: 2, y: -2 } }
+      ],
+      scoreLocations: [
+        { location: { x: 1, y: 0 } }
+      ]
+    })
+  })
+
+  it('decodes a terrain frame', () => {
+    const frame = toArrayBuffer('AQIAAAQAAAABAAAA8f/x/w8ADwD5/wkA')
+    expect(decodeFrame(frame)).toEqual({
+      terrainVersion: 4,
+      southWestCorner: { x: -15, y: -15 },
+      northEastCorner: { x: 15, y: 15 },
+      obstacles: [
+        { location: { x: -7, y: 9 }, width: 1, height: 1, type: 'wall', orientation: 'north' }
+      ]
+    })
+  })
+
+  it('rejects unknown format versions', () => {
+    expect(() => decodeFrame(new Uint8Array([2, 1]).buffer)).toThrow()
+  })
+})
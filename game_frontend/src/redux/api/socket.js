@@ -3,26 +3,37 @@ import { actions as gameActions } from '../features/Game'
 import { actions as consoleLogActions } from '../features/ConsoleLog'
 import { map, mergeMap } from 'rxjs/operators'
 import { fromEvent, pipe, merge } from 'rxjs'
+import { decodeFrame } from './compactGameState'
 
 const connectToGame = () =>
   map(action => {
-    const { game_url_base: gameUrlBase, game_url_path: gameUrlPath, avatar_id: avatarId } = action.payload.parameters
+    const {
+      game_url_base: gameUrlBase,
+      game_url_path: gameUrlPath,
+      avatar_id: avatarId,
+      encoding = 'json'
+    } = action.payload.parameters
     return io(gameUrlBase, {
       path: gameUrlPath,
       query: {
-        avatar_id: avatarId
+        avatar_id: avatarId,
+        encoding
       }
     })
   })
 
+// With the compact encoding, the game state and terrain arrive as binary frames.
+const decodeEvent = event => event instanceof ArrayBuffer ? decodeFrame(event) : event
+
 const listenFor = (eventName, socket, action) =>
   fromEvent(socket, eventName).pipe(
-    map(event => action(event))
+    map(event => action(decodeEvent(event)))
   )
 
 const startListeners = () =>
   pipe(
     mergeMap(socket => merge(
+      listenFor('game-terrain', socket, gameActions.socketGameTerrainReceived),
       listenFor('game-state', socket, gameActions.socketGameStateReceived),
       listenFor('log', socket, consoleLogActions.socketConsoleLogReceived),
       listenFor('feedback-avatar-updated', socket, gameActions.socketFeedbackAvatarUpdatedSuccess)
@@ -6,7 +6,8 @@ import socket from './socket'
 import EventEmitter from 'events'
 
 jest.mock('../features/Game/actions', () => ({
-  socketGameStateReceived: jest.fn()
+  socketGameStateReceived: jest.fn(),
+  socketGameTerrainReceived: jest.fn()
 }))
 
 describe('socket listens correctly', () => {
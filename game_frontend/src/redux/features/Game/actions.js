@@ -30,6 +30,15 @@ const socketGameStateReceived = gameState => (
   }
 )
 
+const socketGameTerrainReceived = terrain => (
+  {
+    type: types.SOCKET_GAME_TERRAIN_RECEIVED,
+    payload: {
+      terrain
+    }
+  }
+)
+
 const unityEvent = (unityEvent, unityData, successAction, failAction) => (
   {
     type: types.UNITY_EVENT,
@@ -96,6 +105,7 @@ export default {
   sendGameStateFail,
   sendGameStateSuccess,
   socketGameStateReceived,
+  socketGameTerrainReceived,
   unityEvent,
   connectionParametersReceived,
   unitySendAvatarIDSuccess,
@@ -16,11 +16,13 @@ const getConnectionParametersEpic = (action$, state$, { api: { get } }) => actio
   )
 )
 
+// The terrain (obstacles and map bounds) is only sent by the game when it changes,
+// so it is merged back into each game state before it is given to Unity.
 const sendGameStateEpic = (action$, state$, { api: { unity } }) => action$.pipe(
   ofType(types.SOCKET_GAME_STATE_RECEIVED),
   map(action => actions.unityEvent(
     'ReceiveGameUpdate',
-    JSON.stringify(action.payload.gameState),
+    JSON.stringify({ ...state$.value.game.terrain, ...action.payload.gameState }),
     actions.sendGameStateSuccess(),
     actions.sendGameStateFail
   )),
@@ -106,7 +106,7 @@ describe('ReceiveGameUpdate', () => {
       }
     }
 
-    const state$ = new StateObservable(new Subject(), {})
+    const state$ = new StateObservable(new Subject(), { game: {} })
     const actual = epics.sendGameStateEpic(source$, state$, mockAPI)
 
     testScheduler.expectObservable(actual).toBe(marbles2, values)
@@ -7,6 +7,11 @@ const gameReducer = (state = {}, action) => {
         ...state,
         gameState: action.payload.gameState
       }
+    case types.SOCKET_GAME_TERRAIN_RECEIVED:
+      return {
+        ...state,
+        terrain: action.payload.terrain
+      }
     case types.SOCKET_FEEDBACK_AVATAR_UPDATED_SUCCESS:
       return {
         ...state,
@@ -18,6 +18,17 @@ describe('gameReducer', () => {
     expect(gameReducer({ initialState: 'someValue' }, action)).toEqual(expectedState)
   })
 
+  it('should handle SOCKET_GAME_TERRAIN_RECEIVED', () => {
+    const expectedState = {
+      terrain: {
+        terrainVersion: 2
+      },
+      initialState: 'someValue'
+    }
+    const action = actions.socketGameTerrainReceived({ terrainVersion: 2 })
+    expect(gameReducer({ initialState: 'someValue' }, action)).toEqual(expectedState)
+  })
+
   it('should handle SOCKET_FEEDBACK_AVATAR_UPDATED_SUCCESS', () => {
     const expectedState = {
       showSnackbar: true,
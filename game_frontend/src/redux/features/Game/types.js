@@ -2,6 +2,7 @@ const SOCKET_CONNECT_TO_GAME_REQUEST = 'features/Game/SOCKET_CONNECT_TO_GAME_REQ
 const SOCKET_CONNECT_TO_GAME_FAIL = 'features/Game/SOCKET_CONNECT_TO_GAME_FAIL'
 
 const SOCKET_GAME_STATE_RECEIVED = 'features/Game/SOCKET_GAME_STATE_RECEIVED'
+const SOCKET_GAME_TERRAIN_RECEIVED = 'features/Game/SOCKET_GAME_TERRAIN_RECEIVED'
 const SEND_GAME_STATE_SUCCESS = 'features/Game/SOCKET_GAME_STATE_UPDATE_SUCCESS'
 const SEND_GAME_STATE_FAIL = 'features/Game/SOCKET_GAME_STATE_UPDATE_FAIL'
 
@@ -22,6 +23,7 @@ export default {
   SOCKET_CONNECT_TO_GAME_REQUEST,
   SOCKET_CONNECT_TO_GAME_FAIL,
   SOCKET_GAME_STATE_RECEIVED,
+  SOCKET_GAME_TERRAIN_RECEIVED,
   SEND_GAME_STATE_SUCCESS,
   SEND_GAME_STATE_FAIL,
   UNITY_EVENT,